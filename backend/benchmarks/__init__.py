@@ -0,0 +1 @@
+# SITCON Camp 2025 Backend Benchmarks
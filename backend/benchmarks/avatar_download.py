@@ -0,0 +1,229 @@
+"""
+頭像下載：模擬聯絡人列表重複渲染，每次渲染讀取所有聯絡人的頭像，
+比較瀏覽器不帶條件請求最大尺寸的 JPEG、請求列表尺寸的 WebP、帶 If-None-Match
+重新驗證，以及批量取得預簽名網址時，每次渲染經過後端傳輸的位元組數、
+後端對 MinIO 的請求數、建立的連線數與耗時
+（物件儲存使用 benchmarks/fake_s3.py）
+
+使用方式：
+    uv run python -m benchmarks.avatar_download [聯絡人數量] [--renders 10]
+
+「後端傳輸」只計算經過後端的回應；預簽名網址模式下圖片由瀏覽器直接從 MinIO 讀取
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from io import BytesIO
+from typing import Dict, Optional
+
+BENCH_DIR = tempfile.mkdtemp(prefix="sitcon-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DIR}/avatar_download.db"
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from PIL import Image, ImageFilter  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from benchmarks import fake_s3  # noqa: E402
+from src.auth import create_access_token  # noqa: E402
+from src.database import engine, init_db  # noqa: E402
+from src.file_utils import (  # noqa: E402
+    _AVATAR_CONTENT_TYPES,
+    AVATAR_SIZES,
+    avatar_rendition_key,
+    get_minio_client,
+    object_storage_pool,
+    process_avatar_image,
+)
+from src.models import Contact, User  # noqa: E402
+from src.routers import contact  # noqa: E402
+
+BUCKET = "bench-avatars"
+# 聯絡人列表中頭像的顯示大小 (40px) 乘以兩倍像素
+LIST_SIZE = 80
+LIST_ACCEPT = "image/webp,image/*;q=0.8"
+
+
+def _photo() -> bytes:
+    """產生帶有漸層與細節、接近照片的 JPEG"""
+    size = (1024, 1024)
+    detail = (
+        Image.effect_noise(size, 64).convert("L").filter(ImageFilter.GaussianBlur(1))
+    )
+    image = Image.merge(
+        "RGB",
+        [
+            Image.radial_gradient("L").resize(size),
+            Image.linear_gradient("L").resize(size),
+            detail,
+        ],
+    )
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+async def _populate(contacts: int, renditions: Dict[tuple[int, str], bytes]) -> None:
+    objects = fake_s3.BUCKETS.setdefault(BUCKET, {})
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                id=1, email="bench@example.com", username="bench", hashed_password="x"
+            )
+        )
+        await conn.execute(
+            insert(Contact),
+            [
+                {
+                    "id": i,
+                    "name": f"聯絡人{i}",
+                    "user_id": 1,
+                    "avatar_key": f"avatars/1/{i}/{AVATAR_SIZES[-1]}.jpg",
+                }
+                for i in range(1, contacts + 1)
+            ],
+        )
+    for i in range(1, contacts + 1):
+        for (size, image_format), content in renditions.items():
+            key = avatar_rendition_key(
+                f"avatars/1/{i}/{AVATAR_SIZES[-1]}.jpg", size, image_format
+            )
+            objects[key] = (content, _AVATAR_CONTENT_TYPES[image_format])
+
+
+async def _render(
+    client: httpx.AsyncClient,
+    contacts: int,
+    headers: Dict[str, str],
+    etags: Dict[int, str] | None,
+    mode: str,
+) -> int:
+    if mode == "presigned":
+        # 一次取得整頁的預簽名網址；網址在簽章時段內不變，圖片由瀏覽器快取或直接從 MinIO 讀取
+        response = await client.get(
+            "/contacts/avatar-urls",
+            params={
+                "contact_ids": list(range(1, contacts + 1)),
+                "size": LIST_SIZE,
+                "format": "webp",
+            },
+            headers=headers,
+        )
+        assert response.status_code == 200, response.status_code
+        assert response.json()["mode"] == "presigned"
+        return len(response.content)
+
+    # 舊版前端不指定尺寸與格式，取得最大尺寸的 JPEG
+    size: Optional[int] = None
+    request_headers = dict(headers)
+    if mode != "full":
+        size = LIST_SIZE
+        request_headers["Accept"] = LIST_ACCEPT
+
+    # 與前端相同，同時請求列表中所有聯絡人的頭像
+    async def fetch(contact_id: int) -> int:
+        conditional_headers = dict(request_headers)
+        if etags is not None and contact_id in etags:
+            conditional_headers["If-None-Match"] = etags[contact_id]
+        response = await client.get(
+            f"/contacts/{contact_id}/avatar/image",
+            params={"size": size} if size else {},
+            headers=conditional_headers,
+        )
+        assert response.status_code in (200, 304), response.status_code
+        if etags is not None:
+            etags[contact_id] = response.headers["ETag"]
+        return len(response.content)
+
+    sizes = await asyncio.gather(*(fetch(i) for i in range(1, contacts + 1)))
+    return sum(sizes)
+
+
+async def _measure(
+    app: FastAPI, contacts: int, renders: int, mode: str
+) -> tuple[float, float, int, float]:
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench'})}"}
+    etags: Dict[int, str] | None = {} if mode == "revalidate" else None
+    contact.AVATAR_DELIVERY = "presigned" if mode == "presigned" else "proxy"
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        # 第一次渲染讓瀏覽器取得 ETag 或快取圖片，不計入量測
+        await _render(client, contacts, headers, etags, mode)
+
+        fake_s3.reset_stats()
+        transferred = 0
+        timings = []
+        for _ in range(renders):
+            started = time.perf_counter()
+            transferred += await _render(client, contacts, headers, etags, mode)
+            timings.append(time.perf_counter() - started)
+
+    return (
+        transferred / renders,
+        fake_s3.stats["requests"] / renders,
+        len(fake_s3.stats["connections"]),
+        statistics.median(timings),
+    )
+
+
+async def main(contacts: int, renders: int) -> None:
+    await init_db()
+    renditions = process_avatar_image(_photo())
+    await _populate(contacts, renditions)
+
+    app = FastAPI()
+    app.include_router(contact.router)
+
+    print(
+        f"{contacts} 位聯絡人的頭像，重複渲染 {renders} 次；"
+        f"列表請求 {LIST_SIZE}px，各版本大小 (KB): "
+        + ", ".join(
+            f"{size} {image_format} {len(content) / 1024:.1f}"
+            for (size, image_format), content in renditions.items()
+        )
+    )
+    print(
+        f"{'情境':<20}{'後端傳輸 (KB)':>16}{'MinIO 請求數':>14}"
+        f"{'MinIO 連線數':>14}{'p50 (ms)':>10}"
+    )
+    for name, mode in [
+        ("最大尺寸 JPEG", "full"),
+        ("列表尺寸 WebP", "list"),
+        ("If-None-Match 驗證", "revalidate"),
+        ("預簽名網址", "presigned"),
+    ]:
+        transferred, requests, connections, p50 = await _measure(
+            app, contacts, renders, mode
+        )
+        print(
+            f"{name:<20}{transferred / 1024:>16.1f}{requests:>14.1f}"
+            f"{connections:>14}{p50 * 1000:>10.1f}"
+        )
+
+    print(f"物件儲存執行緒池統計: {object_storage_pool.stats()}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="頭像下載")
+    parser.add_argument("contacts", type=int, nargs="?", default=50)
+    parser.add_argument("--renders", type=int, default=10)
+    args = parser.parse_args()
+
+    with fake_s3.serve() as endpoint:
+        os.environ.update(
+            S3_ENDPOINT=endpoint,
+            S3_ACCESS_KEY="bench",
+            S3_SECRET_KEY="bench",
+            S3_BUCKET=BUCKET,
+            S3_REGION="us-east-1",
+        )
+        get_minio_client.cache_clear()
+        asyncio.run(main(args.contacts, args.renders))
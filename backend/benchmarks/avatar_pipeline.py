@@ -0,0 +1,124 @@
+"""
+頭像上傳對事件迴圈的影響：同時上傳多張照片大小的頭像，並以固定間隔的心跳代表進行中的聊天串流，
+比較在事件迴圈中直接處理圖片與呼叫 MinIO，以及使用圖片處理程序池與物件儲存執行緒池時，
+心跳的最大延遲與全部上傳完成的時間（物件儲存使用 benchmarks/fake_s3.py）
+
+使用方式：
+    uv run python -m benchmarks.avatar_pipeline [同時上傳數]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from io import BytesIO
+from typing import Awaitable, Callable, List
+
+from PIL import Image
+from starlette.datastructures import Headers, UploadFile
+
+from benchmarks import fake_s3
+from src.file_utils import (
+    AVATAR_PROCESS_WORKERS,
+    _put_avatar,
+    avatar_image_pool,
+    get_minio_client,
+    object_storage_pool,
+    process_avatar_image,
+    upload_avatar,
+)
+
+BUCKET = "bench-avatars"
+# 聊天串流每個 token 之間的間隔
+TICK_SECONDS = 0.01
+
+
+def _photo() -> bytes:
+    """產生與手機照片相近尺寸的 JPEG"""
+    image = Image.merge(
+        "RGB",
+        [
+            Image.effect_noise((3000, 2000), sigma).convert("L")
+            for sigma in (24, 32, 40)
+        ],
+    )
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+async def _inline_upload(content: bytes) -> None:
+    # 舊版：在 async 路由中同步處理圖片並呼叫 MinIO
+    directory = f"avatars/{uuid.uuid4()}"
+    for (size, image_format), processed in process_avatar_image(content).items():
+        _put_avatar(BUCKET, f"{directory}/{size}.{image_format}", processed)
+
+
+async def _pooled_upload(content: bytes) -> None:
+    file = UploadFile(
+        BytesIO(content),
+        size=len(content),
+        filename="photo.jpg",
+        headers=Headers({"content-type": "image/jpeg"}),
+    )
+    await upload_avatar(file, user_id=1, contact_id=1)
+
+
+async def _heartbeat(stop: asyncio.Event, lags: List[float]) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + TICK_SECONDS
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - expected)
+
+
+async def _burst(
+    uploads: int, upload: Callable[[bytes], Awaitable[None]], content: bytes
+) -> tuple[float, float]:
+    stop = asyncio.Event()
+    lags: List[float] = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+    await asyncio.sleep(TICK_SECONDS * 5)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(upload(content) for _ in range(uploads)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await heartbeat
+    return max(lags), elapsed
+
+
+async def main(uploads: int) -> None:
+    content = _photo()
+
+    # 先以一次上傳啟動圖片處理程序，不計入量測
+    await _pooled_upload(content)
+
+    print(
+        f"{uploads} 個同時上傳（{len(content) / 1024 / 1024:.1f} MB JPEG），"
+        f"圖片處理程序池 {AVATAR_PROCESS_WORKERS} 個 worker"
+    )
+    print(f"{'版本':<16}{'心跳最大延遲 (ms)':>20}{'全部上傳完成 (ms)':>20}")
+    for name, upload in [
+        ("事件迴圈中處理", _inline_upload),
+        ("程序池與執行緒池", _pooled_upload),
+    ]:
+        max_lag, elapsed = await _burst(uploads, upload, content)
+        print(f"{name:<16}{max_lag * 1000:>20.1f}{elapsed * 1000:>20.1f}")
+
+    print(f"圖片處理程序池統計: {avatar_image_pool.stats()}")
+    print(f"物件儲存執行緒池統計: {object_storage_pool.stats()}")
+    avatar_image_pool.shutdown()
+
+
+if __name__ == "__main__":
+    with fake_s3.serve() as endpoint:
+        os.environ.update(
+            S3_ENDPOINT=endpoint,
+            S3_ACCESS_KEY="bench",
+            S3_SECRET_KEY="bench",
+            S3_BUCKET=BUCKET,
+        )
+        get_minio_client.cache_clear()
+        asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 8))
@@ -0,0 +1,109 @@
+"""
+頭像上傳吞吐量：對本地假 S3 伺服器（benchmarks/fake_s3.py）上傳已處理好的頭像，
+比較每次上傳建立新 MinIO 客戶端並檢查 bucket，與共用客戶端、bucket 只檢查一次時的
+吞吐量、每次上傳的 S3 請求數與建立的連線數
+
+使用方式：
+    uv run python -m benchmarks.avatar_upload [上傳次數] [--concurrency 8] [--request-delay 0.005]
+"""
+
+import argparse
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Callable
+
+from minio import Minio
+from PIL import Image
+
+from benchmarks import fake_s3
+from src.file_utils import ensure_bucket_exists, get_minio_client
+
+BUCKET = "bench-avatars"
+
+
+def _avatar() -> bytes:
+    """產生與處理後頭像相近大小的 JPEG"""
+    image = Image.effect_noise((512, 512), 64).convert("RGB")
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=85, optimize=True)
+    return output.getvalue()
+
+
+def legacy_upload(content: bytes) -> None:
+    # 舊版：每次呼叫 get_minio_client() 都建立新的客戶端與連線池，且每次上傳前檢查 bucket
+    endpoint = os.environ["S3_ENDPOINT"].replace("http://", "")
+    client = Minio(endpoint, access_key="bench", secret_key="bench", secure=False)
+    if not client.bucket_exists(BUCKET):
+        client.make_bucket(BUCKET)
+
+    client = Minio(endpoint, access_key="bench", secret_key="bench", secure=False)
+    client.put_object(
+        BUCKET,
+        f"avatars/{uuid.uuid4()}.jpg",
+        BytesIO(content),
+        length=len(content),
+        content_type="image/jpeg",
+    )
+
+
+def current_upload(content: bytes) -> None:
+    ensure_bucket_exists(BUCKET)
+    get_minio_client().put_object(
+        BUCKET,
+        f"avatars/{uuid.uuid4()}.jpg",
+        BytesIO(content),
+        length=len(content),
+        content_type="image/jpeg",
+    )
+
+
+def _run(
+    upload: Callable[[bytes], None], content: bytes, uploads: int, concurrency: int
+) -> tuple[float, int, int]:
+    fake_s3.reset()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda _: upload(content), range(uploads)))
+    elapsed = time.perf_counter() - started
+    return elapsed, fake_s3.stats["requests"], len(fake_s3.stats["connections"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="頭像上傳吞吐量")
+    parser.add_argument("uploads", type=int, nargs="?", default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--request-delay", type=float, default=0.005)
+    args = parser.parse_args()
+
+    fake_s3.REQUEST_DELAY = args.request_delay
+    content = _avatar()
+
+    with fake_s3.serve() as endpoint:
+        os.environ.update(
+            S3_ENDPOINT=endpoint, S3_ACCESS_KEY="bench", S3_SECRET_KEY="bench"
+        )
+        get_minio_client.cache_clear()
+
+        print(
+            f"{args.uploads} 次上傳（{len(content) / 1024:.1f} KB），"
+            f"並行 {args.concurrency}，每個 S3 請求延遲 {args.request_delay * 1000:.0f} ms"
+        )
+        print(f"{'版本':<16}{'上傳/秒':>10}{'每次上傳請求數':>16}{'建立連線數':>12}")
+        for name, upload in [
+            ("每次新客戶端", legacy_upload),
+            ("共用客戶端", current_upload),
+        ]:
+            elapsed, requests, connections = _run(
+                upload, content, args.uploads, args.concurrency
+            )
+            print(
+                f"{name:<16}{args.uploads / elapsed:>10.1f}"
+                f"{requests / args.uploads:>16.2f}{connections:>12}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+聊天端點負載測試：以子行程啟動假 Gemini 伺服器與後端，由 N 個並行 SSE 客戶端
+對 /chat/siri 發送請求，回報吞吐量、TTFB 與各階段延遲，並同時量測 /contacts/
+在聊天負載下的延遲
+
+各階段依 SSE 事件到達時間計算：
+- TTFB：收到回應標頭（驗證與組裝系統 prompt）
+- 首段文字：第一個 message 事件（模型首個 token）
+- 工具結果：第一個 tool_call 事件
+- 完成：done 事件
+
+使用方式：
+    uv run python -m benchmarks.chat_load [--concurrency 50] [--requests 200]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks import fake_gemini
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "text": "你好",
+    "tool": f"幫我列出所有{fake_gemini.TOOL_TRIGGER}",
+    "chain": f"{fake_gemini.TOOL_CHAIN_TRIGGER}一下最近的互動",
+}
+STAGES = ["TTFB", "首段文字", "工具結果", "完成"]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _start(args: List[str], env: Dict[str, str], url: str):
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, *args, cwd=BACKEND_DIR, env={**os.environ, **env}
+    )
+
+    async with httpx.AsyncClient() as client:
+        for _ in range(200):
+            try:
+                await client.get(url)
+                return process
+            except httpx.TransportError:
+                await asyncio.sleep(0.05)
+
+    process.terminate()
+    raise RuntimeError(f"無法啟動 {' '.join(args)}")
+
+
+async def _prepare_user(client: httpx.AsyncClient) -> Dict[str, str]:
+    user = {"email": "bench@example.com", "username": "bench", "password": "bench123"}
+    await client.post("/auth/register", json=user)
+    response = await client.post(
+        "/auth/login", data={"username": user["username"], "password": user["password"]}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    for i in range(1, 21):
+        await client.post(
+            "/contacts/",
+            json={"name": f"聯絡人{i}", "description": "同學"},
+            headers=headers,
+        )
+
+    return headers
+
+
+async def _chat(
+    client: httpx.AsyncClient, headers: Dict[str, str], text: str
+) -> Optional[Dict[str, float]]:
+    """送出一次聊天請求，回傳各階段距離請求開始的秒數，失敗時回傳 None"""
+    payload = {"messages": [{"role": "user", "content": text}]}
+    timings: Dict[str, float] = {}
+
+    started = time.perf_counter()
+    async with client.stream(
+        "POST", "/chat/siri", json=payload, headers=headers
+    ) as response:
+        if response.status_code != 200:
+            return None
+        timings["TTFB"] = time.perf_counter() - started
+
+        async for line in response.aiter_lines():
+            if not line.startswith("event: "):
+                continue
+
+            event = line.removeprefix("event: ")
+            elapsed = time.perf_counter() - started
+            if event == "message":
+                timings.setdefault("首段文字", elapsed)
+            elif event == "tool_call":
+                timings.setdefault("工具結果", elapsed)
+            elif event == "done":
+                timings["完成"] = elapsed
+            elif event == "error":
+                return None
+
+    return timings if "完成" in timings else None
+
+
+async def _probe_contacts(
+    client: httpx.AsyncClient, headers: Dict[str, str], stop: asyncio.Event
+) -> List[float]:
+    timings = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/contacts/?limit=20", headers=headers)
+        if response.status_code == 200:
+            timings.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+    return timings
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _report_row(name: str, values: List[float]) -> None:
+    if not values:
+        print(f"{name:<12}{'-':>10}{'-':>10}{'-':>10}")
+        return
+    print(
+        f"{name:<12}"
+        f"{statistics.median(values) * 1000:>10.0f}"
+        f"{_percentile(values, 95) * 1000:>10.0f}"
+        f"{_percentile(values, 99) * 1000:>10.0f}"
+    )
+
+
+async def _run(args: argparse.Namespace, base_url: str) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency + 5)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=120
+    ) as client:
+        headers = await _prepare_user(client)
+        text = SCENARIOS[args.scenario]
+
+        baseline_stop = asyncio.Event()
+        baseline_task = asyncio.create_task(
+            _probe_contacts(client, headers, baseline_stop)
+        )
+        await asyncio.sleep(2)
+        baseline_stop.set()
+        baseline = await baseline_task
+
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for i in range(args.requests):
+            queue.put_nowait(i)
+
+        results: List[Dict[str, float]] = []
+        failures = 0
+
+        async def worker():
+            nonlocal failures
+            while not queue.empty():
+                queue.get_nowait()
+                timings = await _chat(client, headers, text)
+                if timings is None:
+                    failures += 1
+                else:
+                    results.append(timings)
+
+        probe_stop = asyncio.Event()
+        probe_task = asyncio.create_task(_probe_contacts(client, headers, probe_stop))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        probe_stop.set()
+        under_load = await probe_task
+
+    print(
+        f"情境 {args.scenario}，並行 {args.concurrency}，共 {args.requests} 次請求，"
+        f"失敗 {failures} 次"
+    )
+    print(f"吞吐量: {len(results) / elapsed:.1f} 次/秒（{elapsed:.1f}s）")
+    print(f"{'階段':<12}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}")
+    for stage in STAGES:
+        _report_row(stage, [timings[stage] for timings in results if stage in timings])
+    _report_row("/contacts/ 閒置", baseline)
+    _report_row("/contacts/ 負載", under_load)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="聊天端點負載測試")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--scenario", choices=SCENARIOS, default="tool")
+    parser.add_argument(
+        "--first-token-delay", type=float, default=fake_gemini.FIRST_TOKEN_DELAY
+    )
+    parser.add_argument("--token-delay", type=float, default=fake_gemini.TOKEN_DELAY)
+    args = parser.parse_args()
+
+    bench_dir = tempfile.mkdtemp(prefix="sitcon-bench-")
+    gemini_port, backend_port = _free_port(), _free_port()
+    gemini_url = f"http://127.0.0.1:{gemini_port}"
+    backend_url = f"http://127.0.0.1:{backend_port}"
+
+    gemini = await _start(
+        [
+            "-m",
+            "benchmarks.fake_gemini",
+            "--port",
+            str(gemini_port),
+            "--first-token-delay",
+            str(args.first_token_delay),
+            "--token-delay",
+            str(args.token_delay),
+        ],
+        {},
+        gemini_url,
+    )
+    backend = await _start(
+        [
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(backend_port),
+            "--log-level",
+            "warning",
+        ],
+        {
+            "DATABASE_URL": f"sqlite:///{bench_dir}/chat_load.db",
+            "GEMINI_API_KEY": "fake-key",
+            "GEMINI_BASE_URL": gemini_url,
+        },
+        backend_url,
+    )
+
+    try:
+        await _run(args, backend_url)
+    finally:
+        for process in (backend, gemini):
+            process.terminate()
+            await process.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
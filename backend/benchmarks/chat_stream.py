@@ -0,0 +1,96 @@
+"""
+聊天串流首個 token 時間（TTFT）測試：對本地假 Gemini 伺服器呼叫
+gemini_stream_chat_with_tools，量測第一段文字與完整回應的時間
+
+使用方式：
+    uv run python -m benchmarks.chat_stream
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+BENCH_DIR = tempfile.mkdtemp(prefix="sitcon-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DIR}/chat_stream.db"
+
+from sqlalchemy import insert  # noqa: E402
+
+from benchmarks import fake_gemini  # noqa: E402
+from src.ai import (  # noqa: E402
+    UnifiedToolHandler,
+    gemini_stream_chat_with_tools,
+    set_gemini_client,
+)
+from src.database import SessionLocal, engine, init_db  # noqa: E402
+from src.models import Contact, User  # noqa: E402
+from src.schemas import ChatMessage  # noqa: E402
+
+ROUNDS = 5
+
+SCENARIOS = {
+    "一般回覆": "你好",
+    "工具調用後回覆": f"幫我列出所有{fake_gemini.TOOL_TRIGGER}",
+    "多回合並行工具": f"{fake_gemini.TOOL_CHAIN_TRIGGER}一下最近的互動",
+}
+
+
+async def _populate() -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                id=1, email="bench@example.com", username="bench", hashed_password="x"
+            )
+        )
+        await conn.execute(
+            insert(Contact),
+            [{"name": f"聯絡人{i}", "user_id": 1} for i in range(1, 21)],
+        )
+
+
+async def _measure(text: str) -> tuple[list[float], list[float]]:
+    first_token, total = [], []
+
+    async with SessionLocal() as db:
+        user = await db.get(User, 1)
+        for _ in range(ROUNDS):
+            started = time.perf_counter()
+            first = None
+            async for chunk in gemini_stream_chat_with_tools(
+                [],
+                [ChatMessage(role="user", content=text)],
+                UnifiedToolHandler(db, user),
+            ):
+                if first is None and chunk.type == "text":
+                    first = time.perf_counter() - started
+            total.append(time.perf_counter() - started)
+            first_token.append(first if first is not None else float("nan"))
+
+    return first_token, total
+
+
+async def main() -> None:
+    await init_db()
+    await _populate()
+
+    print(
+        f"假伺服器：首 token 延遲 {fake_gemini.FIRST_TOKEN_DELAY * 1000:.0f} ms，"
+        f"每 token {fake_gemini.TOKEN_DELAY * 1000:.0f} ms，"
+        f"每則回覆 {fake_gemini.TOKENS_PER_REPLY} 個 token"
+    )
+    print(f"{'情境':<16}{'TTFT (ms)':>12}{'完成 (ms)':>12}")
+    for name, text in SCENARIOS.items():
+        first_token, total = await _measure(text)
+        print(
+            f"{name:<16}{statistics.median(first_token) * 1000:>12.0f}"
+            f"{statistics.median(total) * 1000:>12.0f}"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    with fake_gemini.serve() as base_url:
+        set_gemini_client(fake_gemini.create_client(base_url))
+        asyncio.run(main())
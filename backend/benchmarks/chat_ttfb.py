@@ -0,0 +1,146 @@
+"""
+聊天端點首位元組時間（TTFB）測試：比較舊版「載入所有聯絡人與記錄」的依賴鏈
+與目前只查詢暱稱投影的系統 prompt 組裝方式
+
+Gemini 串流以立即回傳的替身取代，量測結果只包含伺服器端組裝 prompt 的成本
+
+使用方式：
+    uv run python -m benchmarks.chat_ttfb [記錄數量]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = tempfile.mkdtemp(prefix="sitcon-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DIR}/chat_ttfb.db"
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+from src.auth import create_access_token, get_current_active_user  # noqa: E402
+from src.contact_summary import contact_summary_cache  # noqa: E402
+from src.database import engine, get_db, init_db  # noqa: E402
+from src.models import Contact, Record, RecordCategory, User  # noqa: E402
+from src.routers import chat  # noqa: E402
+
+CONTACTS = 200
+BATCH_SIZE = 10_000
+ROUNDS = 20
+
+
+async def _fake_stream(
+    history_messages, messages, tool_handler, system_prompt, user_context=None
+):
+    yield "好的"
+
+
+async def _legacy_prefetch(
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    舊版聊天端點的依賴：載入所有聯絡人（含全部記錄）以及所有記錄
+    """
+    await db.scalars(
+        select(Contact)
+        .where(Contact.user_id == current_user.id)
+        .options(selectinload(Contact.records))
+    )
+    await db.scalars(
+        select(Record).join(Contact).where(Contact.user_id == current_user.id)
+    )
+
+
+def _build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+    app.include_router(
+        chat.router, dependencies=[Depends(_legacy_prefetch)] if legacy else []
+    )
+    return app
+
+
+async def _populate(total: int) -> None:
+    categories = list(RecordCategory)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                id=1, email="bench@example.com", username="bench", hashed_password="x"
+            )
+        )
+        await conn.execute(
+            insert(Contact),
+            [
+                {"id": i, "name": f"聯絡人{i}", "description": "同學", "user_id": 1}
+                for i in range(1, CONTACTS + 1)
+            ],
+        )
+
+        for start in range(0, total, BATCH_SIZE):
+            rows = [
+                {
+                    "category": categories[i % len(categories)],
+                    "content": f"第 {i} 筆記錄：一起去吃拉麵，聊了很多關於營隊的事情",
+                    "contact_id": i % CONTACTS + 1,
+                }
+                for i in range(start, min(start + BATCH_SIZE, total))
+            ]
+            await conn.execute(insert(Record), rows)
+
+
+async def _measure(app: FastAPI, token: str, clear_cache: bool) -> list[float]:
+    payload = {"messages": [{"role": "user", "content": "你好"}]}
+    headers = {"Authorization": f"Bearer {token}"}
+    timings = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for _ in range(ROUNDS):
+            if clear_cache:
+                contact_summary_cache.clear()
+
+            started = time.perf_counter()
+            async with client.stream(
+                "POST", "/chat/siri", json=payload, headers=headers
+            ) as response:
+                assert response.status_code == 200, response.status_code
+                async for _ in response.aiter_bytes():
+                    timings.append(time.perf_counter() - started)
+                    break
+
+    return timings
+
+
+def _report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p50 = statistics.median(timings) * 1000
+    p95 = timings[int(len(timings) * 0.95) - 1] * 1000
+    print(f"{name:<28}{p50:>10.1f}{p95:>10.1f}")
+
+
+async def main(total: int) -> None:
+    await init_db()
+    await _populate(total)
+    chat.gemini_stream_chat_with_tools = _fake_stream
+    token = create_access_token({"sub": "bench"})
+
+    print(f"用戶擁有 {CONTACTS} 位聯絡人、{total:,} 筆記錄，每項 {ROUNDS} 次")
+    print(f"{'情境':<28}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    _report("舊版（載入全部記錄）", await _measure(_build_app(True), token, True))
+    _report("目前（緩存未命中）", await _measure(_build_app(False), token, True))
+    _report("目前（緩存命中）", await _measure(_build_app(False), token, False))
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
@@ -0,0 +1,120 @@
+"""
+Gemini 上下文緩存測試：對本地假 Gemini 伺服器進行多回合聊天，比較使用與不使用
+上下文緩存時，每次聊天請求傳送給模型的資料量與輸入 token 數
+
+使用方式：
+    uv run python -m benchmarks.context_cache
+"""
+
+import asyncio
+import os
+import tempfile
+
+BENCH_DIR = tempfile.mkdtemp(prefix="sitcon-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DIR}/context_cache.db"
+
+from sqlalchemy import insert  # noqa: E402
+
+from benchmarks import fake_gemini  # noqa: E402
+from src.ai import (  # noqa: E402
+    UnifiedToolHandler,
+    gemini_stream_chat_with_tools,
+    set_gemini_client,
+)
+from src.ai.context_cache import context_cache  # noqa: E402
+from src.contact_summary import contact_summary_cache  # noqa: E402
+from src.database import SessionLocal, engine, init_db  # noqa: E402
+from src.models import Contact, User  # noqa: E402
+from src.prompt_manager import prompt_manager  # noqa: E402
+from src.schemas import ChatMessage  # noqa: E402
+
+CONTACTS = 20
+TURNS = [
+    "你好",
+    f"幫我列出所有{fake_gemini.TOOL_TRIGGER}",
+    "謝謝",
+    f"{fake_gemini.TOOL_CHAIN_TRIGGER}一下最近的互動",
+    "好的",
+]
+
+
+async def _populate() -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                id=1, email="bench@example.com", username="bench", hashed_password="x"
+            )
+        )
+        await conn.execute(
+            insert(Contact),
+            [{"name": f"聯絡人{i}", "user_id": 1} for i in range(1, CONTACTS + 1)],
+        )
+
+
+async def _conversation(ttl: int) -> dict:
+    """進行一段多回合對話，回傳模型請求數、傳送位元組數與 token 用量"""
+    context_cache.ttl = ttl
+    before = (
+        dict(fake_gemini.stats),
+        context_cache.usage.prompt_tokens,
+        context_cache.usage.cached_tokens,
+    )
+
+    async with SessionLocal() as db:
+        user = await db.get(User, 1)
+        user_context = "## 👤 Contact List\n\n" + (
+            await contact_summary_cache.get_summary(db, 1) or ""
+        )
+        history: list[ChatMessage] = []
+
+        for text in TURNS:
+            message = ChatMessage(role="user", content=text)
+            reply = []
+            async for chunk in gemini_stream_chat_with_tools(
+                history,
+                [message],
+                UnifiedToolHandler(db, user),
+                prompt_manager.get_siri_prompt(),
+                user_context=user_context,
+            ):
+                if chunk.type == "text":
+                    reply.append(chunk.content)
+            history += [message, ChatMessage(role="model", content="".join(reply))]
+
+    return {
+        "requests": fake_gemini.stats["requests"] - before[0]["requests"],
+        "bytes": fake_gemini.stats["bytes"] - before[0]["bytes"],
+        "prompt_tokens": context_cache.usage.prompt_tokens - before[1],
+        "cached_tokens": context_cache.usage.cached_tokens - before[2],
+    }
+
+
+async def main() -> None:
+    await init_db()
+    await _populate()
+
+    print(f"{len(TURNS)} 回合對話（每回合平均值）")
+    print(
+        f"{'模式':<10}{'模型請求':>10}{'傳送 (KB)':>12}"
+        f"{'輸入 token':>12}{'緩存 token':>12}{'全價 token':>12}"
+    )
+    for name, ttl in [("不使用緩存", 0), ("使用緩存", 3600)]:
+        result = await _conversation(ttl)
+        print(
+            f"{name:<10}{result['requests'] / len(TURNS):>10.1f}"
+            f"{result['bytes'] / len(TURNS) / 1024:>12.1f}"
+            f"{result['prompt_tokens'] / len(TURNS):>12.0f}"
+            f"{result['cached_tokens'] / len(TURNS):>12.0f}"
+            f"{(result['prompt_tokens'] - result['cached_tokens']) / len(TURNS):>12.0f}"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    fake_gemini.FIRST_TOKEN_DELAY = 0
+    fake_gemini.TOKEN_DELAY = 0
+
+    with fake_gemini.serve() as base_url:
+        set_gemini_client(fake_gemini.create_client(base_url))
+        asyncio.run(main())
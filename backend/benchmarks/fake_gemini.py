@@ -0,0 +1,214 @@
+"""
+本地假 Gemini 伺服器：實作 generateContent 與 streamGenerateContent，
+以固定延遲模擬模型產生 token 的速度，供效能測試使用
+
+可單獨啟動，讓本地後端不需要 API 金鑰即可使用聊天功能：
+    uv run python -m benchmarks.fake_gemini --port 8001
+    GEMINI_API_KEY=fake GEMINI_BASE_URL=http://127.0.0.1:8001 uv run uvicorn main:app
+
+行為：
+- 使用者訊息包含 TOOL_TRIGGER 時，回傳 get_contacts 函數調用
+- 使用者訊息包含 TOOL_CHAIN_TRIGGER 時，先調用 get_contacts，
+  再於下一回合同時調用多個 get_records_by_contact
+- 最後一則訊息為函數回應且沒有後續調用時，回傳文字總結
+- 其他情況回傳一般文字
+- 支援建立上下文緩存（cachedContents），回應的 usageMetadata 以請求 JSON 長度粗估 token 數，
+  並回報由緩存提供的 token 數
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from google import genai
+from google.genai import types
+
+TOOL_TRIGGER = "聯絡人"
+TOOL_CHAIN_TRIGGER = "比較"
+CHAIN_FAN_OUT = 3
+
+FIRST_TOKEN_DELAY = 0.3  # 秒，模擬模型開始輸出前的延遲
+TOKEN_DELAY = 0.02  # 秒，每個 token 之間的延遲
+TOKENS_PER_REPLY = 40
+
+app = FastAPI()
+
+# 緩存名稱 -> 建立緩存的請求內容與其 token 數
+CACHED_CONTENTS: dict[str, dict] = {}
+# 收到的模型請求數與請求內容總位元組數，供測試比較每次請求傳送的資料量
+stats = {"requests": 0, "bytes": 0}
+
+
+def _count_tokens(value) -> int:
+    """粗估 token 數：約每 4 個字元一個 token"""
+    return len(json.dumps(value, ensure_ascii=False)) // 4
+
+
+def _plan_reply(body: dict) -> list[dict]:
+    """依請求內容決定要回傳的 parts，每個元素對應一個串流片段"""
+    last = body["contents"][-1]
+    function_names = [
+        part["functionResponse"]["name"]
+        for part in last.get("parts", [])
+        if "functionResponse" in part
+    ]
+    user_text = "".join(
+        part.get("text", "")
+        for content in body["contents"]
+        if content.get("role") == "user"
+        for part in content.get("parts", [])
+    )
+
+    if function_names:
+        if (
+            function_names == ["get_contacts"]
+            and TOOL_CHAIN_TRIGGER in user_text
+            and body.get("tools")
+        ):
+            return [
+                {
+                    "functionCall": {
+                        "name": "get_records_by_contact",
+                        "args": {"contact_id": contact_id},
+                    }
+                }
+                for contact_id in range(1, CHAIN_FAN_OUT + 1)
+            ]
+        return [{"text": f"第{i}段 "} for i in range(TOKENS_PER_REPLY)]
+
+    text = "".join(part.get("text", "") for part in last.get("parts", []))
+    if (TOOL_TRIGGER in text or TOOL_CHAIN_TRIGGER in text) and body.get("tools"):
+        return [
+            {"text": "讓我查一下。"},
+            {"functionCall": {"name": "get_contacts", "args": {}}},
+        ]
+
+    return [{"text": f"字{i} "} for i in range(TOKENS_PER_REPLY)]
+
+
+def _usage(body: dict) -> dict:
+    cached_tokens = (
+        CACHED_CONTENTS[body["cachedContent"]]["tokens"]
+        if "cachedContent" in body
+        else 0
+    )
+    prompt_tokens = cached_tokens + _count_prompt_tokens(body)
+    return {"promptTokenCount": prompt_tokens, "cachedContentTokenCount": cached_tokens}
+
+
+def _count_prompt_tokens(body: dict) -> int:
+    return sum(
+        _count_tokens(body.get(key, []))
+        for key in ("contents", "systemInstruction", "tools")
+    )
+
+
+def _response(parts: list[dict], usage: dict) -> dict:
+    return {
+        "candidates": [
+            {"content": {"role": "model", "parts": parts}, "finishReason": "STOP"}
+        ],
+        "usageMetadata": usage,
+    }
+
+
+@app.post("/{api_version}/cachedContents")
+async def create_cached_content(api_version: str, request: Request):
+    body = await request.json()
+    name = f"cachedContents/fake-{len(CACHED_CONTENTS) + 1}"
+    CACHED_CONTENTS[name] = {"body": body, "tokens": _count_prompt_tokens(body)}
+    return {
+        "name": name,
+        "model": body["model"],
+        "usageMetadata": {"totalTokenCount": CACHED_CONTENTS[name]["tokens"]},
+    }
+
+
+@app.post("/{api_version}/models/{model_action}")
+async def models(api_version: str, model_action: str, request: Request):
+    _, _, action = model_action.partition(":")
+    raw = await request.body()
+    body = json.loads(raw)
+    if "cachedContent" in body and body["cachedContent"] not in CACHED_CONTENTS:
+        raise HTTPException(status_code=404, detail="找不到緩存內容")
+
+    stats["requests"] += 1
+    stats["bytes"] += len(raw)
+    usage = _usage(body)
+    if "cachedContent" in body:
+        body = {**CACHED_CONTENTS[body["cachedContent"]]["body"], **body}
+    parts = _plan_reply(body)
+
+    if action == "generateContent":
+        await asyncio.sleep(FIRST_TOKEN_DELAY + TOKEN_DELAY * (len(parts) - 1))
+        return JSONResponse(_response(parts, usage))
+
+    if action == "streamGenerateContent":
+
+        async def events():
+            await asyncio.sleep(FIRST_TOKEN_DELAY)
+            for index, part in enumerate(parts):
+                if index:
+                    await asyncio.sleep(TOKEN_DELAY)
+                yield f"data: {json.dumps(_response([part], usage), ensure_ascii=False)}\r\n\r\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    raise HTTPException(status_code=404, detail=f"不支援的操作: {action}")
+
+
+@contextmanager
+def serve() -> Iterator[str]:
+    """在背景執行緒啟動伺服器，回傳 base URL"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]})
+    thread.start()
+    while not server.started:
+        threading.Event().wait(0.01)
+
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+        sock.close()
+
+
+def create_client(base_url: str) -> genai.Client:
+    """建立連線到假伺服器的 Gemini Client"""
+    return genai.Client(
+        api_key="fake-key", http_options=types.HttpOptions(base_url=base_url)
+    )
+
+
+def main() -> None:
+    global FIRST_TOKEN_DELAY, TOKEN_DELAY, TOKENS_PER_REPLY
+
+    parser = argparse.ArgumentParser(description="本地假 Gemini 伺服器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--first-token-delay", type=float, default=FIRST_TOKEN_DELAY)
+    parser.add_argument("--token-delay", type=float, default=TOKEN_DELAY)
+    parser.add_argument("--tokens", type=int, default=TOKENS_PER_REPLY)
+    args = parser.parse_args()
+
+    FIRST_TOKEN_DELAY = args.first_token_delay
+    TOKEN_DELAY = args.token_delay
+    TOKENS_PER_REPLY = args.tokens
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
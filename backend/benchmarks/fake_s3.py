@@ -0,0 +1,158 @@
+"""
+本地假 S3 (MinIO 相容) 伺服器：在記憶體中保存 bucket 與物件，供頭像相關的效能測試使用
+
+可單獨啟動，讓本地後端不需要 MinIO 即可上傳與讀取頭像：
+    uv run python -m benchmarks.fake_s3 --port 9000
+    S3_ENDPOINT=http://127.0.0.1:9000 uv run uvicorn main:app
+
+支援 minio 客戶端用到的操作：bucket 是否存在、建立 bucket、設定 bucket 政策、查詢區域，
+以及物件的上傳、讀取、查詢與刪除。不驗證簽章；每個請求可加上固定延遲模擬網路往返
+"""
+
+import argparse
+import asyncio
+import hashlib
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+REQUEST_DELAY = 0.0  # 秒，模擬每個請求的網路往返
+
+app = FastAPI()
+
+# bucket 名稱 -> 物件鍵 -> (內容, 內容類型)
+BUCKETS: dict[str, dict[str, tuple[bytes, str]]] = {}
+# 各類請求次數與使用過的用戶端連線，供測試比較請求數與連線重用
+stats: dict = {"requests": 0, "bucket_checks": 0, "connections": set()}
+
+
+def _error(code: str, status_code: int, resource: str) -> Response:
+    body = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f"<Error><Code>{code}</Code><Message>{code}</Message>"
+        f"<Resource>{resource}</Resource><RequestId>fake</RequestId></Error>"
+    )
+    return Response(body, status_code=status_code, media_type="application/xml")
+
+
+def _etag(content: bytes) -> str:
+    return f'"{hashlib.md5(content).hexdigest()}"'
+
+
+async def _record(request: Request) -> None:
+    stats["requests"] += 1
+    stats["connections"].add(request.client)
+    if REQUEST_DELAY:
+        await asyncio.sleep(REQUEST_DELAY)
+
+
+@app.api_route("/{bucket}", methods=["GET", "HEAD", "PUT"])
+async def bucket_operation(bucket: str, request: Request):
+    await _record(request)
+
+    if "location" in request.query_params:
+        return Response(
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<LocationConstraint xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            "us-east-1</LocationConstraint>",
+            media_type="application/xml",
+        )
+
+    if request.method == "HEAD":
+        stats["bucket_checks"] += 1
+        return Response(status_code=200 if bucket in BUCKETS else 404)
+
+    if request.method == "PUT":
+        await request.body()
+        if "policy" in request.query_params:
+            return Response(status_code=204)
+        BUCKETS.setdefault(bucket, {})
+        return Response(status_code=200)
+
+    return _error("NotImplemented", 501, f"/{bucket}")
+
+
+@app.api_route("/{bucket}/{key:path}", methods=["GET", "HEAD", "PUT", "DELETE"])
+async def object_operation(bucket: str, key: str, request: Request):
+    await _record(request)
+
+    objects = BUCKETS.get(bucket)
+    if objects is None:
+        return _error("NoSuchBucket", 404, f"/{bucket}")
+
+    if request.method == "PUT":
+        content = await request.body()
+        objects[key] = (
+            content,
+            request.headers.get("content-type", "application/octet-stream"),
+        )
+        return Response(status_code=200, headers={"ETag": _etag(content)})
+
+    if request.method == "DELETE":
+        objects.pop(key, None)
+        return Response(status_code=204)
+
+    if key not in objects:
+        if request.method == "HEAD":
+            return Response(status_code=404)
+        return _error("NoSuchKey", 404, f"/{bucket}/{key}")
+
+    content, content_type = objects[key]
+    headers = {"ETag": _etag(content), "Content-Length": str(len(content))}
+    if request.method == "HEAD":
+        return Response(status_code=200, headers=headers, media_type=content_type)
+    return Response(content, headers=headers, media_type=content_type)
+
+
+def reset() -> None:
+    """清除所有 bucket 與統計"""
+    BUCKETS.clear()
+    reset_stats()
+
+
+def reset_stats() -> None:
+    """只清除統計，保留 bucket 與物件"""
+    stats.update(requests=0, bucket_checks=0, connections=set())
+
+
+@contextmanager
+def serve() -> Iterator[str]:
+    """在背景執行緒啟動伺服器，回傳 endpoint URL"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]})
+    thread.start()
+    while not server.started:
+        threading.Event().wait(0.01)
+
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+        sock.close()
+
+
+def main() -> None:
+    global REQUEST_DELAY
+
+    parser = argparse.ArgumentParser(description="本地假 S3 (MinIO 相容) 伺服器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--request-delay", type=float, default=REQUEST_DELAY)
+    args = parser.parse_args()
+
+    REQUEST_DELAY = args.request_delay
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
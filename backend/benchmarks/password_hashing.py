@@ -0,0 +1,67 @@
+"""
+密碼雜湊對事件迴圈的影響：模擬活動開始時的登入尖峰，同時以固定間隔的心跳代表進行中的聊天串流，
+比較在事件迴圈中直接驗證 bcrypt 密碼與使用密碼雜湊執行緒池時，心跳的最大延遲與登入耗時
+
+使用方式：
+    uv run python -m benchmarks.password_hashing [同時登入數]
+"""
+
+import asyncio
+import sys
+import time
+from typing import Awaitable, Callable, List
+
+from src.password_hasher import PASSWORD_HASH_WORKERS, password_hasher
+
+PASSWORD = "correct horse battery staple"
+# 聊天串流每個 token 之間的間隔
+TICK_SECONDS = 0.01
+
+
+async def _heartbeat(stop: asyncio.Event, lags: List[float]) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + TICK_SECONDS
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - expected)
+
+
+async def _burst(
+    logins: int, verify: Callable[[str, str], Awaitable[bool]], hashed: str
+) -> tuple[float, float]:
+    stop = asyncio.Event()
+    lags: List[float] = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+    await asyncio.sleep(TICK_SECONDS * 5)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify(PASSWORD, hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    assert all(results)
+
+    stop.set()
+    await heartbeat
+    return max(lags), elapsed
+
+
+async def _verify_inline(password: str, hashed: str) -> bool:
+    # 舊版：在 async 路由中同步呼叫 passlib
+    return password_hasher.context.verify(password, hashed)
+
+
+async def main(logins: int) -> None:
+    hashed = await password_hasher.hash(PASSWORD)
+
+    print(f"{logins} 個同時登入，執行緒池 {PASSWORD_HASH_WORKERS} 個 worker")
+    print(f"{'版本':<16}{'心跳最大延遲 (ms)':>20}{'全部登入完成 (ms)':>20}")
+    for name, verify in [
+        ("事件迴圈中驗證", _verify_inline),
+        ("執行緒池驗證", password_hasher.verify),
+    ]:
+        max_lag, elapsed = await _burst(logins, verify, hashed)
+        print(f"{name:<16}{max_lag * 1000:>20.1f}{elapsed * 1000:>20.1f}")
+
+    print(f"執行緒池統計: {password_hasher.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
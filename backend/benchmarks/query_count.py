@@ -0,0 +1,173 @@
+"""
+查詢次數檢查：計算每次 AI 工具調用與列表路由執行的 SQL 語句數，
+若任何一次調用超過固定上限（例如對每筆記錄逐一載入聯絡人的 N+1 查詢）則以非零狀態碼結束
+
+使用方式：
+    uv run python -m benchmarks.query_count
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, List
+
+BENCH_DIR = tempfile.mkdtemp(prefix="sitcon-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DIR}/query_count.db"
+
+from sqlalchemy import event, insert  # noqa: E402
+
+from src.ai.tools import ToolContext, tool_registry  # noqa: E402
+from src.auth import get_user_by_username  # noqa: E402
+from src.contact_summary import contact_summary_cache  # noqa: E402
+from src.database import SessionLocal, engine, init_db  # noqa: E402
+from src.models import Contact, Record, RecordCategory, User  # noqa: E402
+from src.routers import record as record_router  # noqa: E402
+from src.search import init_search_index  # noqa: E402
+
+CONTACTS = 20
+RECORDS = 400
+# 單次工具調用或列表請求允許的 SQL 語句數上限，與結果筆數無關
+MAX_QUERIES = 4
+
+_statements: List[str] | None = None
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    if _statements is not None:
+        _statements.append(statement)
+
+
+@contextmanager
+def count_queries() -> Iterator[List[str]]:
+    """記錄區塊內執行的所有 SQL 語句"""
+    global _statements
+
+    _statements = []
+    try:
+        yield _statements
+    finally:
+        _statements = None
+
+
+async def _seed() -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                id=1, email="alice@example.com", username="alice", hashed_password="x"
+            )
+        )
+        await conn.execute(
+            insert(Contact),
+            [
+                {"id": i, "name": f"聯絡人{i}", "description": "同學", "user_id": 1}
+                for i in range(1, CONTACTS + 1)
+            ],
+        )
+        await conn.execute(
+            insert(Record),
+            [
+                {
+                    "category": list(RecordCategory)[i % len(RecordCategory)],
+                    "content": f"一起去吃拉麵 {i}",
+                    "contact_id": i % CONTACTS + 1,
+                }
+                for i in range(RECORDS)
+            ],
+        )
+
+
+async def _run() -> List[tuple[str, int]]:
+    results = []
+
+    async with SessionLocal() as db:
+        user = await get_user_by_username(db, "alice")
+        assert user is not None
+
+        tool_calls = [
+            ("get_contacts", {"limit": CONTACTS}),
+            ("get_contact", {"contact_id": 2}),
+            ("get_records", {"limit": 100}),
+            ("get_records", {"contact_id": 2, "category": "Memories"}),
+            ("get_records", {"search": "吃拉麵", "limit": 100}),
+            ("get_records_by_contact", {"contact_id": 2, "limit": 100}),
+            ("get_record", {"record_id": 1}),
+            ("create_record", {"contact_id": 2, "category": "Plan", "content": "x"}),
+            ("update_record", {"record_id": 1, "content": "更新"}),
+            ("delete_record", {"record_id": 1}),
+            ("create_contact", {"name": "新朋友"}),
+            ("update_contact", {"contact_id": 4, "name": "新名字"}),
+            ("delete_contact", {"contact_id": 4}),
+        ]
+        for name, args in tool_calls:
+            # 直接執行工具函數：每次使用新的讀取緩存，且隱式延遲載入的錯誤不會被吞掉
+            tool = tool_registry.get(name)
+            assert tool is not None
+            with count_queries() as statements:
+                await tool(ToolContext(db, user), args)
+            results.append((f"tool {name} {args}", len(statements)))
+
+        with count_queries() as statements:
+            await record_router.get_records(
+                skip=0,
+                limit=100,
+                contact_id=None,
+                category=None,
+                search=None,
+                cursor=None,
+                include_total=True,
+                db=db,
+                current_user=user,
+            )
+        results.append(("GET /records/", len(statements)))
+
+        with count_queries() as statements:
+            await record_router.get_records_by_contact(
+                contact_id=2,
+                skip=0,
+                limit=100,
+                category=None,
+                search=None,
+                cursor=None,
+                include_total=True,
+                db=db,
+                current_user=user,
+            )
+        results.append(("GET /records/by-contact/{id}", len(statements)))
+
+        contact_summary_cache.invalidate(user.id)  # type: ignore
+        with count_queries() as statements:
+            await contact_summary_cache.get_summary(db, user.id)  # type: ignore
+        results.append(("chat system prompt", len(statements)))
+
+    return results
+
+
+async def main() -> int:
+    await init_db()
+    await init_search_index()
+    await _seed()
+
+    try:
+        results = await _run()
+    finally:
+        await engine.dispose()
+
+    failures = [(label, count) for label, count in results if count > MAX_QUERIES]
+    print(f"{RECORDS} 筆記錄，每次調用上限 {MAX_QUERIES} 條查詢")
+    for label, count in results:
+        mark = "✗" if count > MAX_QUERIES else "✓"
+        print(f"  {mark} {count:>3}  {label}")
+
+    if failures:
+        print(f"{len(failures)} 次調用超過查詢上限")
+        return 1
+
+    print("所有調用皆在查詢上限內")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
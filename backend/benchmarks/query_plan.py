@@ -0,0 +1,355 @@
+"""
+查詢計畫檢查：執行所有路由與 AI 工具的查詢，對每條 SQL 執行 EXPLAIN QUERY PLAN，
+若任何查詢對資料表做全表掃描則以非零狀態碼結束
+
+使用方式：
+    uv run python -m benchmarks.query_plan
+"""
+
+import asyncio
+import os
+import re
+import sys
+import tempfile
+
+BENCH_DIR = tempfile.mkdtemp(prefix="sitcon-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DIR}/query_plan.db"
+
+from fastapi import HTTPException  # noqa: E402
+from google.genai import types  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from src.ai.handlers.unified import UnifiedToolHandler  # noqa: E402
+from src.ai.history import load_all_messages, load_history, save_messages  # noqa: E402
+from src.auth import (  # noqa: E402
+    create_refresh_token,
+    get_user_by_email,
+    get_user_by_username,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
+from src.contact_summary import contact_summary_cache  # noqa: E402
+from src.database import Base, SessionLocal, engine, init_db  # noqa: E402
+from src.models import Contact, Record, RecordCategory, User  # noqa: E402
+from src.routers import chat as chat_router  # noqa: E402
+from src.routers import contact as contact_router  # noqa: E402
+from src.routers import record as record_router  # noqa: E402
+from src.schemas import (  # noqa: E402
+    ChatMessage,
+    ChatSessionCreate,
+    ContactUpdate,
+    RecordCategoryEnum,
+    RecordCreate,
+    RecordUpdate,
+)
+from src.search import init_search_index  # noqa: E402
+
+TABLES = {table.name for table in Base.metadata.sorted_tables}
+SCAN_PATTERN = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+
+captured: list[tuple[str, str, tuple]] = []
+current_label = "setup"
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _capture(conn, cursor, statement, parameters, context, executemany):
+    if executemany or statement.lstrip().upper().startswith("EXPLAIN"):
+        return
+    if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+        captured.append((current_label, statement, tuple(parameters or ())))
+
+
+async def _seed() -> None:
+    async with engine.begin() as conn:
+        for user_id, username in [(1, "alice"), (2, "bob")]:
+            await conn.execute(
+                insert(User).values(
+                    id=user_id,
+                    email=f"{username}@example.com",
+                    username=username,
+                    hashed_password="x",
+                )
+            )
+        await conn.execute(
+            insert(Contact),
+            [
+                {
+                    "id": i,
+                    "name": f"聯絡人{i}",
+                    "description": "同學",
+                    "user_id": i % 2 + 1,
+                }
+                for i in range(1, 21)
+            ],
+        )
+        await conn.execute(
+            insert(Record),
+            [
+                {
+                    "category": list(RecordCategory)[i % len(RecordCategory)],
+                    "content": f"一起去吃拉麵 {i}",
+                    "contact_id": i % 20 + 1,
+                }
+                for i in range(200)
+            ],
+        )
+
+
+async def _run_queries() -> None:
+    global current_label
+
+    async with SessionLocal() as db:
+        current_label = "auth"
+        user = await get_user_by_username(db, "alice")
+        await get_user_by_email(db, "alice@example.com")
+        assert user is not None
+
+        current_label = "refresh tokens"
+        refresh_token = await create_refresh_token(db, user)
+        rotated = await rotate_refresh_token(db, refresh_token)
+        assert rotated is not None
+        await rotate_refresh_token(db, refresh_token)
+        await revoke_refresh_token(db, rotated[1])
+
+        current_label = "chat system prompt"
+        await contact_summary_cache.get_summary(db, user.id)
+
+        current_label = "GET /contacts/"
+        page = await contact_router.get_contacts(
+            skip=0,
+            limit=5,
+            search=None,
+            cursor=None,
+            include_total=True,
+            db=db,
+            current_user=user,
+        )
+        await contact_router.get_contacts(
+            skip=0,
+            limit=5,
+            search=None,
+            cursor=page.next_cursor,
+            include_total=False,
+            db=db,
+            current_user=user,
+        )
+        for search in ["聯絡", "聯絡人1"]:
+            await contact_router.get_contacts(
+                skip=0,
+                limit=5,
+                search=search,
+                cursor=None,
+                include_total=True,
+                db=db,
+                current_user=user,
+            )
+
+        current_label = "contact by id"
+        await contact_router.get_contact(contact_id=2, db=db, current_user=user)
+        await contact_router.update_contact(
+            contact_id=2,
+            contact_update=ContactUpdate(description="新描述"),
+            db=db,
+            current_user=user,
+        )
+
+        current_label = "GET /records/"
+        page = await record_router.get_records(
+            skip=0,
+            limit=5,
+            contact_id=None,
+            category=None,
+            search=None,
+            cursor=None,
+            include_total=True,
+            db=db,
+            current_user=user,
+        )
+        await record_router.get_records(
+            skip=0,
+            limit=5,
+            contact_id=2,
+            category=RecordCategoryEnum.MEMORIES,
+            search=None,
+            cursor=page.next_cursor,
+            include_total=True,
+            db=db,
+            current_user=user,
+        )
+        await record_router.get_records(
+            skip=0,
+            limit=5,
+            contact_id=None,
+            category=None,
+            search="吃拉麵",
+            cursor=None,
+            include_total=True,
+            db=db,
+            current_user=user,
+        )
+
+        current_label = "GET /records/by-contact/{id}"
+        page = await record_router.get_records_by_contact(
+            contact_id=2,
+            skip=0,
+            limit=3,
+            category=None,
+            search=None,
+            cursor=None,
+            include_total=True,
+            db=db,
+            current_user=user,
+        )
+        await record_router.get_records_by_contact(
+            contact_id=2,
+            skip=0,
+            limit=3,
+            category=RecordCategoryEnum.PLAN,
+            search=None,
+            cursor=page.next_cursor,
+            include_total=True,
+            db=db,
+            current_user=user,
+        )
+
+        current_label = "record by id"
+        created = await record_router.create_record(
+            record=RecordCreate(
+                contact_id=2, category=RecordCategoryEnum.PLAN, content="下週見面"
+            ),
+            db=db,
+            current_user=user,
+        )
+        await record_router.get_record(record_id=created.id, db=db, current_user=user)
+        await record_router.update_record(
+            record_id=created.id,
+            record_update=RecordUpdate(content="改期"),
+            db=db,
+            current_user=user,
+        )
+        await record_router.delete_record(
+            record_id=created.id, db=db, current_user=user
+        )
+
+        current_label = "avatar lookup"
+        try:
+            await contact_router.get_contact_avatar_image(
+                contact_id=2,
+                size=None,
+                redirect=False,
+                accept=None,
+                if_none_match=None,
+                db=db,
+                current_user=user,
+            )
+        except HTTPException:
+            pass
+
+        current_label = "avatar urls"
+        await contact_router.get_contact_avatar_urls(
+            contact_ids=[1, 2, 3],
+            size=None,
+            image_format="jpeg",
+            db=db,
+            current_user=user,
+        )
+
+        handler = UnifiedToolHandler(db, user)
+        tool_calls = [
+            ("get_contacts", {}),
+            ("get_contacts", {"search": "聯絡人1"}),
+            ("get_contact", {"contact_id": 2}),
+            ("get_records", {}),
+            ("get_records", {"contact_id": 2, "category": "Memories"}),
+            ("get_records", {"search": "吃拉麵"}),
+            ("get_records_by_contact", {"contact_id": 2}),
+            ("get_records_by_contact", {"contact_id": 2, "category": "Plan"}),
+            ("create_record", {"contact_id": 2, "category": "Plan", "content": "x"}),
+            ("get_record", {"record_id": 1}),
+            ("update_record", {"record_id": 1, "content": "更新"}),
+            ("delete_record", {"record_id": 1}),
+            ("create_contact", {"name": "新朋友"}),
+            ("update_contact", {"contact_id": 4, "name": "新名字"}),
+            ("delete_contact", {"contact_id": 4}),
+        ]
+        for name, args in tool_calls:
+            current_label = f"tool {name}"
+            await handler.handle_tool_call(types.FunctionCall(name=name, args=args))
+
+        current_label = "chat sessions"
+        session = await chat_router.create_chat_session(
+            session=ChatSessionCreate(title="測試"), db=db, current_user=user
+        )
+        await save_messages(
+            db,
+            session,
+            [
+                ChatMessage(role="user", content="你好"),
+                ChatMessage(role="model", content="你好！"),
+            ],
+        )
+        await load_history(db, session)
+        await load_all_messages(db, session)
+        await chat_router.get_chat_sessions(skip=0, limit=20, db=db, current_user=user)
+        await chat_router.get_chat_session(
+            session_id=session.id, db=db, current_user=user
+        )
+        await chat_router.delete_chat_session(
+            session_id=session.id, db=db, current_user=user
+        )
+
+        current_label = "DELETE /contacts/{id}"
+        await contact_router.delete_contact(contact_id=6, db=db, current_user=user)
+
+
+async def _explain() -> list[str]:
+    failures = []
+    seen = set()
+
+    async with engine.connect() as conn:
+        for label, statement, parameters in captured:
+            if (label, statement) in seen:
+                continue
+            seen.add((label, statement))
+
+            plan = (
+                await conn.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                )
+            ).all()
+
+            for row in plan:
+                detail = row[-1]
+                match = SCAN_PATTERN.match(detail)
+                if match and match.group(1) in TABLES:
+                    failures.append(
+                        f"[{label}] {detail}\n    {' '.join(statement.split())}"
+                    )
+
+    return failures
+
+
+async def main() -> int:
+    await init_db()
+    await init_search_index()
+    await _seed()
+    captured.clear()
+
+    await _run_queries()
+    failures = await _explain()
+    await engine.dispose()
+
+    statements = len({(label, statement) for label, statement, _ in captured})
+    print(f"檢查了 {statements} 條查詢")
+    if failures:
+        print(f"發現 {len(failures)} 個全表掃描：")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+
+    print("所有查詢皆使用索引")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
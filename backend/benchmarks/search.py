@@ -0,0 +1,117 @@
+"""
+全文搜索效能測試：比較 LIKE '%x%' 與 FTS5 trigram 索引
+
+使用方式：
+    uv run python -m benchmarks.search [記錄數量]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = tempfile.mkdtemp(prefix="sitcon-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DIR}/search.db"
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from src.database import engine, init_db  # noqa: E402
+from src.models import Contact, Record, RecordCategory, User  # noqa: E402
+from src.search import init_search_index, search_records  # noqa: E402
+
+VOCABULARY_SIZE = 50_000
+BATCH_SIZE = 10_000
+ROUNDS = 5
+
+
+def _build_vocabulary(rng: random.Random) -> list[str]:
+    """
+    隨機產生 2~4 字的中文詞彙，模擬繁體中文記錄內容
+    """
+    return [
+        "".join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(rng.randint(2, 4)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+
+
+def _random_content(rng: random.Random, vocabulary: list[str]) -> str:
+    return "，".join(rng.choice(vocabulary) for _ in range(rng.randint(3, 12)))
+
+
+async def _populate(total: int, vocabulary: list[str]) -> None:
+    rng = random.Random(2025)
+    categories = list(RecordCategory)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User).values(
+                id=1, email="bench@example.com", username="bench", hashed_password="x"
+            )
+        )
+        await conn.execute(
+            insert(Contact),
+            [{"id": i, "name": f"聯絡人{i}", "user_id": 1} for i in range(1, 101)],
+        )
+
+        for start in range(0, total, BATCH_SIZE):
+            rows = [
+                {
+                    "category": rng.choice(categories),
+                    "content": _random_content(rng, vocabulary),
+                    "contact_id": rng.randint(1, 100),
+                }
+                for _ in range(min(BATCH_SIZE, total - start))
+            ]
+            await conn.execute(insert(Record), rows)
+
+
+async def _time_query(query) -> tuple[float, int]:
+    best = float("inf")
+    count = 0
+    async with engine.connect() as conn:
+        for _ in range(ROUNDS):
+            started = time.perf_counter()
+            count = (await conn.execute(query)).scalar_one()
+            best = min(best, time.perf_counter() - started)
+    return best, count
+
+
+async def main(total: int) -> None:
+    await init_db()
+    await init_search_index()
+
+    rng = random.Random(0)
+    vocabulary = _build_vocabulary(rng)
+    queries = [word for word in rng.sample(vocabulary, 20) if len(word) >= 3][:4]
+    queries += ["拉麵", "不存在的字串"]
+
+    started = time.perf_counter()
+    await _populate(total, vocabulary)
+    print(
+        f"寫入 {total:,} 筆記錄（含索引觸發器）: {time.perf_counter() - started:.1f}s"
+    )
+
+    base = select(Record.id).join(Contact).where(Contact.user_id == 1)
+    print("（少於三個字元的查詢無法使用 trigram 索引，會退回 LIKE）")
+    print(f"{'查詢':<14}{'LIKE (ms)':>12}{'FTS5 (ms)':>12}{'筆數':>10}")
+    for term in queries:
+        like_query = select(func.count()).select_from(
+            base.where(Record.content.contains(term)).subquery()
+        )
+        fts_query = select(func.count()).select_from(
+            search_records(base, term).subquery()
+        )
+        like_time, like_count = await _time_query(like_query)
+        fts_time, fts_count = await _time_query(fts_query)
+        assert like_count == fts_count, (term, like_count, fts_count)
+        print(
+            f"{term:<14}{like_time * 1000:>12.1f}{fts_time * 1000:>12.1f}{fts_count:>10,}"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
@@ -0,0 +1,67 @@
+"""
+工具設定開銷微基準測試：比較每次聊天請求重新建立工具宣告、路由表與緩存版本，
+以及使用啟動時建立的工具註冊表與分派表的耗時
+
+使用方式：
+    uv run python -m benchmarks.tool_setup
+"""
+
+import hashlib
+import timeit
+
+from google.genai import types
+
+from src.ai.context_cache import ContextCache
+from src.ai.tools import tool_registry
+from src.prompt_manager import prompt_manager
+
+NUMBER = 2000
+# 一次聊天請求中平均的工具調用次數
+TOOL_CALLS = 4
+
+SYSTEM_PROMPT = prompt_manager.get_siri_prompt()
+TOOL_NAMES = list(tool_registry.declarations)
+# 舊版每次請求以建構子重新建立每個工具宣告，這裡以相同內容的字典重建模擬
+DECLARATIONS = [
+    declaration.model_dump(exclude_none=True)
+    for declaration in tool_registry.declarations.values()
+]
+
+
+def legacy_request() -> None:
+    tools = [
+        types.Tool(function_declarations=[types.FunctionDeclaration(**declaration)])
+        for declaration in DECLARATIONS
+    ]
+    digest = hashlib.sha256(SYSTEM_PROMPT.encode())
+    for tool in tools:
+        digest.update(tool.model_dump_json(exclude_none=True).encode())
+    digest.hexdigest()
+
+    for i in range(TOOL_CALLS):
+        # 舊版每次調用時重新建立路由集合與處理方法字典
+        handlers = {name: name for name in TOOL_NAMES}
+        handlers.get(TOOL_NAMES[i % len(TOOL_NAMES)])
+
+
+def current_request() -> None:
+    list(tool_registry.tools)
+    ContextCache._version(SYSTEM_PROMPT, tool_registry)
+
+    for i in range(TOOL_CALLS):
+        tool_registry.get(TOOL_NAMES[i % len(TOOL_NAMES)])
+
+
+def main() -> None:
+    print(f"{len(TOOL_NAMES)} 個工具，每次請求 {TOOL_CALLS} 次工具調用")
+    print(f"{'版本':<16}{'每次請求 (µs)':>16}")
+    for name, function in [
+        ("每次重新建立", legacy_request),
+        ("啟動時建立", current_request),
+    ]:
+        elapsed = min(timeit.repeat(function, number=NUMBER, repeat=5))
+        print(f"{name:<16}{elapsed / NUMBER * 1_000_000:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,47 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.database import Base, engine
+from src.ai.context_cache import context_cache
+from src.database import engine, init_db
+from src.file_utils import (
+    avatar_image_pool,
+    ensure_bucket_exists,
+    object_storage_pool,
+)
+from src.password_hasher import password_hasher
 from src.routers import auth, chat, contact, record
+from src.search import init_search_index
 
 load_dotenv()
 
-# 建立資料庫表
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 建立資料庫表
+    await init_db()
+    await init_search_index()
+    # 啟動時確認頭像 bucket 存在；MinIO 尚未就緒時於首次上傳再檢查
+    try:
+        await asyncio.to_thread(
+            ensure_bucket_exists, os.getenv("S3_BUCKET", "my-bucket")
+        )
+    except Exception as e:
+        print(f"MinIO bucket 檢查失敗: {e}")
+    yield
+    avatar_image_pool.shutdown()
+    await engine.dispose()
+
 
 app = FastAPI(
     title="SITCON Camp 2025 Backend",
     description="SITCON Camp 2025 後端 API",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "*").split(",")
@@ -55,7 +81,13 @@ async def health_check():
     """
     健康檢查端點
     """
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "password_hashing": password_hasher.stats(),
+        "avatar_processing": avatar_image_pool.stats(),
+        "object_storage": object_storage_pool.stats(),
+        "context_cache": context_cache.stats(),
+    }
 
 
 @app.get("/api/v1/hello")
@@ -1,15 +1,31 @@
 """聊天相關功能"""
 
-from typing import TYPE_CHECKING, AsyncGenerator, List, Optional, Sequence, Union
+import asyncio
+import logging
+import os
+from typing import TYPE_CHECKING, AsyncGenerator, List, Optional, Union
 
 from google.genai import types
 
 from ..schemas import ChatMessage, ChatStreamChunk, ToolCall
 from .client import MODEL_ID, build_message_contents, get_gemini_client
+from .context_cache import TokenUsage, context_cache
+from .tools import tool_registry
 
 if TYPE_CHECKING:
     from .handlers.unified import UnifiedToolHandler
 
+# 工具調用回合上限，達到上限後要求模型直接以文字回覆
+CHAT_MAX_TOOL_ITERATIONS = int(os.getenv("CHAT_MAX_TOOL_ITERATIONS", "5"))
+# 每回合（模型回應 + 工具執行）的時間預算，單位為秒
+CHAT_TOOL_TURN_BUDGET = float(os.getenv("CHAT_TOOL_TURN_BUDGET", "20"))
+
+# 發生錯誤或模型沒有回應時送出的替代回覆，不屬於對話內容
+ERROR_REPLY = "抱歉，發生錯誤，請稍後再試。"
+EMPTY_REPLY = "無法產生回應"
+
+logger = logging.getLogger(__name__)
+
 
 async def gemini_stream_chat(
     history: List[ChatMessage],
@@ -39,7 +55,7 @@ async def gemini_stream_chat(
 
     except Exception as e:
         print(f"聊天串流錯誤: {e}")
-        yield "抱歉，發生錯誤，請稍後再試。"
+        yield ERROR_REPLY
 
 
 async def gemini_stream_chat_with_tools(
@@ -48,115 +64,158 @@ async def gemini_stream_chat_with_tools(
     tool_handler: "UnifiedToolHandler",
     system_prompt: Optional[str] = None,
     config: Optional[types.GenerateContentConfig] = None,
+    max_iterations: int = CHAT_MAX_TOOL_ITERATIONS,
+    turn_budget: float = CHAT_TOOL_TURN_BUDGET,
+    user_context: Optional[str] = None,
 ) -> AsyncGenerator[Union[str, ChatStreamChunk], None]:
-    """帶工具功能的 Gemini 聊天"""
-    from .handlers.unified import UnifiedToolHandler
+    """
+    帶工具功能的 Gemini 聊天，模型可連續多回合調用工具
 
-    contents = build_message_contents(history, messages, system_prompt)
-    tools = UnifiedToolHandler.create_all_tools()
+    system_prompt 與工具宣告為所有使用者共用的靜態內容，會放入上下文緩存；
+    user_context（例如聯絡人清單）因人而異，每次請求放在對話開頭傳送
+    """
+    contents = build_message_contents(history, messages, user_context)
+    tools = list(tool_registry.tools)
 
     if not config:
         config = types.GenerateContentConfig(
             temperature=0.7,
             candidate_count=1,
             max_output_tokens=2048,
-            tools=tools,
         )
 
-    try:
-        response = await get_gemini_client().aio.models.generate_content(
-            model=MODEL_ID, contents=contents, config=config
-        )
+    uncached_config = config.model_copy(
+        update={"system_instruction": system_prompt, "tools": tools}
+    )
+    # 使用緩存時不能再指定 system_instruction 與 tools，
+    # 最後一回合需要移除工具，因此改為不使用緩存
+    final_config = uncached_config.model_copy(update={"tools": None})
+
+    cache_name = (
+        await context_cache.get(system_prompt, tool_registry) if system_prompt else None
+    )
+    if cache_name:
+        config = config.model_copy(update={"cached_content": cache_name})
+    else:
+        config = uncached_config
 
-        async for chunk in _process_tool_response(response, tool_handler, contents):
+    usage = TokenUsage()
+    emitted = False
+    try:
+        async for chunk in _run_tool_loop(
+            contents,
+            config,
+            final_config,
+            tool_handler,
+            max_iterations,
+            turn_budget,
+            usage,
+        ):
+            emitted = True
             yield chunk
 
     except Exception as e:
         print(f"工具聊天錯誤: {e}")
+        if cache_name:
+            context_cache.invalidate(cache_name)
+
+        if emitted:
+            # 已經送出部分回應，不再降級以免內容重複
+            yield ChatStreamChunk(type="text", content=ERROR_REPLY, tool_call=None)
+            return
+
         # 降級到普通聊天
-        async for chunk in gemini_stream_chat(history, messages, system_prompt):
+        prompt = "\n\n".join(filter(None, [system_prompt, user_context]))
+        async for chunk in gemini_stream_chat(history, messages, prompt):
             yield ChatStreamChunk(type="text", content=chunk, tool_call=None)
 
+    finally:
+        context_cache.record(usage)
+        logger.debug("聊天請求 %s", usage)
 
-async def _process_tool_response(
-    response, tool_handler: "UnifiedToolHandler", contents: List[types.Content]
+
+async def _run_tool_loop(
+    contents: List[types.Content],
+    config: types.GenerateContentConfig,
+    final_config: types.GenerateContentConfig,
+    tool_handler: "UnifiedToolHandler",
+    max_iterations: int,
+    turn_budget: float,
+    usage: TokenUsage,
 ) -> AsyncGenerator[ChatStreamChunk, None]:
-    """處理工具回應"""
-    if not response.candidates:
-        yield ChatStreamChunk(type="text", content="無法產生回應", tool_call=None)
-        return
-
-    candidate = response.candidates[0]
-    if not candidate.content or not candidate.content.parts:
-        yield ChatStreamChunk(type="text", content="無法產生回應", tool_call=None)
-        return
-
-    function_responses = []
-    has_function_calls = False
-
-    # 處理每個部分
-    for part in candidate.content.parts:
-        if hasattr(part, "function_call") and part.function_call:
-            has_function_calls = True
-            tool_result, tool_info = await tool_handler.handle_tool_call(
-                part.function_call
-            )
+    """
+    執行工具調用迴圈：每回合串流模型回應並轉發文字，再執行該回合的所有工具調用，
+    直到模型不再調用工具；最後一回合改用不含工具的 final_config，讓模型以文字總結。
+    每次模型呼叫的輸入 token 用量累計到 usage
+    """
+    loop = asyncio.get_running_loop()
+    conversation = list(contents)
+
+    for iteration in range(max_iterations + 1):
+        turn_started = loop.time()
+        use_tools = iteration < max_iterations
+
+        stream = await get_gemini_client().aio.models.generate_content_stream(
+            model=MODEL_ID,
+            contents=conversation,
+            config=config if use_tools else final_config,
+        )
+
+        model_parts: List[types.Part] = []
+        function_calls: List[types.FunctionCall] = []
+        usage_metadata = None
+
+        async for response in stream:
+            # 串流中每個片段都帶有到目前為止的用量，只需保留最後一個
+            usage_metadata = response.usage_metadata or usage_metadata
+            if not response.candidates:
+                continue
+
+            candidate = response.candidates[0]
+            if not candidate.content or not candidate.content.parts:
+                continue
+
+            for part in candidate.content.parts:
+                model_parts.append(part)
 
+                if part.function_call:
+                    function_calls.append(part.function_call)
+                elif part.text:
+                    yield ChatStreamChunk(
+                        type="text", content=part.text, tool_call=None
+                    )
+
+        usage.add(usage_metadata)
+
+        if not model_parts:
+            if iteration == 0:
+                yield ChatStreamChunk(type="text", content=EMPTY_REPLY, tool_call=None)
+            return
+
+        if not function_calls or not use_tools:
+            return
+
+        results = await tool_handler.handle_tool_calls(
+            function_calls, timeout=turn_budget - (loop.time() - turn_started)
+        )
+
+        function_responses = []
+        for function_call, (tool_result, tool_info) in zip(function_calls, results):
             yield ChatStreamChunk(
                 type="tool_call",
                 content=tool_result,
                 tool_call=ToolCall(**tool_info),
             )
 
-            if part.function_call.name:
+            if function_call.name:
                 function_responses.append(
                     types.Part.from_function_response(
-                        name=part.function_call.name, response={"result": tool_result}
+                        name=function_call.name, response={"result": tool_result}
                     )
                 )
-        elif hasattr(part, "text") and part.text:
-            yield ChatStreamChunk(type="text", content=part.text, tool_call=None)
-
-    # 如果有工具調用，取得最終回應
-    if has_function_calls and function_responses:
-        async for chunk in _get_final_response(contents, candidate, function_responses):
-            yield chunk
 
+        if not function_responses:
+            return
 
-async def _get_final_response(
-    contents: List[types.Content], candidate, function_responses: List[types.Part]
-) -> AsyncGenerator[ChatStreamChunk, None]:
-    """取得工具調用後的最終回應"""
-    conversation_parts = list(contents)
-    conversation_parts.append(
-        types.Content(role="model", parts=list(candidate.content.parts))
-    )
-    conversation_parts.append(types.Content(role="function", parts=function_responses))
-
-    try:
-        final_response = await get_gemini_client().aio.models.generate_content(
-            model=MODEL_ID,
-            contents=conversation_parts,
-            config=types.GenerateContentConfig(
-                temperature=0.7,
-                candidate_count=1,
-                max_output_tokens=2048,
-            ),
-        )
-
-        if (
-            final_response.candidates
-            and final_response.candidates[0].content
-            and final_response.candidates[0].content.parts
-        ):
-            for part in final_response.candidates[0].content.parts:
-                if hasattr(part, "text") and part.text:
-                    yield ChatStreamChunk(
-                        type="text", content=part.text, tool_call=None
-                    )
-
-    except Exception as e:
-        print(f"取得最終回應錯誤: {e}")
-        yield ChatStreamChunk(
-            type="text", content="處理工具回應時發生錯誤", tool_call=None
-        )
+        conversation.append(types.Content(role="model", parts=model_parts))
+        conversation.append(types.Content(role="function", parts=function_responses))
@@ -7,6 +7,7 @@ from typing import List, Optional
 from google import genai
 from google.genai import types
 
+from ..attachments import attachment_store
 from ..schemas import ChatMessage, ImageContent, TextContent
 
 _client = None
@@ -27,10 +28,20 @@ def get_gemini_client() -> genai.Client:
             "請設定環境變數或從 https://aistudio.google.com/app/apikey 取得 API 金鑰"
         )
 
-    _client = genai.Client(api_key=api_key)
+    # 可指向相容的本地伺服器，供效能測試使用
+    base_url = os.getenv("GEMINI_BASE_URL")
+    http_options = types.HttpOptions(base_url=base_url) if base_url else None
+
+    _client = genai.Client(api_key=api_key, http_options=http_options)
     return _client
 
 
+def set_gemini_client(client: Optional[genai.Client]) -> None:
+    """替換 Gemini Client（例如指向本地假伺服器），傳入 None 時下次使用會重新建立"""
+    global _client
+    _client = client
+
+
 def build_message_contents(
     history: List[ChatMessage],
     messages: List[ChatMessage],
@@ -55,7 +66,7 @@ def build_message_contents(
                 if isinstance(content_item, TextContent):
                     parts.append(types.Part.from_text(text=content_item.text))
                 elif isinstance(content_item, ImageContent):
-                    image_data = _process_image_data(content_item.data)
+                    image_data = _load_image_data(content_item)
                     parts.append(
                         types.Part.from_bytes(
                             data=image_data, mime_type=content_item.mime_type
@@ -67,6 +78,19 @@ def build_message_contents(
     return contents
 
 
+def _load_image_data(image: ImageContent) -> bytes:
+    """載入圖片內容，引用附件時直接使用已解碼的緩存"""
+    if image.attachment_id:
+        data = attachment_store.get(image.attachment_id)
+        if data is not None:
+            return data
+
+    if not image.data:
+        raise ValueError(f"圖片附件不存在或已過期: {image.attachment_id}")
+
+    return _process_image_data(image.data)
+
+
 def _process_image_data(data: str) -> bytes:
     """處理圖片資料"""
     if data.startswith("data:"):
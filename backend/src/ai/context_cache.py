@@ -0,0 +1,148 @@
+"""Gemini 上下文緩存：靜態系統 prompt 與工具宣告依版本上傳一次，每回合只傳送差異"""
+
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from google.genai import types
+
+from .client import MODEL_ID, get_gemini_client
+from .tools import ToolRegistry
+
+# 上下文緩存的存活時間（秒），設為 0 時停用緩存
+CHAT_CONTEXT_CACHE_TTL = int(os.getenv("CHAT_CONTEXT_CACHE_TTL", "3600"))
+# 緩存到期前多久改建新的緩存，避免請求使用到剛過期的緩存
+REFRESH_MARGIN = 60
+# 建立緩存失敗後（例如內容低於模型的最小 token 數）多久再重試
+RETRY_AFTER = 600
+
+
+class TokenUsage:
+    """累計 Gemini 請求的輸入 token 數，cached_tokens 為由緩存提供、不需重新傳送的部分"""
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def add(self, usage: Optional[types.GenerateContentResponseUsageMetadata]) -> None:
+        """加入一次模型呼叫的用量"""
+        if usage is None:
+            return
+        self.prompt_tokens += usage.prompt_token_count or 0
+        self.cached_tokens += usage.cached_content_token_count or 0
+
+    def __str__(self) -> str:
+        ratio = self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0
+        return (
+            f"輸入 {self.prompt_tokens} token，"
+            f"其中緩存 {self.cached_tokens} token（節省 {ratio:.0%}）"
+        )
+
+
+class ContextCache:
+    """
+    管理 Gemini 上下文緩存
+
+    以模型、系統 prompt 與工具宣告的雜湊值作為版本，每個版本只建立一次緩存；
+    prompt 文件修改後自動建立新版本，舊版本的緩存由 TTL 自然過期
+    """
+
+    def __init__(self, ttl: int = CHAT_CONTEXT_CACHE_TTL):
+        self.ttl = ttl
+        self.usage = TokenUsage()
+        # 取得緩存時直接使用既有緩存 (hits) 或需要建立新緩存 (misses) 的次數
+        self._hits = 0
+        self._misses = 0
+        # 版本 -> (緩存名稱, 本地到期時間)，名稱為 None 表示建立失敗，到期後重試
+        self._entries: Dict[str, Tuple[Optional[str], float]] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(
+        self, system_instruction: str, registry: ToolRegistry
+    ) -> Optional[str]:
+        """
+        取得對應版本的緩存名稱，不存在或即將過期時建立新的緩存
+
+        Returns:
+            緩存名稱，停用或無法建立緩存時回傳 None，呼叫端應改為直接傳送完整內容
+        """
+        if self.ttl <= 0:
+            return None
+
+        version = self._version(system_instruction, registry)
+        entry = self._entries.get(version)
+        if entry and entry[1] > time.monotonic():
+            self._hits += 1
+            return entry[0]
+
+        async with self._lock:
+            # 等待鎖的期間可能已由其他請求建立
+            entry = self._entries.get(version)
+            if entry and entry[1] > time.monotonic():
+                self._hits += 1
+                return entry[0]
+
+            self._misses += 1
+
+            try:
+                cache = await get_gemini_client().aio.caches.create(
+                    model=MODEL_ID,
+                    config=types.CreateCachedContentConfig(
+                        display_name=f"siri-{version}",
+                        system_instruction=system_instruction,
+                        tools=list(registry.tools),
+                        ttl=f"{self.ttl}s",
+                    ),
+                )
+                name = cache.name
+                expires_at = time.monotonic() + max(self.ttl - REFRESH_MARGIN, 0)
+            except Exception as e:
+                print(f"建立上下文緩存錯誤: {e}")
+                name = None
+                expires_at = time.monotonic() + RETRY_AFTER
+
+            self._entries[version] = (name, expires_at)
+            return name
+
+    def invalidate(self, name: str) -> None:
+        """緩存無法使用時（例如已在伺服器端被刪除）移除，下次請求重新建立"""
+        self._entries = {
+            version: entry
+            for version, entry in self._entries.items()
+            if entry[0] != name
+        }
+
+    def record(self, usage: TokenUsage) -> None:
+        """記錄一次聊天請求的 token 用量"""
+        self.usage.requests += 1
+        self.usage.prompt_tokens += usage.prompt_tokens
+        self.usage.cached_tokens += usage.cached_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        """累計的緩存命中與 token 用量統計"""
+        prompt_tokens = self.usage.prompt_tokens
+        return {
+            "enabled": self.ttl > 0,
+            "hits": self._hits,
+            "misses": self._misses,
+            "requests": self.usage.requests,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": self.usage.cached_tokens,
+            "cached_ratio": round(self.usage.cached_tokens / prompt_tokens, 3)
+            if prompt_tokens
+            else 0.0,
+        }
+
+    @staticmethod
+    def _version(system_instruction: str, registry: ToolRegistry) -> str:
+        digest = hashlib.sha256(MODEL_ID.encode())
+        digest.update(system_instruction.encode())
+        digest.update(registry.version.encode())
+        return digest.hexdigest()[:16]
+
+
+# 創建全局實例
+context_cache = ContextCache()
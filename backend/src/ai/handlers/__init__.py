@@ -1,7 +1,5 @@
 """AI 工具處理器模組"""
 
-from .contact import ContactToolHandler
-from .record import RecordToolHandler
 from .unified import UnifiedToolHandler
 
-__all__ = ["ContactToolHandler", "RecordToolHandler", "UnifiedToolHandler"]
+__all__ = ["UnifiedToolHandler"]
@@ -1,62 +1,149 @@
 """統一工具處理器"""
 
-from typing import List
+import asyncio
+import json
+import os
+from typing import List, Optional, Tuple
 
 from google.genai import types
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...database import SessionLocal
 from ...models import User
-from ..tools.contact import ContactTools
-from ..tools.record import RecordTools
-from .contact import ContactToolHandler
-from .record import RecordToolHandler
+from ..tools import ReadCache, ToolContext, tool_registry
+
+# 除錯模式下，tool_call 事件會附上讀取緩存的命中統計
+CHAT_DEBUG = os.getenv("CHAT_DEBUG", "false").lower() == "true"
 
 
 class UnifiedToolHandler:
-    """統一工具處理器 - 處理聯絡人和記錄的所有操作"""
+    """統一工具處理器 - 透過工具註冊表處理聯絡人和記錄的所有操作"""
 
-    def __init__(self, db: Session, current_user: User):
+    def __init__(
+        self,
+        db: AsyncSession,
+        current_user: User,
+        cache: Optional[ReadCache] = None,
+    ):
         self.db = db
         self.current_user = current_user
-        self.contact_handler = ContactToolHandler(db, current_user)
-        self.record_handler = RecordToolHandler(db, current_user)
+        self.context = ToolContext(db, current_user, cache)
 
     async def handle_tool_call(self, tool_call: types.FunctionCall) -> tuple[str, dict]:
-        """統一處理工具調用"""
+        """
+        統一處理工具調用
+
+        唯讀工具的結果在同一請求中以工具名稱與參數緩存；修改資料的工具執行後清空緩存
+        """
         function_name = tool_call.name
+        args = tool_call.args or {}
+        cache = self.context.cache
 
-        # 確認工具分類
-        contact_tools = {
-            "get_contacts",
-            "get_contact",
-            "create_contact",
-            "update_contact",
-            "delete_contact",
-        }
+        tool = tool_registry.get(function_name)
+        if tool is None:
+            result = f"未知的工具功能: {function_name or 'None'}"
+        else:
+            try:
+                if tool.read_only:
+                    key = (function_name, json.dumps(args, sort_keys=True, default=str))
+                    result = await cache.get_or_load(
+                        key, lambda: tool(self.context, args)
+                    )
+                else:
+                    try:
+                        result = await tool(self.context, args)
+                    finally:
+                        cache.clear()
+            except Exception as e:
+                result = f"執行 {function_name} 時發生錯誤: {str(e)}"
+
+        tool_info = {"name": function_name, "arguments": args, "result": result}
+        if CHAT_DEBUG:
+            tool_info["cache"] = cache.stats()
+        return result, tool_info
+
+    async def handle_tool_calls(
+        self, tool_calls: List[types.FunctionCall], timeout: Optional[float] = None
+    ) -> List[tuple[str, dict]]:
+        """
+        處理同一回合的多個工具調用，結果順序與調用順序相同
+
+        連續的唯讀調用各自使用獨立 session 並行執行；寫入調用依序在請求的 session 中執行，
+        確保之後的讀取能看到寫入結果。超過 timeout 秒後，尚未完成的讀取會被取消，
+        尚未開始的寫入不再執行，已開始的寫入不會被中斷
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        results: List[tuple[str, dict]] = []
+
+        index = 0
+        while index < len(tool_calls):
+            remaining = None if deadline is None else deadline - loop.time()
+
+            end = index
+            while end < len(tool_calls) and self._is_read_only(tool_calls[end]):
+                end += 1
+
+            if end > index:
+                results += await self._handle_read_only(
+                    tool_calls[index:end], remaining
+                )
+                index = end
+                continue
 
-        record_tools = {
-            "get_records",
-            "get_records_by_contact",
-            "get_record",
-            "create_record",
-            "update_record",
-            "delete_record",
-            "get_record_categories",
+            tool_call = tool_calls[index]
+            if remaining is not None and remaining <= 0:
+                results.append(self._timeout_result(tool_call))
+            else:
+                results.append(await self.handle_tool_call(tool_call))
+            index += 1
+
+        return results
+
+    async def _handle_read_only(
+        self, tool_calls: List[types.FunctionCall], timeout: Optional[float]
+    ) -> List[tuple[str, dict]]:
+        """以獨立 session 並行執行唯讀調用"""
+        if timeout is not None and timeout <= 0:
+            return [self._timeout_result(tool_call) for tool_call in tool_calls]
+
+        tasks = [
+            asyncio.create_task(self._handle_in_new_session(tool_call))
+            for tool_call in tool_calls
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        return [
+            task.result() if task in done else self._timeout_result(tool_call)
+            for task, tool_call in zip(tasks, tool_calls)
+        ]
+
+    async def _handle_in_new_session(
+        self, tool_call: types.FunctionCall
+    ) -> tuple[str, dict]:
+        async with SessionLocal() as db:
+            handler = UnifiedToolHandler(db, self.current_user, self.context.cache)
+            return await handler.handle_tool_call(tool_call)
+
+    @staticmethod
+    def _timeout_result(tool_call: types.FunctionCall) -> tuple[str, dict]:
+        result = f"工具執行逾時，未執行 {tool_call.name or 'None'}"
+        return result, {
+            "name": tool_call.name,
+            "arguments": tool_call.args or {},
+            "result": result,
         }
 
-        if function_name in contact_tools:
-            return await self.contact_handler.handle_tool_call(tool_call)
-        elif function_name in record_tools:
-            return await self.record_handler.handle_tool_call(tool_call)
-        else:
-            result = f"未知的工具功能: {function_name or 'None'}"
-            return result, {
-                "name": function_name,
-                "arguments": tool_call.args or {},
-                "result": result,
-            }
+    @staticmethod
+    def _is_read_only(tool_call: types.FunctionCall) -> bool:
+        """註冊為 read_only 的工具不會修改資料，可在獨立 session 中並行執行"""
+        tool = tool_registry.get(tool_call.name)
+        return tool is not None and tool.read_only
 
     @staticmethod
-    def create_all_tools() -> List[types.Tool]:
-        """創建所有工具（聯絡人 + 記錄）"""
-        return ContactTools.create_tools() + RecordTools.create_tools()
+    def create_all_tools() -> Tuple[types.Tool, ...]:
+        """取得所有工具（聯絡人 + 記錄），宣告於啟動時建立一次"""
+        return tool_registry.tools
@@ -0,0 +1,200 @@
+"""伺服器端對話歷史：依 token 預算截取視窗，較早的訊息以滾動摘要保留"""
+
+import json
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from google.genai import types
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..attachments import attachment_store
+from ..models import ChatSession, ChatSessionMessage
+from ..prompt_manager import prompt_manager
+from ..schemas import ChatMessage, ImageContent, TextContent
+from .client import MODEL_ID, _process_image_data, get_gemini_client
+
+# 每次請求帶入模型的歷史訊息 token 上限（估算值）
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "8000"))
+IMAGE_TOKENS = 258  # Gemini 對單張圖片計算的 token 數
+
+_content_adapter = TypeAdapter(ChatMessage.model_fields["content"].annotation)
+
+
+def estimate_tokens(message: ChatMessage) -> int:
+    """粗估訊息的 token 數：ASCII 約 4 個字元一個 token，其他字元（如中文）每字一個"""
+    if isinstance(message.content, str):
+        return _estimate_text_tokens(message.content)
+
+    return sum(
+        _estimate_text_tokens(item.text)
+        if isinstance(item, TextContent)
+        else IMAGE_TOKENS
+        for item in message.content
+    )
+
+
+def _estimate_text_tokens(text: str) -> int:
+    ascii_chars = sum(1 for char in text if char.isascii())
+    return (ascii_chars + 3) // 4 + len(text) - ascii_chars
+
+
+def _dump_content(message: ChatMessage) -> str:
+    """序列化訊息內容，圖片改存入附件緩存並只保留附件 ID"""
+    if isinstance(message.content, str):
+        return json.dumps(message.content, ensure_ascii=False)
+
+    items = []
+    for item in message.content:
+        if isinstance(item, ImageContent):
+            attachment_id = item.attachment_id
+            if item.data and (
+                not attachment_id or attachment_id not in attachment_store
+            ):
+                attachment_id = attachment_store.put(_process_image_data(item.data))
+            item = ImageContent(attachment_id=attachment_id, mime_type=item.mime_type)
+        items.append(item.model_dump(exclude_none=True))
+
+    return json.dumps(items, ensure_ascii=False)
+
+
+def _load_message(row: ChatSessionMessage) -> ChatMessage:
+    """還原訊息，已過期的圖片附件以文字說明取代"""
+    content = _content_adapter.validate_python(json.loads(row.content))  # type: ignore
+
+    if isinstance(content, list):
+        content = [
+            TextContent(text="[圖片已過期]")
+            if isinstance(item, ImageContent)
+            and item.attachment_id not in attachment_store
+            else item
+            for item in content
+        ]
+
+    return ChatMessage(role=row.role, content=content, timestamp=row.created_at)  # type: ignore
+
+
+def _message_text(message: ChatMessage) -> str:
+    if isinstance(message.content, str):
+        return message.content
+
+    return " ".join(
+        item.text if isinstance(item, TextContent) else "[圖片]"
+        for item in message.content
+    )
+
+
+async def summarize_messages(
+    summary: Optional[str], messages: List[ChatMessage]
+) -> str:
+    """將訊息併入既有摘要，產生新的摘要"""
+    transcript = "\n".join(
+        f"{message.role}: {_message_text(message)}" for message in messages
+    )
+    response = await get_gemini_client().aio.models.generate_content(
+        model=MODEL_ID,
+        contents=prompt_manager.get_summary_prompt().format(
+            summary=summary or "（無）", transcript=transcript
+        ),
+        config=types.GenerateContentConfig(temperature=0.2, max_output_tokens=1024),
+    )
+
+    if not response.text:
+        raise ValueError("摘要結果為空")
+    return response.text
+
+
+async def save_messages(
+    db: AsyncSession, session: ChatSession, messages: List[ChatMessage]
+) -> None:
+    """保存訊息到對話中"""
+    for message in messages:
+        db.add(
+            ChatSessionMessage(
+                session_id=session.id,
+                role=message.role,
+                content=_dump_content(message),
+                token_count=estimate_tokens(message),
+            )
+        )
+
+    session.updated_at = datetime.now(timezone.utc)  # type: ignore
+    await db.commit()
+
+
+async def load_history(
+    db: AsyncSession,
+    session: ChatSession,
+    budget: int = CHAT_HISTORY_TOKEN_BUDGET,
+) -> List[ChatMessage]:
+    """
+    載入對話歷史
+
+    尚未摘要的訊息超過預算時，將最舊的訊息併入摘要，直到剩餘訊息不超過預算的一半，
+    讓摘要不必每回合重新產生；摘要失敗時仍依預算截斷，下次請求再重試
+    """
+    rows = (
+        await db.execute(
+            select(ChatSessionMessage.id, ChatSessionMessage.token_count)
+            .where(
+                ChatSessionMessage.session_id == session.id,
+                ChatSessionMessage.id > (session.summarized_until or 0),
+            )
+            .order_by(ChatSessionMessage.id)
+        )
+    ).all()
+
+    total = sum(token_count for _, token_count in rows)
+    if total > budget:
+        start = 0
+        while start < len(rows) and total > budget // 2:
+            total -= rows[start].token_count
+            start += 1
+
+        try:
+            summarized = await _load_messages(
+                db, session, rows[0].id, rows[start - 1].id
+            )
+            session.summary = await summarize_messages(session.summary, summarized)  # type: ignore
+            session.summarized_until = rows[start - 1].id  # type: ignore
+            await db.commit()
+        except Exception as e:
+            print(f"對話摘要錯誤: {e}")
+            total = sum(token_count for _, token_count in rows)
+            start = 0
+            while start < len(rows) and total > budget:
+                total -= rows[start].token_count
+                start += 1
+
+        rows = rows[start:]
+
+    if not rows:
+        return []
+
+    return await _load_messages(db, session, rows[0].id)
+
+
+async def load_all_messages(
+    db: AsyncSession, session: ChatSession
+) -> List[ChatMessage]:
+    """載入對話中的所有訊息（包含已摘要的部分）"""
+    return await _load_messages(db, session, 0)
+
+
+async def _load_messages(
+    db: AsyncSession,
+    session: ChatSession,
+    first_id: int,
+    last_id: Optional[int] = None,
+) -> List[ChatMessage]:
+    query = select(ChatSessionMessage).where(
+        ChatSessionMessage.session_id == session.id,
+        ChatSessionMessage.id >= first_id,
+    )
+    if last_id is not None:
+        query = query.where(ChatSessionMessage.id <= last_id)
+
+    rows = (await db.scalars(query.order_by(ChatSessionMessage.id))).all()
+    return [_load_message(row) for row in rows]
@@ -1,6 +1,16 @@
 """AI 工具定義模組"""
 
-from .contact import ContactTools
-from .record import RecordTools
+from . import contact, record  # noqa: F401  載入工具模組以註冊工具
+from .context import ReadCache, ToolContext
+from .registry import RegisteredTool, ToolRegistry, tool_registry
 
-__all__ = ["ContactTools", "RecordTools"]
+# 所有工具註冊完成後凍結註冊表
+tool_registry.freeze()
+
+__all__ = [
+    "ReadCache",
+    "RegisteredTool",
+    "ToolContext",
+    "ToolRegistry",
+    "tool_registry",
+]
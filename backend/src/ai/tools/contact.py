@@ -1,131 +1,144 @@
-"""聯絡人工具定義"""
-
-from typing import List
-
-from google.genai import types
-
-
-class ContactTools:
-    """聯絡人工具定義"""
-
-    @staticmethod
-    def create_tools() -> List[types.Tool]:
-        """創建聯絡人管理工具"""
-        return [
-            ContactTools._get_contacts_tool(),
-            ContactTools._get_contact_tool(),
-            ContactTools._create_contact_tool(),
-            ContactTools._update_contact_tool(),
-            ContactTools._delete_contact_tool(),
-        ]
-
-    @staticmethod
-    def _get_contacts_tool() -> types.Tool:
-        return types.Tool(
-            function_declarations=[
-                types.FunctionDeclaration(
-                    name="get_contacts",
-                    description="獲取聯絡人列表",
-                    parameters=types.Schema(
-                        type=types.Type.OBJECT,
-                        properties={
-                            "search": types.Schema(
-                                type=types.Type.STRING, description="搜索關鍵字"
-                            ),
-                            "limit": types.Schema(
-                                type=types.Type.INTEGER, description="結果數量限制"
-                            ),
-                        },
-                    ),
-                )
-            ]
-        )
+"""聯絡人工具"""
 
-    @staticmethod
-    def _get_contact_tool() -> types.Tool:
-        return types.Tool(
-            function_declarations=[
-                types.FunctionDeclaration(
-                    name="get_contact",
-                    description="獲取聯絡人詳情",
-                    parameters=types.Schema(
-                        type=types.Type.OBJECT,
-                        properties={
-                            "contact_id": types.Schema(
-                                type=types.Type.INTEGER, description="聯絡人ID"
-                            )
-                        },
-                        required=["contact_id"],
-                    ),
-                )
-            ]
-        )
+from typing import Annotated, Optional
+
+from sqlalchemy import select
+
+from ...contact_summary import contact_summary_cache
+from ...models import Contact
+from ...search import search_contacts
+from .context import ToolContext
+from .registry import tool_registry
+
+
+@tool_registry.register(read_only=True)
+async def get_contacts(
+    ctx: ToolContext,
+    search: Annotated[Optional[str], "搜索關鍵字"] = None,
+    limit: Annotated[int, "結果數量限制"] = 10,
+) -> str:
+    """獲取聯絡人列表"""
+    query = select(Contact).where(Contact.user_id == ctx.current_user.id)
+
+    if search:
+        query = search_contacts(query, search)
+
+    contacts = (await ctx.db.scalars(query.limit(limit))).all()
+    ctx.remember_contacts(contacts)
+
+    if not contacts:
+        return "您目前沒有任何聯絡人。"
+
+    result = "您的聯絡人列表：\n"
+    for contact in contacts:
+        result += f"• [{contact.id}] {contact.name}"
+        if contact.description is not None:
+            result += f" - {contact.description}"
+        result += "\n"
+
+    return result
+
+
+@tool_registry.register(read_only=True)
+async def get_contact(ctx: ToolContext, contact_id: Annotated[int, "聯絡人ID"]) -> str:
+    """獲取聯絡人詳情"""
+    contact = await ctx.get_contact(contact_id)
+
+    if not contact:
+        return f"找不到 ID 為 {contact_id} 的聯絡人。"
+
+    result = f"聯絡人詳情：\n"
+    result += f"• ID: {contact.id}\n"
+    result += f"• 姓名: {contact.name}\n"
+    if contact.description is not None:
+        result += f"• 描述: {contact.description}\n"
+    result += f"• 創建時間: {contact.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+
+    return result
 
-    @staticmethod
-    def _create_contact_tool() -> types.Tool:
-        return types.Tool(
-            function_declarations=[
-                types.FunctionDeclaration(
-                    name="create_contact",
-                    description="創建新聯絡人",
-                    parameters=types.Schema(
-                        type=types.Type.OBJECT,
-                        properties={
-                            "name": types.Schema(
-                                type=types.Type.STRING, description="聯絡人姓名"
-                            ),
-                            "description": types.Schema(
-                                type=types.Type.STRING, description="聯絡人描述"
-                            ),
-                        },
-                        required=["name"],
-                    ),
-                )
-            ]
-        )
 
-    @staticmethod
-    def _update_contact_tool() -> types.Tool:
-        return types.Tool(
-            function_declarations=[
-                types.FunctionDeclaration(
-                    name="update_contact",
-                    description="更新聯絡人",
-                    parameters=types.Schema(
-                        type=types.Type.OBJECT,
-                        properties={
-                            "contact_id": types.Schema(
-                                type=types.Type.INTEGER, description="聯絡人ID"
-                            ),
-                            "name": types.Schema(
-                                type=types.Type.STRING, description="新姓名"
-                            ),
-                            "description": types.Schema(
-                                type=types.Type.STRING, description="新描述"
-                            ),
-                        },
-                        required=["contact_id"],
-                    ),
-                )
-            ]
+@tool_registry.register(read_only=False)
+async def create_contact(
+    ctx: ToolContext,
+    name: Annotated[str, "聯絡人姓名"],
+    description: Annotated[Optional[str], "聯絡人描述"] = None,
+) -> str:
+    """創建新聯絡人"""
+    new_contact = Contact(
+        name=name, description=description, user_id=ctx.current_user.id
+    )
+
+    ctx.db.add(new_contact)
+    await ctx.db.commit()
+    await ctx.db.refresh(new_contact)
+    contact_summary_cache.invalidate(ctx.current_user.id)  # type: ignore
+
+    result = f"✅ 已成功創建聯絡人：\n"
+    result += f"• ID: {new_contact.id}\n"
+    result += f"• 姓名: {new_contact.name}\n"
+    if description:
+        result += f"• 描述: {description}\n"
+
+    return result
+
+
+@tool_registry.register(read_only=False)
+async def update_contact(
+    ctx: ToolContext,
+    contact_id: Annotated[int, "聯絡人ID"],
+    name: Annotated[Optional[str], "新姓名"] = None,
+    description: Annotated[Optional[str], "新描述"] = None,
+) -> str:
+    """更新聯絡人"""
+    contact = await ctx.db.scalar(
+        select(Contact).where(
+            Contact.id == contact_id, Contact.user_id == ctx.current_user.id
         )
+    )
+
+    if not contact:
+        return f"找不到 ID 為 {contact_id} 的聯絡人。"
+
+    updated_fields = []
+    if name and name != contact.name:
+        contact.name = name
+        updated_fields.append(f"姓名: {name}")
+
+    if description is not None and description != contact.description:
+        contact.description = description
+        updated_fields.append(f"描述: {description}")
 
-    @staticmethod
-    def _delete_contact_tool() -> types.Tool:
-        return types.Tool(
-            function_declarations=[
-                types.FunctionDeclaration(
-                    name="delete_contact",
-                    description="刪除聯絡人",
-                    parameters=types.Schema(
-                        type=types.Type.OBJECT,
-                        properties={
-                            "contact_id": types.Schema(
-                                type=types.Type.INTEGER, description="聯絡人ID"
-                            )
-                        },
-                        required=["contact_id"],
-                    ),
-                )
-            ]
+    if not updated_fields:
+        return "沒有需要更新的欄位。"
+
+    await ctx.db.commit()
+    await ctx.db.refresh(contact)
+    contact_summary_cache.invalidate(ctx.current_user.id)  # type: ignore
+
+    result = f"✅ 已成功更新聯絡人 [{contact_id}] {contact.name}：\n"
+    for field in updated_fields:
+        result += f"• {field}\n"
+
+    return result
+
+
+@tool_registry.register(read_only=False)
+async def delete_contact(
+    ctx: ToolContext, contact_id: Annotated[int, "聯絡人ID"]
+) -> str:
+    """刪除聯絡人"""
+    contact = await ctx.db.scalar(
+        select(Contact).where(
+            Contact.id == contact_id, Contact.user_id == ctx.current_user.id
         )
+    )
+
+    if not contact:
+        return f"找不到 ID 為 {contact_id} 的聯絡人。"
+
+    contact_name = contact.name
+    await ctx.db.delete(contact)
+    await ctx.db.commit()
+    contact_summary_cache.invalidate(ctx.current_user.id)  # type: ignore
+
+    return f"✅ 已成功刪除聯絡人 [{contact_id}] {contact_name}。"
@@ -0,0 +1,79 @@
+"""工具執行上下文與請求範圍的讀取緩存"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...models import Contact, User
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class ReadCache:
+    """
+    單一聊天請求內共用的讀取緩存
+
+    保存唯讀工具的結果與依 ID 載入的實體，同一請求中重複的讀取直接由記憶體提供；
+    任何修改資料的工具執行後即清空。並行的唯讀調用各自使用獨立 session，
+    但共用同一個緩存，因此緩存的實體只能讀取已載入的欄位
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        """取得緩存內容，不存在時以 loader 載入並緩存"""
+        value = self._entries.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = await loader()
+        self._entries[key] = value
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """直接放入緩存（例如列表查詢順帶載入的實體），不計入命中統計"""
+        self._entries[key] = value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class ToolContext:
+    """工具執行時的上下文：資料庫 session、當前用戶與請求範圍的讀取緩存"""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        current_user: User,
+        cache: Optional[ReadCache] = None,
+    ):
+        self.db = db
+        self.current_user = current_user
+        self.cache = cache if cache is not None else ReadCache()
+
+    async def get_contact(self, contact_id: int) -> Optional[Contact]:
+        """依 ID 取得當前用戶的聯絡人，同一請求中只查詢一次"""
+        return await self.cache.get_or_load(
+            ("contact", contact_id),
+            lambda: self.db.scalar(
+                select(Contact).where(
+                    Contact.id == contact_id, Contact.user_id == self.current_user.id
+                )
+            ),
+        )
+
+    def remember_contacts(self, contacts: Iterable[Contact]) -> None:
+        """記住列表查詢載入的聯絡人，之後依 ID 取得時不需再查詢"""
+        for contact in contacts:
+            self.cache.set(("contact", contact.id), contact)
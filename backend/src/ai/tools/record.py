@@ -1,187 +1,313 @@
-"""記錄工具定義"""
-
-from typing import List
-
-from google.genai import types
-
-
-class RecordTools:
-    """記錄工具定義"""
-
-    @staticmethod
-    def create_tools() -> List[types.Tool]:
-        """創建記錄管理工具"""
-        return [
-            RecordTools._get_records_tool(),
-            RecordTools._get_records_by_contact_tool(),
-            RecordTools._get_record_tool(),
-            RecordTools._create_record_tool(),
-            RecordTools._update_record_tool(),
-            RecordTools._delete_record_tool(),
-            RecordTools._get_record_categories_tool(),
-        ]
-
-    @staticmethod
-    def _get_records_tool() -> types.Tool:
-        return types.Tool(
-            function_declarations=[
-                types.FunctionDeclaration(
-                    name="get_records",
-                    description="獲取記錄列表，支援搜索和過濾",
-                    parameters=types.Schema(
-                        type=types.Type.OBJECT,
-                        properties={
-                            "contact_id": types.Schema(
-                                type=types.Type.INTEGER, description="按聯絡人ID過濾"
-                            ),
-                            "category": types.Schema(
-                                type=types.Type.STRING,
-                                description="按分類過濾（Communications, Nicknames, Memories, Preferences, Plan, Other）",
-                            ),
-                            "search": types.Schema(
-                                type=types.Type.STRING, description="搜索記錄內容"
-                            ),
-                            "limit": types.Schema(
-                                type=types.Type.INTEGER, description="結果數量限制"
-                            ),
-                        },
-                    ),
-                )
-            ]
-        )
+"""記錄工具"""
 
-    @staticmethod
-    def _get_records_by_contact_tool() -> types.Tool:
-        return types.Tool(
-            function_declarations=[
-                types.FunctionDeclaration(
-                    name="get_records_by_contact",
-                    description="獲取指定聯絡人的所有記錄",
-                    parameters=types.Schema(
-                        type=types.Type.OBJECT,
-                        properties={
-                            "contact_id": types.Schema(
-                                type=types.Type.INTEGER, description="聯絡人ID"
-                            ),
-                            "category": types.Schema(
-                                type=types.Type.STRING,
-                                description="按分類過濾（Communications, Nicknames, Memories, Preferences, Plan, Other）",
-                            ),
-                            "limit": types.Schema(
-                                type=types.Type.INTEGER, description="結果數量限制"
-                            ),
-                        },
-                        required=["contact_id"],
-                    ),
-                )
-            ]
-        )
+from typing import Annotated, Optional
 
-    @staticmethod
-    def _get_record_tool() -> types.Tool:
-        return types.Tool(
-            function_declarations=[
-                types.FunctionDeclaration(
-                    name="get_record",
-                    description="獲取指定記錄詳情",
-                    parameters=types.Schema(
-                        type=types.Type.OBJECT,
-                        properties={
-                            "record_id": types.Schema(
-                                type=types.Type.INTEGER, description="記錄ID"
-                            )
-                        },
-                        required=["record_id"],
-                    ),
-                )
-            ]
-        )
+from sqlalchemy import select
+from sqlalchemy.orm import contains_eager
 
-    @staticmethod
-    def _create_record_tool() -> types.Tool:
-        return types.Tool(
-            function_declarations=[
-                types.FunctionDeclaration(
-                    name="create_record",
-                    description="為聯絡人創建新記錄",
-                    parameters=types.Schema(
-                        type=types.Type.OBJECT,
-                        properties={
-                            "contact_id": types.Schema(
-                                type=types.Type.INTEGER, description="聯絡人ID"
-                            ),
-                            "category": types.Schema(
-                                type=types.Type.STRING,
-                                description="記錄分類（Communications, Nicknames, Memories, Preferences, Plan, Other）",
-                            ),
-                            "content": types.Schema(
-                                type=types.Type.STRING, description="記錄內容"
-                            ),
-                        },
-                        required=["contact_id", "category", "content"],
-                    ),
-                )
-            ]
-        )
+from ...contact_summary import contact_summary_cache
+from ...models import Contact, Record, RecordCategory
+from ...search import search_records
+from .context import ToolContext
+from .registry import tool_registry
+
+CATEGORIES = ", ".join(category.value for category in RecordCategory)
+
+
+def _invalid_category(category: str) -> str:
+    return f"無效的記錄分類: {category}。有效分類: {CATEGORIES}"
 
-    @staticmethod
-    def _update_record_tool() -> types.Tool:
-        return types.Tool(
-            function_declarations=[
-                types.FunctionDeclaration(
-                    name="update_record",
-                    description="更新記錄",
-                    parameters=types.Schema(
-                        type=types.Type.OBJECT,
-                        properties={
-                            "record_id": types.Schema(
-                                type=types.Type.INTEGER, description="記錄ID"
-                            ),
-                            "category": types.Schema(
-                                type=types.Type.STRING,
-                                description="新的記錄分類（Communications, Nicknames, Memories, Preferences, Plan, Other）",
-                            ),
-                            "content": types.Schema(
-                                type=types.Type.STRING, description="新的記錄內容"
-                            ),
-                        },
-                        required=["record_id"],
-                    ),
-                )
-            ]
-        )
 
-    @staticmethod
-    def _delete_record_tool() -> types.Tool:
-        return types.Tool(
-            function_declarations=[
-                types.FunctionDeclaration(
-                    name="delete_record",
-                    description="刪除記錄",
-                    parameters=types.Schema(
-                        type=types.Type.OBJECT,
-                        properties={
-                            "record_id": types.Schema(
-                                type=types.Type.INTEGER, description="記錄ID"
-                            )
-                        },
-                        required=["record_id"],
-                    ),
-                )
-            ]
+@tool_registry.register(read_only=True)
+async def get_records(
+    ctx: ToolContext,
+    contact_id: Annotated[Optional[int], "按聯絡人ID過濾"] = None,
+    category: Annotated[Optional[str], f"按分類過濾（{CATEGORIES}）"] = None,
+    search: Annotated[Optional[str], "搜索記錄內容"] = None,
+    limit: Annotated[int, "結果數量限制"] = 10,
+) -> str:
+    """獲取記錄列表，支援搜索和過濾"""
+    # 基礎查詢：只能查看自己聯絡人的記錄
+    query = (
+        select(Record)
+        .join(Contact)
+        .where(Contact.user_id == ctx.current_user.id)
+        .options(contains_eager(Record.contact))
+    )
+
+    # 按聯絡人過濾
+    if contact_id:
+        query = query.where(Record.contact_id == contact_id)
+
+    # 按分類過濾
+    if category:
+        try:
+            category_enum = RecordCategory(category)
+            query = query.where(Record.category == category_enum)
+        except ValueError:
+            return _invalid_category(category)
+
+    # 內容搜索
+    if search:
+        query = search_records(query, search)
+
+    records = (await ctx.db.scalars(query.limit(limit))).all()
+
+    if not records:
+        filter_desc = []
+        if contact_id:
+            filter_desc.append(f"聯絡人ID {contact_id}")
+        if category:
+            filter_desc.append(f"分類 {category}")
+        if search:
+            filter_desc.append(f"內容包含 '{search}'")
+
+        filter_str = "，".join(filter_desc) if filter_desc else ""
+        return f"沒有找到記錄{f'（{filter_str}）' if filter_str else ''}。"
+
+    result = "記錄列表：\n"
+    for record in records:
+        contact_name = record.contact.name if record.contact else "未知聯絡人"
+        content_preview = (
+            record.content[:50] + "..."
+            if len(str(record.content)) > 50
+            else str(record.content)
         )
+        result += f"• [{record.id}] {contact_name} - {record.category.value}: {content_preview}\n"
+
+    return result
+
+
+@tool_registry.register(read_only=True)
+async def get_records_by_contact(
+    ctx: ToolContext,
+    contact_id: Annotated[int, "聯絡人ID"],
+    category: Annotated[Optional[str], f"按分類過濾（{CATEGORIES}）"] = None,
+    limit: Annotated[int, "結果數量限制"] = 20,
+) -> str:
+    """獲取指定聯絡人的所有記錄"""
+    # 檢查聯絡人是否存在且屬於當前用戶
+    contact = await ctx.get_contact(contact_id)
+
+    if not contact:
+        return f"找不到 ID 為 {contact_id} 的聯絡人或您沒有權限查看。"
+
+    # 查詢該聯絡人的記錄
+    query = select(Record).where(Record.contact_id == contact_id)
+
+    # 按分類過濾
+    if category:
+        try:
+            category_enum = RecordCategory(category)
+            query = query.where(Record.category == category_enum)
+        except ValueError:
+            return _invalid_category(category)
+
+    records = (await ctx.db.scalars(query.limit(limit))).all()
+
+    if not records:
+        category_desc = f"（分類: {category}）" if category else ""
+        return f"聯絡人 {contact.name} 沒有記錄{category_desc}。"
+
+    result = f"聯絡人 {contact.name} 的記錄：\n"
+
+    # 按分類分組顯示
+    records_by_category = {}
+    for record in records:
+        cat = record.category.value
+        if cat not in records_by_category:
+            records_by_category[cat] = []
+        records_by_category[cat].append(record)
+
+    for cat, cat_records in records_by_category.items():
+        result += f"\n📂 {cat}:\n"
+        for record in cat_records:
+            created = record.created_at.strftime("%Y-%m-%d")
+            content_preview = (
+                record.content[:100] + "..."
+                if len(str(record.content)) > 100
+                else str(record.content)
+            )
+            result += f"  • [{record.id}] {content_preview} ({created})\n"
+
+    return result
+
+
+@tool_registry.register(read_only=True)
+async def get_record(ctx: ToolContext, record_id: Annotated[int, "記錄ID"]) -> str:
+    """獲取指定記錄詳情"""
+    record = await ctx.db.scalar(
+        select(Record)
+        .join(Contact)
+        .where(Record.id == record_id, Contact.user_id == ctx.current_user.id)
+        .options(contains_eager(Record.contact))
+    )
+
+    if not record:
+        return f"找不到 ID 為 {record_id} 的記錄或您沒有權限查看。"
+
+    contact_name = record.contact.name if record.contact else "未知聯絡人"
 
-    @staticmethod
-    def _get_record_categories_tool() -> types.Tool:
-        return types.Tool(
-            function_declarations=[
-                types.FunctionDeclaration(
-                    name="get_record_categories",
-                    description="獲取所有可用的記錄分類",
-                    parameters=types.Schema(
-                        type=types.Type.OBJECT,
-                        properties={},
-                    ),
-                )
-            ]
+    result = f"記錄詳情：\n"
+    result += f"• ID: {record.id}\n"
+    result += f"• 聯絡人: {contact_name} (ID: {record.contact_id})\n"
+    result += f"• 分類: {record.category.value}\n"
+    result += f"• 內容: {record.content}\n"
+    result += f"• 創建時間: {record.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+    if record.updated_at is not None:
+        result += f"• 更新時間: {record.updated_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+
+    return result
+
+
+@tool_registry.register(read_only=False)
+async def create_record(
+    ctx: ToolContext,
+    contact_id: Annotated[int, "聯絡人ID"],
+    category: Annotated[str, f"記錄分類（{CATEGORIES}）"],
+    content: Annotated[str, "記錄內容"],
+) -> str:
+    """為聯絡人創建新記錄"""
+    # 檢查聯絡人是否存在且屬於當前用戶
+    contact = await ctx.db.scalar(
+        select(Contact).where(
+            Contact.id == contact_id, Contact.user_id == ctx.current_user.id
         )
+    )
+
+    if not contact:
+        return f"找不到 ID 為 {contact_id} 的聯絡人或您沒有權限。"
+
+    # 驗證分類
+    try:
+        category_enum = RecordCategory(category)
+    except ValueError:
+        return _invalid_category(category)
+
+    new_record = Record(
+        category=category_enum,
+        content=content,
+        contact_id=contact_id,
+    )
+
+    ctx.db.add(new_record)
+    await ctx.db.commit()
+    await ctx.db.refresh(new_record)
+    contact_summary_cache.invalidate_for_record(
+        ctx.current_user.id,  # type: ignore
+        category_enum,
+    )
+
+    result = f"✅ 已成功為聯絡人 {contact.name} 創建記錄：\n"
+    result += f"• ID: {new_record.id}\n"
+    result += f"• 分類: {category}\n"
+    result += f"• 內容: {content}\n"
+
+    return result
+
+
+@tool_registry.register(read_only=False)
+async def update_record(
+    ctx: ToolContext,
+    record_id: Annotated[int, "記錄ID"],
+    category: Annotated[Optional[str], f"新的記錄分類（{CATEGORIES}）"] = None,
+    content: Annotated[Optional[str], "新的記錄內容"] = None,
+) -> str:
+    """更新記錄"""
+    record = await ctx.db.scalar(
+        select(Record)
+        .join(Contact)
+        .where(Record.id == record_id, Contact.user_id == ctx.current_user.id)
+        .options(contains_eager(Record.contact))
+    )
+
+    if not record:
+        return f"找不到 ID 為 {record_id} 的記錄或您沒有權限。"
+
+    updated_fields = []
+    previous_category = record.category
+
+    if category and category != record.category.value:
+        try:
+            category_enum = RecordCategory(category)
+            setattr(record, "category", category_enum)
+            updated_fields.append(f"分類: {category}")
+        except ValueError:
+            return _invalid_category(category)
+
+    if content and content != record.content:
+        setattr(record, "content", content)
+        content_preview = content[:50] + "..." if len(content) > 50 else content
+        updated_fields.append(f"內容: {content_preview}")
+
+    if not updated_fields:
+        return "沒有需要更新的欄位。"
+
+    contact_name = record.contact.name if record.contact else "未知聯絡人"
+
+    await ctx.db.commit()
+    await ctx.db.refresh(record)
+    contact_summary_cache.invalidate_for_record(
+        ctx.current_user.id,  # type: ignore
+        previous_category,
+        record.category,
+    )
+
+    result = f"✅ 已成功更新記錄 [{record_id}]（{contact_name}）：\n"
+    for field in updated_fields:
+        result += f"• {field}\n"
+
+    return result
+
+
+@tool_registry.register(read_only=False)
+async def delete_record(ctx: ToolContext, record_id: Annotated[int, "記錄ID"]) -> str:
+    """刪除記錄"""
+    record = await ctx.db.scalar(
+        select(Record)
+        .join(Contact)
+        .where(Record.id == record_id, Contact.user_id == ctx.current_user.id)
+        .options(contains_eager(Record.contact))
+    )
+
+    if not record:
+        return f"找不到 ID 為 {record_id} 的記錄或您沒有權限。"
+
+    contact_name = record.contact.name if record.contact else "未知聯絡人"
+    record_category = record.category.value
+    record_content = (
+        str(record.content)[:30] + "..."
+        if len(str(record.content)) > 30
+        else str(record.content)
+    )
+
+    await ctx.db.delete(record)
+    await ctx.db.commit()
+    contact_summary_cache.invalidate_for_record(
+        ctx.current_user.id,  # type: ignore
+        record.category,
+    )
+
+    return f"✅ 已成功刪除記錄 [{record_id}]：{contact_name} - {record_category}: {record_content}"
+
+
+@tool_registry.register(read_only=True)
+async def get_record_categories(ctx: ToolContext) -> str:
+    """獲取所有可用的記錄分類"""
+    categories = [category.value for category in RecordCategory]
+
+    result = "可用的記錄分類：\n"
+    category_descriptions = {
+        "Communications": "📞 聯絡方式 - 社交媒體帳號、通訊軟體ID、連結等聯絡資訊",
+        "Nicknames": "🏷️ 暱稱 - 對聯絡人的稱呼或代號",
+        "Memories": "💭 回憶 - 共同回憶、重要事件記錄",
+        "Preferences": "❤️ 偏好 - 喜好、興趣、習慣等",
+        "Plan": "📅 計劃 - 未來計劃、約定、待辦事項",
+        "Other": "📝 其他 - 其他類型的記錄",
+    }
+
+    for category in categories:
+        description = category_descriptions.get(category, category)
+        result += f"• {description}\n"
+
+    return result
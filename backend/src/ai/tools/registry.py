@@ -0,0 +1,156 @@
+"""工具註冊表：以裝飾器註冊工具函數，並由函數簽名產生 Gemini 工具宣告"""
+
+import hashlib
+import inspect
+from types import MappingProxyType, NoneType, UnionType
+from typing import (
+    Annotated,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from google.genai import types
+
+from .context import ToolContext
+
+ToolFunction = Callable[..., Awaitable[str]]
+
+_SCHEMA_TYPES = {
+    str: types.Type.STRING,
+    int: types.Type.INTEGER,
+    float: types.Type.NUMBER,
+    bool: types.Type.BOOLEAN,
+}
+
+
+class RegisteredTool:
+    """已註冊的工具：處理函數、工具宣告與是否只讀取資料"""
+
+    def __init__(self, function: ToolFunction, read_only: bool):
+        self.name = function.__name__
+        self.function = function
+        self.read_only = read_only
+        self.declaration = _build_declaration(function)
+        self.parameters = frozenset(
+            (self.declaration.parameters.properties or {})
+            if self.declaration.parameters
+            else ()
+        )
+
+    async def __call__(self, context: ToolContext, args: Dict[str, Any]) -> str:
+        """執行工具，忽略宣告以外的參數"""
+        return await self.function(
+            context, **{key: args[key] for key in args if key in self.parameters}
+        )
+
+
+class ToolRegistry:
+    """
+    工具註冊表
+
+    工具函數以 @tool_registry.register(read_only=...) 註冊：第一個參數為 ToolContext，
+    其餘參數的型別註解（可用 Annotated 附上說明）與預設值產生工具宣告，
+    docstring 作為工具說明。read_only 的工具不會修改資料，可並行執行。
+    所有工具模組載入後註冊表即凍結，之後的分派只需一次字典查詢
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, RegisteredTool] = {}
+        self._frozen = False
+        self.declarations: Mapping[str, types.FunctionDeclaration] = MappingProxyType(
+            {}
+        )
+        self.tools: Tuple[types.Tool, ...] = ()
+        self.version = ""
+
+    def register(self, read_only: bool) -> Callable[[ToolFunction], ToolFunction]:
+        """註冊工具函數的裝飾器"""
+
+        def decorator(function: ToolFunction) -> ToolFunction:
+            if self._frozen:
+                raise RuntimeError(f"工具註冊表已凍結，無法註冊: {function.__name__}")
+            if function.__name__ in self._tools:
+                raise ValueError(f"工具名稱重複: {function.__name__}")
+
+            self._tools[function.__name__] = RegisteredTool(function, read_only)
+            return function
+
+        return decorator
+
+    def freeze(self) -> None:
+        """凍結註冊表，並預先建立傳送給模型的工具宣告與版本"""
+        self._tools = MappingProxyType(self._tools)  # type: ignore
+        self._frozen = True
+
+        self.declarations = MappingProxyType(
+            {name: tool.declaration for name, tool in self._tools.items()}
+        )
+        # 所有宣告合併為單一 Tool 傳送給模型
+        self.tools = (
+            types.Tool(function_declarations=list(self.declarations.values())),
+        )
+        self.version = hashlib.sha256(
+            "".join(
+                tool.model_dump_json(exclude_none=True) for tool in self.tools
+            ).encode()
+        ).hexdigest()[:16]
+
+    def get(self, name: Optional[str]) -> Optional[RegisteredTool]:
+        return self._tools.get(name) if name else None
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._tools
+
+
+def _build_declaration(function: ToolFunction) -> types.FunctionDeclaration:
+    """由函數簽名與 docstring 產生工具宣告"""
+    hints = get_type_hints(function, include_extras=True)
+    properties = {}
+    required = []
+
+    # 第一個參數為 ToolContext
+    for parameter in list(inspect.signature(function).parameters.values())[1:]:
+        annotation = hints.get(parameter.name, str)
+        description = None
+        if get_origin(annotation) is Annotated:
+            annotation, description = get_args(annotation)[:2]
+
+        # Optional[X] 視為 X
+        if get_origin(annotation) in (Union, UnionType):
+            annotation = next(
+                arg for arg in get_args(annotation) if arg is not NoneType
+            )
+
+        if annotation not in _SCHEMA_TYPES:
+            raise TypeError(
+                f"工具 {function.__name__} 的參數 {parameter.name} 型別不支援: {annotation}"
+            )
+
+        properties[parameter.name] = types.Schema(
+            type=_SCHEMA_TYPES[annotation], description=description
+        )
+        if parameter.default is inspect.Parameter.empty:
+            required.append(parameter.name)
+
+    return types.FunctionDeclaration(
+        name=function.__name__,
+        description=inspect.getdoc(function),
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties=properties,
+            required=required or None,
+        ),
+    )
+
+
+# 創建全局實例
+tool_registry = ToolRegistry()
@@ -0,0 +1,61 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Optional
+
+# 附件緩存的總容量上限（位元組）
+ATTACHMENT_CACHE_MAX_BYTES = int(
+    os.getenv("ATTACHMENT_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+
+
+class AttachmentStore:
+    """
+    聊天圖片附件緩存，以解碼後內容的 SHA-256 作為附件 ID
+
+    訊息只需引用附件 ID，歷史訊息中的圖片不必重新上傳與解碼；
+    依總位元組數做 LRU 淘汰，被淘汰的附件需由客戶端重新上傳
+    """
+
+    def __init__(self, max_bytes: int = ATTACHMENT_CACHE_MAX_BYTES):
+        self._max_bytes = max_bytes
+        self._total_bytes = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def put(self, data: bytes) -> str:
+        """
+        緩存圖片內容，回傳附件 ID；相同內容只會保存一份
+
+        Args:
+            data: 解碼後的圖片位元組
+
+        Returns:
+            附件 ID（內容的 SHA-256 十六進位字串）
+        """
+        attachment_id = hashlib.sha256(data).hexdigest()
+
+        if attachment_id in self._entries:
+            self._entries.move_to_end(attachment_id)
+            return attachment_id
+
+        self._entries[attachment_id] = data
+        self._total_bytes += len(data)
+        while self._total_bytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= len(evicted)
+
+        return attachment_id
+
+    def get(self, attachment_id: str) -> Optional[bytes]:
+        """取得附件內容，不存在或已被淘汰時回傳 None"""
+        data = self._entries.get(attachment_id)
+        if data is not None:
+            self._entries.move_to_end(attachment_id)
+        return data
+
+    def __contains__(self, attachment_id: str) -> bool:
+        return attachment_id in self._entries
+
+
+# 創建全局實例
+attachment_store = AttachmentStore()
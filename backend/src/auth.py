@@ -1,18 +1,22 @@
-from datetime import datetime, timedelta
-from typing import Optional
+import hashlib
+import hmac
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from .bounded_executor import ExecutorBusy
 from .database import get_db
-from .models import Contact, Record, User
+from .models import RefreshToken, User
+from .password_hasher import password_hasher
 from .schemas import TokenData
-
-# 密碼加密配置
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from .user_cache import user_cache
 
 # OAuth2 配置
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
@@ -20,45 +24,63 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 # JWT 配置
 SECRET_KEY = "your-secret-key-here-change-in-production"  # 在生產環境中應該使用環境變數
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 7 * 24 * 60  # 7 天
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# 刷新令牌有效天數，訪問令牌過期時以刷新令牌換發，不需再次輸入密碼
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    驗證密碼
+    驗證密碼（在密碼雜湊執行緒池中執行）
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except ExecutorBusy:
+        raise _password_hasher_busy()
 
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """
-    密碼雜湊
+    密碼雜湊（在密碼雜湊執行緒池中執行）
     """
-    return pwd_context.hash(password)
+    try:
+        return await password_hasher.hash(password)
+    except ExecutorBusy:
+        raise _password_hasher_busy()
 
 
-def get_user_by_username(db: Session, username: str) -> Optional[User]:
+def _password_hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="登入請求過多，請稍後再試",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
     """
     根據用戶名獲取用戶
     """
-    return db.query(User).filter(User.username == username).first()
+    return await db.scalar(select(User).where(User.username == username))
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """
     根據郵箱獲取用戶
     """
-    return db.query(User).filter(User.email == email).first()
+    return await db.scalar(select(User).where(User.email == email))
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+async def authenticate_user(
+    db: AsyncSession, username: str, password: str
+) -> Optional[User]:
     """
     驗證用戶身份
     """
-    user = get_user_by_username(db, username)
+    user = await get_user_by_username(db, username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         return None
     return user
 
@@ -77,8 +99,103 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def _hash_refresh_token(token: str) -> str:
+    return hmac.new(SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+
+
+def _add_refresh_token(db: AsyncSession, user_id: int, family: str) -> str:
+    token = secrets.token_urlsafe(32)
+    db.add(
+        RefreshToken(
+            token_hash=_hash_refresh_token(token),
+            family=family,
+            user_id=user_id,
+            expires_at=datetime.now(timezone.utc)
+            + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    return token
+
+
+async def _revoke_family(db: AsyncSession, family: str) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family == family, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def create_refresh_token(db: AsyncSession, user: User) -> str:
+    """
+    創建刷新令牌，開始新的令牌家族；資料庫只保存令牌的 HMAC 雜湊
+    """
+    token = _add_refresh_token(db, user.id, secrets.token_hex(16))  # type: ignore
+    await db.commit()
+    return token
+
+
+async def rotate_refresh_token(
+    db: AsyncSession, token: str
+) -> Optional[Tuple[User, str]]:
+    """
+    以刷新令牌換發同一家族的新刷新令牌，舊令牌立即失效
+
+    已輪替過的令牌再次被使用時視為外洩，撤銷整個家族的令牌
+    """
+    stored = await db.scalar(
+        select(RefreshToken).where(
+            RefreshToken.token_hash == _hash_refresh_token(token)
+        )
+    )
+    if stored is None:
+        return None
+    if stored.revoked_at is not None:
+        await _revoke_family(db, stored.family)  # type: ignore
+        return None
+
+    # 以條件更新標記舊令牌，並行使用同一令牌時只有一個請求能換發
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.id == stored.id,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:  # type: ignore
+        await db.rollback()
+        return None
+
+    user = await user_cache.get(db, stored.user_id)  # type: ignore
+    if user is None or not user.is_active:
+        await db.commit()
+        return None
+
+    new_token = _add_refresh_token(db, user.id, stored.family)  # type: ignore
+    await db.commit()
+    return user, new_token
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> None:
+    """
+    撤銷刷新令牌所屬家族的所有令牌（登出）
+    """
+    family = await db.scalar(
+        select(RefreshToken.family).where(
+            RefreshToken.token_hash == _hash_refresh_token(token)
+        )
+    )
+    if family is not None:
+        await _revoke_family(db, family)
+
+
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
 ):
     """
     獲取當前登入用戶
@@ -93,14 +210,22 @@ async def get_current_user(
         username = payload.get("sub")
         if username is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
+        token_data = TokenData(username=username, user_id=payload.get("uid"))
     except JWTError:
         raise credentials_exception
 
     if token_data.username is None:
         raise credentials_exception
 
-    user = get_user_by_username(db, username=token_data.username)
+    if token_data.user_id is not None:
+        user = await user_cache.get(db, token_data.user_id)
+        # 用戶名變更後，以舊用戶名簽發的令牌失效
+        if user is not None and user.username != token_data.username:
+            user = None
+    else:
+        # 舊版令牌只帶有用戶名
+        user = await get_user_by_username(db, username=token_data.username)
+
     if user is None:
         raise credentials_exception
     return user
@@ -113,30 +238,3 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="用戶帳號已被停用")
     return current_user
-
-
-async def get_user_contacts(
-    current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)
-):
-    query = (
-        db.query(Contact)
-        .filter(Contact.user_id == current_user.id)
-        .options(selectinload(Contact.records))
-    )
-
-    contacts = query.all()
-
-    return contacts
-
-
-async def get_user_records(
-    current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)
-):
-    """
-    獲取當前用戶的所有記錄
-    """
-    query = db.query(Record).join(Contact).filter(Contact.user_id == current_user.id)
-
-    records = query.all()
-
-    return records
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class ExecutorBusy(Exception):
+    """等待中的工作已達上限"""
+
+
+def _timed(submitted: float, function: Callable[..., T], *args: Any) -> Tuple[T, float]:
+    # 在工作執行緒或子程序中記錄排隊時間；time.monotonic 為系統時鐘，跨程序可比較
+    waited = time.monotonic() - submitted
+    return function(*args), waited
+
+
+class BoundedExecutor:
+    """
+    有排隊上限的執行器，讓阻塞或 CPU 密集的工作離開事件迴圈
+
+    workers 限制同時執行的工作數；超過 max_queue 個等待中的工作時拋出 ExecutorBusy，
+    讓呼叫端快速回應 503 而不是無限排隊。底層執行器在首次使用時才建立，
+    使用程序池時，工作函數與參數必須可以 pickle
+    """
+
+    def __init__(self, factory: Callable[[], Executor], workers: int, max_queue: int):
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._workers = workers
+        self._max_queue = max_queue
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        """在執行器中執行 function(*args)，排隊已滿時拋出 ExecutorBusy"""
+        if self._pending - self._workers >= self._max_queue:
+            self._rejected += 1
+            raise ExecutorBusy()
+
+        self._pending += 1
+        try:
+            result, waited = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), _timed, time.monotonic(), function, *args
+            )
+        finally:
+            self._pending -= 1
+
+        # 統計數值只在事件迴圈中更新
+        self._completed += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """排隊統計"""
+        return {
+            "workers": self._workers,
+            "active": min(self._pending, self._workers),
+            "queued": max(self._pending - self._workers, 0),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_wait_ms": round(self._total_wait / self._completed * 1000, 1)
+            if self._completed
+            else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 1),
+        }
+
+    def shutdown(self) -> None:
+        """關閉底層執行器，之後再使用時會重新建立"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._factory()
+        return self._executor
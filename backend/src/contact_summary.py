@@ -0,0 +1,125 @@
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Contact, Record, RecordCategory
+
+
+class ContactSummaryCache:
+    """
+    聯絡人摘要緩存，負責產生並緩存每位用戶放入系統 prompt 的聯絡人列表
+
+    聯絡人、暱稱記錄有寫入時需呼叫 invalidate()；另設 TTL 作為多 worker 部署時的保底
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300):
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._cache: "OrderedDict[int, Tuple[str, float]]" = OrderedDict()
+        # 只為建立中的摘要記錄版本與進行中的建立數，建立全部結束後移除，避免無限增長
+        self._versions: Dict[int, int] = {}
+        self._building: Dict[int, int] = {}
+
+    async def get_summary(self, db: AsyncSession, user_id: int) -> str:
+        """
+        獲取用戶的聯絡人摘要，緩存未命中時才查詢資料庫
+
+        Args:
+            db: 資料庫 session
+            user_id: 用戶 ID
+
+        Returns:
+            每行一位聯絡人的摘要字串，沒有聯絡人時為空字串
+        """
+        cached = self._get_cached(user_id)
+        if cached is not None:
+            return cached
+
+        version = self._versions.get(user_id, 0)
+        self._building[user_id] = self._building.get(user_id, 0) + 1
+        try:
+            summary = await self._build_summary(db, user_id)
+        finally:
+            # 建立期間若有寫入使緩存失效，則不寫回舊資料
+            current = self._versions.get(user_id, 0)
+            self._building[user_id] -= 1
+            if not self._building[user_id]:
+                del self._building[user_id]
+                self._versions.pop(user_id, None)
+
+        if current == version:
+            self._cache[user_id] = (summary, time.monotonic())
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+
+        return summary
+
+    def invalidate(self, user_id: int) -> None:
+        """清除指定用戶的緩存"""
+        if user_id in self._building:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        self._cache.pop(user_id, None)
+
+    def invalidate_for_record(
+        self, user_id: int, *categories: Optional[RecordCategory]
+    ) -> None:
+        """記錄寫入時，只有涉及暱稱分類才需要清除緩存"""
+        if RecordCategory.NICKNAMES in categories:
+            self.invalidate(user_id)
+
+    def clear(self) -> None:
+        """清除所有緩存"""
+        for user_id in list(self._cache):
+            self.invalidate(user_id)
+
+    def _get_cached(self, user_id: int) -> Optional[str]:
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return None
+
+        summary, cached_at = entry
+        if time.monotonic() - cached_at > self._ttl_seconds:
+            self._cache.pop(user_id, None)
+            return None
+
+        self._cache.move_to_end(user_id)
+        return summary
+
+    async def _build_summary(self, db: AsyncSession, user_id: int) -> str:
+        """只查詢摘要需要的欄位：聯絡人基本資料與暱稱內容"""
+        contacts = (
+            await db.execute(
+                select(Contact.id, Contact.name, Contact.description)
+                .where(Contact.user_id == user_id)
+                .order_by(Contact.id)
+            )
+        ).all()
+
+        if not contacts:
+            return ""
+
+        nicknames: Dict[int, List[str]] = defaultdict(list)
+        rows = await db.execute(
+            select(Record.contact_id, Record.content)
+            .join(Contact)
+            .where(
+                Contact.user_id == user_id,
+                Record.category == RecordCategory.NICKNAMES,
+            )
+            .order_by(Record.id)
+        )
+        for contact_id, content in rows:
+            nicknames[contact_id].append(content)
+
+        return "\n".join(
+            f"[ID: `{contact.id}`]{contact.name} (Also known as {', '.join(nicknames[contact.id])}) - {contact.description}"
+            for contact in contacts
+        )
+
+
+# 創建全局實例
+contact_summary_cache = ContactSummaryCache()
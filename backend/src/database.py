@@ -1,31 +1,125 @@
 import os
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 
-# SQLite 資料庫文件路徑
-SQLALCHEMY_DATABASE_URL = "sqlite:///./sitcon_camp.db"
+load_dotenv()
 
-# 創建資料庫引擎
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},  # SQLite 特有配置
+# 非同步驅動對應表：將同步 URL 轉換為對應的非同步驅動
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def get_database_url() -> str:
+    """
+    從環境變數讀取資料庫 URL，並轉換為非同步驅動
+    """
+    url = make_url(os.getenv("DATABASE_URL", "sqlite:///./sitcon_camp.db"))
+
+    if url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=ASYNC_DRIVERS[url.drivername])
+
+    return url.render_as_string(hide_password=False)
+
+
+SQLALCHEMY_DATABASE_URL = get_database_url()
+
+# 連線池配置
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # 秒
+
+# SQLite 連線參數
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # 毫秒
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    database = make_url(url).database
+    return _is_sqlite(url) and (not database or database == ":memory:")
+
+
+def _build_engine_options(url: str) -> dict:
+    """
+    建立引擎參數，記憶體資料庫不使用連線池大小設定
+    """
+    if _is_memory_sqlite(url):
+        return {}
+
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": not _is_sqlite(url),
+    }
+
+
+# 創建非同步資料庫引擎
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL, **_build_engine_options(SQLALCHEMY_DATABASE_URL)
 )
 
+
+if _is_sqlite(SQLALCHEMY_DATABASE_URL):
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        每個新連線套用 SQLite 調校參數：
+        WAL 模式讓讀取不會被單一寫入者阻塞，NORMAL 同步在 WAL 下仍保證一致性
+        """
+        cursor = dbapi_connection.cursor()
+        if not _is_memory_sqlite(SQLALCHEMY_DATABASE_URL):
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.close()
+
+
 # 創建 SessionLocal 類
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False：提交後仍可讀取物件屬性，避免在事件迴圈外觸發隱式查詢
+SessionLocal = async_sessionmaker(
+    bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 # 創建 Base 類
 Base = declarative_base()
 
 
-def get_db():
+def _create_missing_indexes(conn) -> None:
+    """
+    create_all 不會為已存在的資料表補建索引，在此逐一檢查並建立
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+async def init_db() -> None:
+    """
+    建立資料庫表與索引
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_missing_indexes)
+
+
+async def get_db():
     """
     資料庫依賴注入函數
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
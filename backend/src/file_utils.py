@@ -1,55 +1,137 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing
 import os
+import threading
+import time
 import uuid
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from io import BytesIO
-from typing import Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
+import certifi
+import urllib3
 from fastapi import HTTPException, UploadFile, status
 from minio import Minio
 from minio.error import S3Error
-from PIL import Image
+from PIL import Image, features
+
+from .bounded_executor import BoundedExecutor, ExecutorBusy
+
+# MinIO 連線池大小，也是同時進行的物件儲存操作數上限
+S3_MAX_POOL_SIZE = int(os.getenv("S3_MAX_POOL_SIZE", "32"))
+# 等待中的物件儲存操作上限，超過時回傳 503
+S3_MAX_QUEUE = int(os.getenv("S3_MAX_QUEUE", "100"))
+# 頭像圖片處理的程序數與等待中的上傳上限
+AVATAR_PROCESS_WORKERS = int(os.getenv("AVATAR_PROCESS_WORKERS", "2"))
+AVATAR_MAX_QUEUE = int(os.getenv("AVATAR_MAX_QUEUE", "16"))
+# 上傳時產生的頭像尺寸（最長邊像素），最大尺寸的 JPEG 即為 avatar_key
+AVATAR_SIZES = (64, 128, 512)
+# 上傳時產生的頭像格式，依偏好排序；JPEG 為所有瀏覽器都支援的後備格式
+AVATAR_FORMATS = (("avif",) if features.check("avif") else ()) + ("webp", "jpeg")
+# 每個多尺寸頭像都一定有的格式；AVIF 只在上傳時 Pillow 支援才會產生，
+# 預簽名網址不經過後端、無法在版本不存在時改用 JPEG，因此只使用這些格式
+PRESIGNED_AVATAR_FORMATS = ("webp", "jpeg")
+_AVATAR_EXTENSIONS = {"avif": "avif", "webp": "webp", "jpeg": "jpg"}
+_AVATAR_CONTENT_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+_AVATAR_SAVE_OPTIONS = {
+    "avif": {"format": "AVIF", "quality": 60},
+    "webp": {"format": "WEBP", "quality": 80},
+    "jpeg": {"format": "JPEG", "quality": 85, "optimize": True},
+}
+# 串流頭像時每次從 MinIO 讀取的位元組數
+AVATAR_CHUNK_SIZE = 64 * 1024
+# 頭像傳送方式：proxy 由後端串流；presigned 提供預簽名網址，讓瀏覽器直接從 MinIO 讀取
+AVATAR_DELIVERY = os.getenv("AVATAR_DELIVERY", "proxy")
+# 預簽名頭像網址的有效秒數
+AVATAR_URL_EXPIRE_SECONDS = int(os.getenv("AVATAR_URL_EXPIRE_SECONDS", "600"))
+
+# 已確認存在的 bucket，同一程序中只檢查一次
+_ready_buckets: Set[str] = set()
+_ready_buckets_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_minio_client() -> Minio:
+    """
+    獲取全程序共用的 MinIO 客戶端（首次呼叫時建立）
+
+    客戶端與其連線池可在多執行緒間共用，請求之間重用 keep-alive 連線
+    """
+    return _create_minio_client(
+        os.getenv("S3_ENDPOINT", "http://localhost:9000"),
+        # 指定區域可省去首次存取 bucket 時查詢區域的請求
+        region=os.getenv("S3_REGION") or None,
+    )
 
 
-def get_minio_client() -> Minio:
+@lru_cache(maxsize=1)
+def get_presign_client() -> Minio:
     """
-    獲取 MinIO 客戶端
+    獲取產生預簽名網址用的 MinIO 客戶端
+
+    簽章包含主機名稱；S3_ENDPOINT 不是瀏覽器可存取的位址時（例如 Docker 內部主機名），
+    以 S3_PUBLIC_ENDPOINT 另外建立客戶端。指定區域後簽章只在本地計算，不會連線到該位址
     """
-    endpoint = (
-        os.getenv("S3_ENDPOINT", "http://localhost:9000")
-        .replace("http://", "")
-        .replace("https://", "")
+    public_endpoint = os.getenv("S3_PUBLIC_ENDPOINT")
+    if not public_endpoint:
+        return get_minio_client()
+    return _create_minio_client(
+        public_endpoint, region=os.getenv("S3_REGION") or "us-east-1"
     )
+
+
+def _create_minio_client(endpoint_url: str, region: Optional[str]) -> Minio:
+    endpoint = endpoint_url.replace("http://", "").replace("https://", "")
     access_key = os.getenv("S3_ACCESS_KEY", "minioadmin")
     secret_key = os.getenv("S3_SECRET_KEY", "minioadmin")
-    secure = os.getenv("S3_ENDPOINT", "http://localhost:9000").startswith("https://")
+    secure = endpoint_url.startswith("https://")
+
+    # 與 minio 預設相同的重試策略，但縮短逾時並放大連線池
+    http_client = urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=5, read=30),
+        maxsize=S3_MAX_POOL_SIZE,
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=urllib3.Retry(
+            total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]
+        ),
+    )
 
-    return Minio(endpoint, access_key=access_key, secret_key=secret_key, secure=secure)
+    return Minio(
+        endpoint,
+        access_key=access_key,
+        secret_key=secret_key,
+        secure=secure,
+        region=region,
+        http_client=http_client,
+    )
 
 
 def ensure_bucket_exists(bucket_name: str) -> None:
     """
     確保 bucket 存在，如果不存在則創建
+
+    同一程序中確認成功後不再檢查；應用程式啟動時會先檢查一次
     """
+    if bucket_name in _ready_buckets:
+        return
+
     client = get_minio_client()
 
     try:
-        if not client.bucket_exists(bucket_name):
-            client.make_bucket(bucket_name)
-
-            # 設置 bucket 為公開讀取權限
-            policy = {
-                "Version": "2012-10-17",
-                "Statement": [
-                    {
-                        "Effect": "Allow",
-                        "Principal": {"AWS": "*"},
-                        "Action": ["s3:GetObject"],
-                        "Resource": [f"arn:aws:s3:::{bucket_name}/*"],
-                    }
-                ],
-            }
-            import json
-
-            client.set_bucket_policy(bucket_name, json.dumps(policy))
+        with _ready_buckets_lock:
+            if bucket_name in _ready_buckets:
+                return
+            _ensure_bucket(client, bucket_name)
+            _ready_buckets.add(bucket_name)
     except S3Error as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -57,6 +139,25 @@ def ensure_bucket_exists(bucket_name: str) -> None:
         )
 
 
+def _ensure_bucket(client: Minio, bucket_name: str) -> None:
+    if not client.bucket_exists(bucket_name):
+        client.make_bucket(bucket_name)
+
+        # 設置 bucket 為公開讀取權限
+        policy = {
+            "Version": "2012-10-17",
+            "Statement": [
+                {
+                    "Effect": "Allow",
+                    "Principal": {"AWS": "*"},
+                    "Action": ["s3:GetObject"],
+                    "Resource": [f"arn:aws:s3:::{bucket_name}/*"],
+                }
+            ],
+        }
+        client.set_bucket_policy(bucket_name, json.dumps(policy))
+
+
 def validate_image_file(file: UploadFile) -> None:
     """
     驗證上傳的圖片文件
@@ -79,31 +180,146 @@ def validate_image_file(file: UploadFile) -> None:
 
 
 def process_avatar_image(
-    file_content: bytes, max_size: Tuple[int, int] = (512, 512)
-) -> bytes:
+    file_content: bytes,
+    sizes: Tuple[int, ...] = AVATAR_SIZES,
+    formats: Tuple[str, ...] = AVATAR_FORMATS,
+) -> Dict[Tuple[int, str], bytes]:
     """
-    處理頭像圖片：調整大小和優化
+    處理頭像圖片：產生各尺寸與格式的版本
+
+    在圖片處理程序池中執行，失敗時直接拋出 Pillow 的例外
+
+    Returns:
+        Dict[Tuple[int, str], bytes]: (尺寸, 格式) 對應的圖片內容
     """
-    try:
-        image = Image.open(BytesIO(file_content))
+    image = Image.open(BytesIO(file_content))
 
-        # 轉換為 RGB 模式（如果需要）
-        if image.mode in ("RGBA", "P"):
-            image = image.convert("RGB")
+    # 轉換為 RGB 模式（如果需要）
+    if image.mode in ("RGBA", "P"):
+        image = image.convert("RGB")
 
+    renditions = {}
+    # 由大到小依序縮放，較小的尺寸從上一個尺寸縮小，不必每次處理原圖
+    for size in sorted(sizes, reverse=True):
         # 調整大小，保持比例
-        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
 
-        # 保存為 JPEG 格式
-        output = BytesIO()
-        image.save(output, format="JPEG", quality=85, optimize=True)
-        output.seek(0)
+        for image_format in formats:
+            output = BytesIO()
+            image.save(output, **_AVATAR_SAVE_OPTIONS[image_format])
+            renditions[(size, image_format)] = output.getvalue()
 
-        return output.getvalue()
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=f"圖片處理失敗: {str(e)}"
+    return renditions
+
+
+def avatar_rendition_key(avatar_key: str, size: int, image_format: str) -> str:
+    """
+    頭像指定尺寸與格式版本的對象鍵
+
+    多尺寸上傳的頭像以 <目錄>/<尺寸>.<副檔名> 儲存在 avatar_key 旁，avatar_key 為
+    最大尺寸的 JPEG；舊版上傳的頭像只有單一 JPEG，所有尺寸與格式都使用 avatar_key
+    """
+    directory, _, filename = avatar_key.rpartition("/")
+    if filename != f"{AVATAR_SIZES[-1]}.jpg":
+        return avatar_key
+    return f"{directory}/{size}.{_AVATAR_EXTENSIONS[image_format]}"
+
+
+def select_avatar_size(requested: Optional[int]) -> int:
+    """選擇不小於 requested 的最小尺寸，未指定或超過最大尺寸時使用最大尺寸"""
+    if requested is None:
+        return AVATAR_SIZES[-1]
+    return next((size for size in AVATAR_SIZES if size >= requested), AVATAR_SIZES[-1])
+
+
+def negotiate_avatar_format(
+    accept: Optional[str], formats: Tuple[str, ...] = AVATAR_FORMATS
+) -> str:
+    """
+    依 Accept 標頭選擇頭像格式
+
+    依 formats 的偏好順序選擇第一個客戶端明確接受的格式（q=0 視為不接受），
+    都不接受時使用 JPEG
+    """
+    accepted = set()
+    for media_range in (accept or "").split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    pass
+        if quality > 0:
+            accepted.add(media_type.lower())
+
+    for image_format in formats:
+        if _AVATAR_CONTENT_TYPES[image_format] in accepted:
+            return image_format
+    return "jpeg"
+
+
+# 圖片縮放與編碼是 CPU 密集工作，在獨立程序中執行以免佔用事件迴圈與 GIL；
+# 以 spawn 建立子程序，避免 fork 複製事件迴圈與資料庫連線的執行緒狀態
+avatar_image_pool = BoundedExecutor(
+    lambda: ProcessPoolExecutor(
+        max_workers=AVATAR_PROCESS_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    ),
+    workers=AVATAR_PROCESS_WORKERS,
+    max_queue=AVATAR_MAX_QUEUE,
+)
+
+# MinIO 客戶端為同步 I/O，在執行緒池中執行；執行緒數與連線池大小相同
+object_storage_pool = BoundedExecutor(
+    lambda: ThreadPoolExecutor(
+        max_workers=S3_MAX_POOL_SIZE, thread_name_prefix="object-storage"
+    ),
+    workers=S3_MAX_POOL_SIZE,
+    max_queue=S3_MAX_QUEUE,
+)
+
+
+def _busy(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": "1"},
+    )
+
+
+def _upload_error(error: BaseException) -> HTTPException:
+    if isinstance(error, ExecutorBusy):
+        return _busy("頭像上傳請求過多，請稍後再試")
+    if isinstance(error, HTTPException):
+        return error
+    if isinstance(error, S3Error):
+        return HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"文件上傳失敗: {str(error)}",
         )
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"處理文件時發生錯誤: {str(error)}",
+    )
+
+
+def _put_avatar(
+    bucket_name: str,
+    object_name: str,
+    content: bytes,
+    content_type: str = "image/jpeg",
+) -> None:
+    ensure_bucket_exists(bucket_name)
+    get_minio_client().put_object(
+        bucket_name,
+        object_name,
+        BytesIO(content),
+        length=len(content),
+        content_type=content_type,
+    )
 
 
 async def upload_avatar(
@@ -112,13 +328,17 @@ async def upload_avatar(
     """
     上傳頭像文件到 MinIO
 
+    產生 AVATAR_SIZES 與 AVATAR_FORMATS 的所有版本；圖片處理在程序池、上傳在執行緒池中
+    執行，任一池排隊已滿時回傳 503
+
     Args:
         file: 上傳的文件
         user_id: 用戶 ID
         contact_id: 聯絡人 ID（可選）
 
     Returns:
-        str: MinIO 中的對象鍵 (object key)
+        str: 最大尺寸 JPEG 在 MinIO 中的對象鍵 (object key)，其他版本以
+            avatar_rendition_key 取得
     """
     # 驗證文件
     validate_image_file(file)
@@ -126,56 +346,62 @@ async def upload_avatar(
     # 獲取配置
     bucket_name = os.getenv("S3_BUCKET", "my-bucket")
 
-    # 確保 bucket 存在
-    ensure_bucket_exists(bucket_name)
-
+    # 讀取並處理圖片
+    file_content = await file.read()
     try:
-        # 讀取文件內容
-        file_content = await file.read()
-
-        # 處理圖片
-        processed_content = process_avatar_image(file_content)
-
-        # 生成文件名
-        file_extension = "jpg"  # 處理後都轉換為 JPEG
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-
-        # 構建對象路徑
-        if contact_id:
-            object_name = (
-                f"avatars/users/{user_id}/contacts/{contact_id}/{unique_filename}"
-            )
-        else:
-            object_name = f"avatars/users/{user_id}/{unique_filename}"
-
-        # 上傳到 MinIO
-        client = get_minio_client()
-        client.put_object(
-            bucket_name,
-            object_name,
-            BytesIO(processed_content),
-            length=len(processed_content),
-            content_type="image/jpeg",
-        )
-
-        # 返回 object key 而不是完整 URL
-        return object_name
-
-    except S3Error as e:
+        renditions = await avatar_image_pool.run(process_avatar_image, file_content)
+    except ExecutorBusy:
+        raise _busy("頭像上傳請求過多，請稍後再試")
+    except BrokenExecutor as e:
+        # 子程序異常結束，關閉程序池讓下一次上傳重新建立
+        avatar_image_pool.shutdown()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"文件上傳失敗: {str(e)}",
+            detail=f"圖片處理程序異常: {str(e)}",
         )
     except Exception as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"處理文件時發生錯誤: {str(e)}",
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"圖片處理失敗: {str(e)}"
         )
 
+    # 構建對象路徑：每次上傳使用新的目錄，各版本儲存在同一目錄下
+    avatar_id = uuid.uuid4()
+    if contact_id:
+        directory = f"avatars/users/{user_id}/contacts/{contact_id}/{avatar_id}"
+    else:
+        directory = f"avatars/users/{user_id}/{avatar_id}"
+    object_name = f"{directory}/{AVATAR_SIZES[-1]}.jpg"
+
+    # 同時上傳所有版本到 MinIO（首次上傳時確認 bucket 存在）
+    results = await asyncio.gather(
+        *(
+            object_storage_pool.run(
+                _put_avatar,
+                bucket_name,
+                avatar_rendition_key(object_name, size, image_format),
+                content,
+                _AVATAR_CONTENT_TYPES[image_format],
+            )
+            for (size, image_format), content in renditions.items()
+        ),
+        return_exceptions=True,
+    )
+    error = next(
+        (result for result in results if isinstance(result, BaseException)), None
+    )
+
+    if error is not None:
+        # 清除已上傳的部分版本
+        await delete_avatar(object_name)
+        raise _upload_error(error)
 
-def delete_avatar(avatar_key: str) -> None:
+    # 返回 object key 而不是完整 URL
+    return object_name
+
+
+async def delete_avatar(avatar_key: str) -> None:
     """
-    從 MinIO 刪除頭像文件
+    從 MinIO 刪除頭像文件及其所有尺寸與格式的版本
 
     Args:
         avatar_key: MinIO 中的對象鍵
@@ -183,34 +409,87 @@ def delete_avatar(avatar_key: str) -> None:
     if not avatar_key:
         return
 
-    try:
-        # 獲取配置
-        bucket_name = os.getenv("S3_BUCKET", "my-bucket")
+    # 獲取配置
+    bucket_name = os.getenv("S3_BUCKET", "my-bucket")
+    object_names = {
+        avatar_rendition_key(avatar_key, size, image_format)
+        for size in AVATAR_SIZES
+        for image_format in _AVATAR_EXTENSIONS
+    }
+
+    # 從 MinIO 刪除；文件不存在或刪除失敗（包括排隊已滿）時忽略錯誤，不影響主要業務邏輯
+    await asyncio.gather(
+        *(
+            object_storage_pool.run(
+                get_minio_client().remove_object, bucket_name, object_name
+            )
+            for object_name in object_names
+        ),
+        return_exceptions=True,
+    )
+
+
+class AvatarStream:
+    """
+    MinIO 頭像物件的串流回應
+
+    以固定大小的區塊讀取物件內容，讀取完畢、中斷或呼叫 close() 時將連線歸還連線池
+    """
 
-        # 從 MinIO 刪除
-        client = get_minio_client()
-        client.remove_object(bucket_name, avatar_key)
+    def __init__(self, response: urllib3.BaseHTTPResponse, avatar_key: str):
+        self._response = response
+        self.content_type = response.headers.get(
+            "Content-Type"
+        ) or _avatar_content_type(avatar_key)
+        self.content_length = response.headers.get("Content-Length")
 
-    except S3Error:
-        # 如果文件不存在或刪除失敗，忽略錯誤
-        pass
-    except Exception:
-        # 忽略其他錯誤，不影響主要業務邏輯
-        pass
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            yield from self._response.stream(AVATAR_CHUNK_SIZE)
+        finally:
+            self.close()
 
+    def close(self) -> None:
+        # 可重複呼叫；release_conn 在連線歸還後不再有作用
+        self._response.close()
+        self._response.release_conn()
 
-def get_avatar_file(avatar_key: str) -> Tuple[bytes, str]:
+
+def avatar_etag(avatar_key: str) -> str:
+    """
+    頭像的強 ETag
+
+    每次上傳都使用新的隨機對象鍵，同一個鍵的內容不會改變，
+    因此直接由對象鍵產生，驗證 If-None-Match 時不需要存取 MinIO
     """
-    從 MinIO 獲取頭像文件內容
+    return f'"{hashlib.sha256(avatar_key.encode()).hexdigest()[:32]}"'
+
+
+def _avatar_content_type(avatar_key: str) -> str:
+    content_type = "image/jpeg"  # 舊版上傳的頭像都轉換為 JPEG
+    if avatar_key.lower().endswith(".avif"):
+        content_type = "image/avif"
+    elif avatar_key.lower().endswith(".png"):
+        content_type = "image/png"
+    elif avatar_key.lower().endswith(".gif"):
+        content_type = "image/gif"
+    elif avatar_key.lower().endswith(".webp"):
+        content_type = "image/webp"
+    return content_type
+
+
+async def open_avatar_stream(avatar_key: str) -> AvatarStream:
+    """
+    從 MinIO 開啟頭像文件的串流
 
     Args:
         avatar_key: MinIO 中的對象鍵
 
     Returns:
-        Tuple[bytes, str]: (文件內容, 內容類型)
+        AvatarStream: 逐區塊讀取的頭像內容，迭代時的阻塞讀取應在執行緒池中進行
 
     Raises:
-        HTTPException: 當文件不存在或獲取失敗時
+        HTTPException: 當文件不存在、獲取失敗或排隊已滿時
     """
     if not avatar_key:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="頭像不存在")
@@ -219,24 +498,14 @@ def get_avatar_file(avatar_key: str) -> Tuple[bytes, str]:
         # 獲取配置
         bucket_name = os.getenv("S3_BUCKET", "my-bucket")
 
-        # 從 MinIO 獲取文件
-        client = get_minio_client()
-        response = client.get_object(bucket_name, avatar_key)
-
-        # 讀取文件內容
-        file_content = response.read()
-
-        # 確定內容類型
-        content_type = "image/jpeg"  # 因為我們所有頭像都轉換為 JPEG
-        if avatar_key.lower().endswith(".png"):
-            content_type = "image/png"
-        elif avatar_key.lower().endswith(".gif"):
-            content_type = "image/gif"
-        elif avatar_key.lower().endswith(".webp"):
-            content_type = "image/webp"
-
-        return file_content, content_type
+        # 從 MinIO 開啟文件，只讀取回應標頭
+        response = await object_storage_pool.run(
+            get_minio_client().get_object, bucket_name, avatar_key
+        )
+        return AvatarStream(response, avatar_key)
 
+    except ExecutorBusy:
+        raise _busy("頭像請求過多，請稍後再試")
     except S3Error as e:
         if e.code == "NoSuchKey":
             raise HTTPException(
@@ -252,3 +521,52 @@ def get_avatar_file(avatar_key: str) -> Tuple[bytes, str]:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"處理頭像時發生錯誤: {str(e)}",
         )
+
+
+def _presign_avatars(bucket_name: str, avatar_keys: List[str]) -> List[str]:
+    client = get_presign_client()
+
+    # 簽章時間對齊到半個有效期：同一時段內網址不變，瀏覽器可以重用已下載的圖片，
+    # 且回傳的網址至少還有半個有效期
+    window = max(AVATAR_URL_EXPIRE_SECONDS // 2, 1)
+    now = int(time.time())
+    request_date = datetime.fromtimestamp(now - now % window, timezone.utc)
+
+    return [
+        client.presigned_get_object(
+            bucket_name,
+            avatar_key,
+            expires=timedelta(seconds=AVATAR_URL_EXPIRE_SECONDS),
+            response_headers={"response-cache-control": f"private, max-age={window}"},
+            request_date=request_date,
+        )
+        for avatar_key in avatar_keys
+    ]
+
+
+async def presign_avatar_urls(avatar_keys: List[str]) -> List[str]:
+    """
+    產生頭像的預簽名 GET 網址，圖片內容不經過後端
+
+    Args:
+        avatar_keys: MinIO 中的對象鍵
+
+    Returns:
+        List[str]: 與 avatar_keys 順序相同、有效 AVATAR_URL_EXPIRE_SECONDS 秒的網址
+
+    Raises:
+        HTTPException: 當簽章失敗或排隊已滿時
+    """
+    if not avatar_keys:
+        return []
+
+    try:
+        bucket_name = os.getenv("S3_BUCKET", "my-bucket")
+        return await object_storage_pool.run(_presign_avatars, bucket_name, avatar_keys)
+    except ExecutorBusy:
+        raise _busy("頭像請求過多，請稍後再試")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"產生頭像網址失敗: {str(e)}",
+        )
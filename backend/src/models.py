@@ -6,15 +6,28 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
 )
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from .database import Base
 
+# 游標分頁依 created_at 排序；SQLite 以字串儲存時間，server_default 寫入的
+# CURRENT_TIMESTAMP 不含微秒，綁定參數時使用相同格式才能得到正確的字典序
+CreatedAt = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        timezone=True,
+        storage_format="%(year)04d-%(month)02d-%(day)02d "
+        "%(hour)02d:%(minute)02d:%(second)02d",
+    ),
+    "sqlite",
+)
+
 
 class RecordCategory(enum.Enum):
     """
@@ -49,6 +62,12 @@ class User(Base):
     contacts = relationship(
         "Contact", back_populates="user", cascade="all, delete-orphan"
     )
+    chat_sessions = relationship(
+        "ChatSession", back_populates="user", cascade="all, delete-orphan"
+    )
+    refresh_tokens = relationship(
+        "RefreshToken", back_populates="user", cascade="all, delete-orphan"
+    )
 
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}')>"
@@ -70,13 +89,21 @@ class Contact(Base):
         ForeignKey("users.id", onupdate="CASCADE", ondelete="CASCADE"),
         nullable=False,
     )
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(CreatedAt, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # 關聯關係
+    # 記錄與聯絡人之間不允許隱式延遲載入，需要時以 selectinload / contains_eager
+    # 明確載入，避免在迴圈中逐筆查詢（N+1）；刪除時的級聯仍由 ORM 自行載入
     user = relationship("User", back_populates="contacts")
     records = relationship(
-        "Record", back_populates="contact", cascade="all, delete-orphan"
+        "Record", back_populates="contact", cascade="all, delete-orphan", lazy="raise"
+    )
+
+    # 所有查詢都以 user_id 限定擁有者，索引以 user_id 為前綴
+    __table_args__ = (
+        Index("ix_contacts_user_id_name", "user_id", "name"),
+        Index("ix_contacts_user_id_created_at_id", "user_id", "created_at", "id"),
     )
 
     def __repr__(self):
@@ -98,11 +125,119 @@ class Record(Base):
         ForeignKey("contacts.id", onupdate="CASCADE", ondelete="CASCADE"),
         nullable=False,
     )
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(CreatedAt, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # 關聯關係
-    contact = relationship("Contact", back_populates="records")
+    contact = relationship("Contact", back_populates="records", lazy="raise")
+
+    # 記錄查詢皆透過 contact_id 限定範圍，再依分類過濾或依時間分頁
+    __table_args__ = (
+        Index("ix_records_contact_id_category", "contact_id", "category"),
+        Index("ix_records_contact_id_created_at_id", "contact_id", "created_at", "id"),
+    )
 
     def __repr__(self):
         return f"<Record(id={self.id}, category='{self.category.value}', contact_id={self.contact_id})>"
+
+
+class ChatSession(Base):
+    """
+    聊天對話資料模型 - 在伺服器端保存對話歷史與較早訊息的摘要
+    """
+
+    __tablename__ = "chat_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String(100), nullable=True)
+    summary = Column(Text, nullable=True)  # 已移出歷史視窗的訊息的滾動摘要
+    summarized_until = Column(Integer, nullable=True)  # 已納入摘要的最後一則訊息 ID
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", onupdate="CASCADE", ondelete="CASCADE"),
+        nullable=False,
+    )
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    # 關聯關係
+    user = relationship("User", back_populates="chat_sessions")
+    messages = relationship(
+        "ChatSessionMessage",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        order_by="ChatSessionMessage.id",
+    )
+
+    # 對話列表依最近更新時間排序
+    __table_args__ = (
+        Index("ix_chat_sessions_user_id_updated_at", "user_id", "updated_at"),
+    )
+
+    def __repr__(self):
+        return f"<ChatSession(id={self.id}, user_id={self.user_id})>"
+
+
+class ChatSessionMessage(Base):
+    """
+    聊天訊息資料模型 - 屬於對話的單則訊息
+    """
+
+    __tablename__ = "chat_session_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    role = Column(String(20), nullable=False)
+    content = Column(Text, nullable=False)  # JSON，圖片只保存附件 ID
+    token_count = Column(Integer, nullable=False)  # 估算的 token 數
+    session_id = Column(
+        Integer,
+        ForeignKey("chat_sessions.id", onupdate="CASCADE", ondelete="CASCADE"),
+        nullable=False,
+    )
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # 關聯關係
+    session = relationship("ChatSession", back_populates="messages")
+
+    # 歷史視窗依 session_id 取出並依 id 排序
+    __table_args__ = (
+        Index("ix_chat_session_messages_session_id_id", "session_id", "id"),
+    )
+
+    def __repr__(self):
+        return f"<ChatSessionMessage(id={self.id}, role='{self.role}', session_id={self.session_id})>"
+
+
+class RefreshToken(Base):
+    """
+    刷新令牌資料模型 - 只保存令牌的 HMAC 雜湊，每次使用後輪替
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_hash = Column(String(64), nullable=False)  # HMAC-SHA256 十六進位字串
+    family = Column(String(32), nullable=False)  # 同一次登入輪替出的令牌共用
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", onupdate="CASCADE", ondelete="CASCADE"),
+        nullable=False,
+    )
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)  # 輪替、登出或撤銷時間
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # 關聯關係
+    user = relationship("User", back_populates="refresh_tokens")
+
+    # 刷新時依雜湊查詢，撤銷時依家族批次更新
+    __table_args__ = (
+        Index("ix_refresh_tokens_token_hash", "token_hash", unique=True),
+        Index("ix_refresh_tokens_family", "family"),
+        Index("ix_refresh_tokens_user_id", "user_id"),
+    )
+
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, family='{self.family}')>"
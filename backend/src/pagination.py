@@ -0,0 +1,106 @@
+"""游標（keyset）分頁工具"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """
+    將 (created_at, id) 編碼為不透明的游標字串
+    """
+    payload = json.dumps({"c": created_at.isoformat(), "i": id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    解析游標字串，格式錯誤時回傳 400
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="無效的游標"
+        )
+
+
+def apply_cursor(query: Select, model, cursor: Optional[str]) -> Select:
+    """
+    依 (created_at, id) 排序，並從游標之後開始取資料
+    """
+    query = query.order_by(model.created_at, model.id)
+
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        # 以欄位型別綁定游標時間，與資料庫的儲存格式一致
+        query = query.where(
+            tuple_(model.created_at, model.id)
+            > tuple_(literal(created_at, model.created_at.type), id)
+        )
+
+    return query
+
+
+def split_page(rows: Sequence[T], limit: int) -> Tuple[Sequence[T], Optional[str]]:
+    """
+    查詢時多取一筆以判斷是否還有下一頁，回傳 (本頁資料, 下一頁游標)
+    """
+    if len(rows) <= limit:
+        return rows, None
+
+    page = rows[: max(limit, 0)]
+    if not page:
+        return page, None
+
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    model,
+    *,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    include_total: bool,
+    ranked: bool = False,
+) -> Tuple[Sequence, Optional[int], Optional[str]]:
+    """
+    執行分頁查詢，回傳 (本頁資料, 總數, 下一頁游標)
+
+    一般列表依 (created_at, id) 做 keyset 分頁，每頁成本只與頁面大小相關；
+    搜索結果依相關度排序（ranked），僅支援 skip 分頁
+    """
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+
+    if ranked:
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="搜索結果依相關度排序，請使用 skip 分頁",
+            )
+        rows = (await db.scalars(query.offset(skip).limit(limit))).all()
+        return rows, total, None
+
+    query = apply_cursor(query, model, cursor)
+    if not cursor:
+        query = query.offset(skip)
+
+    rows = (await db.scalars(query.limit(limit + 1))).all()
+    page, next_cursor = split_page(rows, limit)
+    return page, total, next_cursor
@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+from passlib.context import CryptContext
+
+from .bounded_executor import BoundedExecutor
+
+# 同時進行的密碼雜湊數量上限
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# 等待中的密碼雜湊請求上限，超過時直接拒絕
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "100"))
+
+
+class PasswordHasher:
+    """
+    在專用執行緒池中進行 bcrypt 雜湊與驗證，避免每次登入阻塞事件迴圈數百毫秒
+
+    bcrypt 計算期間會釋放 GIL，因此執行緒池即可與事件迴圈並行；workers 限制同時進行的
+    雜湊數量，避免登入尖峰佔滿 CPU，超過 max_queue 個等待中的請求時拋出 ExecutorBusy
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 100):
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self._pool = BoundedExecutor(
+            lambda: ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-hash"
+            ),
+            workers=workers,
+            max_queue=max_queue,
+        )
+
+    async def hash(self, password: str) -> str:
+        """密碼雜湊"""
+        return await self._pool.run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """驗證密碼"""
+        return await self._pool.run(self.context.verify, password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """執行緒池的排隊統計"""
+        return self._pool.stats()
+
+
+# 創建全局實例
+password_hasher = PasswordHasher(
+    workers=PASSWORD_HASH_WORKERS, max_queue=PASSWORD_HASH_MAX_QUEUE
+)
@@ -83,6 +83,10 @@ class PromptManager:
         """獲取 Siri prompt 內容的便捷方法"""
         return self.get_prompt("siri", use_cache)
 
+    def get_summary_prompt(self, use_cache: bool = True) -> str:
+        """獲取對話摘要 prompt 內容的便捷方法，包含 {summary} 與 {transcript} 佔位符"""
+        return self.get_prompt("summary", use_cache)
+
 
 # 創建全局實例
 prompt_manager = PromptManager()
@@ -2,20 +2,23 @@ from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     authenticate_user,
     create_access_token,
+    create_refresh_token,
     get_current_active_user,
     get_password_hash,
     get_user_by_email,
     get_user_by_username,
+    revoke_refresh_token,
+    rotate_refresh_token,
 )
 from ..database import get_db
 from ..models import User
-from ..schemas import Token, UserCreate, UserResponse
+from ..schemas import RefreshTokenRequest, Token, UserCreate, UserResponse
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -23,26 +26,26 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 @router.post(
     "/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED
 )
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     用戶註冊端點
     """
     # 檢查用戶名是否已存在
-    db_user = get_user_by_username(db, username=user.username)
+    db_user = await get_user_by_username(db, username=user.username)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="用戶名已存在"
         )
 
     # 檢查郵箱是否已存在
-    db_user = get_user_by_email(db, email=str(user.email))
+    db_user = await get_user_by_email(db, email=str(user.email))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="郵箱已被註冊"
         )
 
     # 創建新用戶
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     db_user = User(
         email=str(user.email),
         username=user.username,
@@ -52,20 +55,21 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     return db_user
 
 
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     用戶登入端點
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -78,11 +82,47 @@ async def login_for_access_token(
             status_code=status.HTTP_400_BAD_REQUEST, detail="用戶帳號已被停用"
         )
 
+    refresh_token = await create_refresh_token(db, user)
+    return _token_response(user, refresh_token)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    request: RefreshTokenRequest, db: AsyncSession = Depends(get_db)
+):
+    """
+    刷新令牌端點：以刷新令牌換發新的訪問令牌與刷新令牌，不需再次驗證密碼
+    """
+    rotated = await rotate_refresh_token(db, request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="刷新令牌無效或已過期",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    user, refresh_token = rotated
+    return _token_response(user, refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
+    """
+    登出端點：撤銷刷新令牌（及同一次登入輪替出的所有刷新令牌）
+    """
+    await revoke_refresh_token(db, request.refresh_token)
+
+
+def _token_response(user: User, refresh_token: str) -> dict:
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+    }
 
 
 @router.get("/@me", response_model=UserResponse)
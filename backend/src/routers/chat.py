@@ -1,27 +1,173 @@
 import json
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..ai import UnifiedToolHandler, gemini_stream_chat_with_tools
-from ..auth import get_current_active_user, get_user_contacts, get_user_records
+from ..ai.chat import EMPTY_REPLY, ERROR_REPLY
+from ..ai.history import load_all_messages, load_history, save_messages
+from ..attachments import attachment_store
+from ..auth import get_current_active_user
+from ..contact_summary import contact_summary_cache
 from ..database import get_db
-from ..models import Contact, Record, RecordCategory, User
+from ..models import ChatSession, User
 from ..prompt_manager import prompt_manager
-from ..schemas import ChatRequest, ChatStreamChunk, ImageContent
+from ..schemas import (
+    AttachmentUploadResponse,
+    ChatMessage,
+    ChatRequest,
+    ChatSessionCreate,
+    ChatSessionDetailResponse,
+    ChatSessionResponse,
+    ChatStreamChunk,
+    ImageContent,
+)
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+SUPPORTED_IMAGE_TYPES = [
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+    "image/heic",
+    "image/heif",
+]
+MAX_ATTACHMENT_SIZE = 20 * 1024 * 1024  # 20MB
+
+
+@router.post("/attachments", response_model=AttachmentUploadResponse)
+async def upload_chat_attachment(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    上傳聊天圖片附件
+
+    回傳的 attachment_id 為圖片內容的雜湊值，之後的訊息（包含歷史訊息）
+    只需在 ImageContent 中帶入 attachment_id，不必再傳送 base64 資料。
+    附件只保存在伺服器記憶體中，過期後聊天端點會回傳 410，客戶端需重新上傳或附上 data
+    """
+    if file.content_type not in SUPPORTED_IMAGE_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支援的圖片格式: {file.content_type}。支援的格式: {', '.join(SUPPORTED_IMAGE_TYPES)}",
+        )
+
+    data = await file.read()
+    if len(data) > MAX_ATTACHMENT_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"文件過大: {len(data)} bytes。最大允許: {MAX_ATTACHMENT_SIZE} bytes",
+        )
+
+    return AttachmentUploadResponse(
+        attachment_id=attachment_store.put(data),
+        size=len(data),
+        content_type=file.content_type,
+    )
+
+
+async def _get_user_session(
+    db: AsyncSession, session_id: int, current_user: User
+) -> ChatSession:
+    session = await db.scalar(
+        select(ChatSession).where(
+            ChatSession.id == session_id, ChatSession.user_id == current_user.id
+        )
+    )
+
+    if not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="對話未找到")
+
+    return session
+
+
+@router.post(
+    "/sessions",
+    response_model=ChatSessionResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_chat_session(
+    session: ChatSessionCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    創建伺服器端對話，之後的聊天請求帶入 session_id 即可只傳送新訊息
+    """
+    db_session = ChatSession(title=session.title, user_id=current_user.id)
+    db.add(db_session)
+    await db.commit()
+    await db.refresh(db_session)
+
+    return db_session
+
+
+@router.get("/sessions", response_model=List[ChatSessionResponse])
+async def get_chat_sessions(
+    skip: int = 0,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    獲取當前用戶的對話列表，依最近更新時間排序
+    """
+    query = (
+        select(ChatSession)
+        .where(ChatSession.user_id == current_user.id)
+        .order_by(ChatSession.updated_at.desc(), ChatSession.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+
+    return (await db.scalars(query)).all()
+
+
+@router.get("/sessions/{session_id}", response_model=ChatSessionDetailResponse)
+async def get_chat_session(
+    session_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    獲取對話詳情與所有訊息
+    """
+    session = await _get_user_session(db, session_id, current_user)
+
+    return ChatSessionDetailResponse(
+        id=session.id,  # type: ignore
+        title=session.title,  # type: ignore
+        created_at=session.created_at,  # type: ignore
+        updated_at=session.updated_at,  # type: ignore
+        summary=session.summary,  # type: ignore
+        messages=await load_all_messages(db, session),
+    )
+
+
+@router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_chat_session(
+    session_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    刪除對話與其所有訊息
+    """
+    session = await _get_user_session(db, session_id, current_user)
+
+    await db.delete(session)
+    await db.commit()
+
 
 @router.post("/siri")
 async def chat_endpoint(
     chat_request: ChatRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
-    contacts: List[Contact] = Depends(get_user_contacts),
-    records: List[Record] = Depends(get_user_records),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     智能聊天助手端點 - 支援聯絡人和記錄管理工具功能 (Server-Sent Events)
@@ -50,8 +196,13 @@ async def chat_endpoint(
     1. 純文字：content 為字串
     2. 多媒體：content 為包含 TextContent 和 ImageContent 的列表
 
+    對話歷史：
+    - 由客戶端在 history_messages 中傳送完整歷史
+    - 或先透過 /chat/sessions 創建對話，之後只需帶入 session_id 與新訊息
+
     圖片格式要求：
     - 支援 base64 編碼的圖片資料或 data URL
+    - 或先透過 /chat/attachments 上傳，再以 attachment_id 引用
     - 支援的格式：JPEG、PNG、WebP、HEIC、HEIF
     - 建議圖片大小不超過 20MB
 
@@ -65,16 +216,13 @@ async def chat_endpoint(
     客戶端可以使用 EventSource API 來處理這些事件。
     """
 
-    # 使用 prompt manager 讀取系統 prompt
-    system_prompt = prompt_manager.get_siri_prompt().replace(
-        "%user_contacts%",
-        "\n".join(
-            [
-                f"[ID: `{contact.id}`]{contact.name} (Also known as {', '.join([record.content for record in contact.records if record.category == RecordCategory.NICKNAMES])}) - {contact.description}"
-                for contact in contacts
-            ]
-        )
-        or "使用者目前沒有任何聯絡人，請告訴使用者透過左側的按鈕新增聯絡人",
+    # 使用 prompt manager 讀取靜態系統 prompt（放入 Gemini 上下文緩存），
+    # 聯絡人摘要由緩存提供，作為每個使用者各自的上下文
+    system_prompt = prompt_manager.get_siri_prompt()
+    user_contacts = await contact_summary_cache.get_summary(db, current_user.id)  # type: ignore
+    user_context = "## 👤 Contact List\n\n" + (
+        user_contacts
+        or "使用者目前沒有任何聯絡人，請告訴使用者透過左側的按鈕新增聯絡人"
     )
 
     if not chat_request.messages:
@@ -88,19 +236,39 @@ async def chat_endpoint(
             for content_item in message.content:
                 if isinstance(content_item, ImageContent):
                     # 驗證支援的圖片格式
-                    supported_types = [
-                        "image/jpeg",
-                        "image/png",
-                        "image/webp",
-                        "image/heic",
-                        "image/heif",
-                    ]
-                    if content_item.mime_type not in supported_types:
+                    if content_item.mime_type not in SUPPORTED_IMAGE_TYPES:
                         raise HTTPException(
                             status_code=status.HTTP_400_BAD_REQUEST,
-                            detail=f"不支援的圖片格式: {content_item.mime_type}。支援的格式: {', '.join(supported_types)}",
+                            detail=f"不支援的圖片格式: {content_item.mime_type}。支援的格式: {', '.join(SUPPORTED_IMAGE_TYPES)}",
                         )
 
+                    # 只引用附件時，附件必須仍在緩存中
+                    if (
+                        not content_item.data
+                        and content_item.attachment_id not in attachment_store
+                    ):
+                        raise HTTPException(
+                            status_code=status.HTTP_410_GONE,
+                            detail=f"圖片附件不存在或已過期，請重新上傳: {content_item.attachment_id}",
+                        )
+
+    # 使用伺服器端對話時，歷史訊息由伺服器載入並依 token 預算截取
+    session = None
+    history_messages = chat_request.history_messages
+    if chat_request.session_id is not None:
+        if chat_request.history_messages:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="使用 session_id 時不需傳送 history_messages",
+            )
+
+        session = await _get_user_session(db, chat_request.session_id, current_user)
+        history_messages = await load_history(db, session)
+        if session.summary:  # type: ignore
+            user_context += (
+                f"\n\n## Summary of earlier conversation\n\n{session.summary}"
+            )
+
     # 創建統一工具處理器（支援聯絡人和記錄）
     tool_handler = UnifiedToolHandler(db, current_user)
 
@@ -109,11 +277,13 @@ async def chat_endpoint(
             # 發送連接建立事件
             yield f"event: connected\ndata: {json.dumps({'status': 'connected', 'message': '連接已建立'}, ensure_ascii=False)}\n\n"
 
+            reply = []
             async for chunk in gemini_stream_chat_with_tools(
-                chat_request.history_messages,
+                history_messages,
                 chat_request.messages,
                 tool_handler,
                 system_prompt,
+                user_context=user_context,
             ):
                 # 根據 chunk 類型發送不同的 SSE 事件
                 if isinstance(chunk, ChatStreamChunk):
@@ -125,14 +295,33 @@ async def chat_endpoint(
                         yield f"event: tool_call\ndata: {chunk_json}\n\n"
                     else:
                         # 文字訊息事件
+                        reply.append(chunk.content)
                         yield f"event: message\ndata: {chunk_json}\n\n"
                 else:
                     # 如果是字串，包裝為文字訊息事件
+                    reply.append(str(chunk))
                     text_chunk = ChatStreamChunk(
                         type="text", content=str(chunk), tool_call=None
                     )
                     yield f"event: message\ndata: {text_chunk.model_dump_json()}\n\n"
 
+            # 取得模型回覆後才將使用者訊息與回覆一併保存到伺服器端對話，
+            # 失敗時不留下沒有回覆的使用者訊息，避免下次請求出現連續的使用者回合
+            reply_text = "".join(reply)
+            if session is not None and reply_text.strip() not in (
+                "",
+                ERROR_REPLY,
+                EMPTY_REPLY,
+            ):
+                await save_messages(
+                    db,
+                    session,
+                    [
+                        *chat_request.messages,
+                        ChatMessage(role="model", content=reply_text),
+                    ],
+                )
+
             # 發送完成事件
             yield f"event: done\ndata: {json.dumps({'status': 'completed', 'message': '對話完成'}, ensure_ascii=False)}\n\n"
 
@@ -146,6 +335,10 @@ async def chat_endpoint(
             yield "event: error\n"
             yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
 
+        finally:
+            # get_db 在回應開始串流前就已結束，串流中工具調用重新取得的連線需在此歸還
+            await db.close()
+
     return StreamingResponse(
         sse_generator(),
         media_type="text/event-stream",
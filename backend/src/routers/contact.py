@@ -1,36 +1,75 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from fastapi import (
     APIRouter,
     Depends,
     File,
     Form,
+    Header,
     HTTPException,
+    Query,
     Response,
     UploadFile,
     status,
 )
-from sqlalchemy.orm import Session
+from fastapi.responses import RedirectResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 
 from ..auth import get_current_active_user
+from ..contact_summary import contact_summary_cache
 from ..database import get_db
-from ..file_utils import delete_avatar, get_avatar_file, upload_avatar
+from ..file_utils import (
+    AVATAR_DELIVERY,
+    AVATAR_URL_EXPIRE_SECONDS,
+    PRESIGNED_AVATAR_FORMATS,
+    avatar_etag,
+    avatar_rendition_key,
+    delete_avatar,
+    negotiate_avatar_format,
+    open_avatar_stream,
+    presign_avatar_urls,
+    select_avatar_size,
+    upload_avatar,
+)
 from ..models import Contact, User
+from ..pagination import fetch_page
 from ..schemas import (
+    AvatarUrlListResponse,
+    AvatarUrlResponse,
     ContactCreate,
     ContactListResponse,
     ContactResponse,
     ContactUpdate,
     FileUploadResponse,
 )
+from ..search import is_ranked_search, search_contacts
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
+# 頭像網址固定而內容會隨上傳改變，要求瀏覽器每次以 If-None-Match 重新驗證
+AVATAR_CACHE_CONTROL = "private, no-cache"
+# 一次最多產生的頭像網址數，與聯絡人列表一頁的大小相當
+MAX_AVATAR_URLS = 100
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match 使用弱比較，可能是 * 或以逗號分隔的多個 ETag
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
 
 @router.post("/", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
 async def create_contact(
     contact: ContactCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
@@ -43,8 +82,9 @@ async def create_contact(
     )
 
     db.add(db_contact)
-    db.commit()
-    db.refresh(db_contact)
+    await db.commit()
+    contact_summary_cache.invalidate(current_user.id)  # type: ignore
+    await db.refresh(db_contact)
 
     return db_contact
 
@@ -56,7 +96,7 @@ async def create_contact_with_avatar(
     name: str = Form(...),
     description: Optional[str] = Form(None),
     avatar: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
@@ -70,20 +110,22 @@ async def create_contact_with_avatar(
     )
 
     db.add(db_contact)
-    db.commit()
-    db.refresh(db_contact)
+    await db.commit()
+    contact_summary_cache.invalidate(current_user.id)  # type: ignore
+    await db.refresh(db_contact)
 
     # 如果有頭像，則上傳
     if avatar and avatar.filename:
         try:
             avatar_key = await upload_avatar(avatar, current_user.id, db_contact.id)  # type: ignore
             db_contact.avatar_key = avatar_key  # type: ignore
-            db.commit()
-            db.refresh(db_contact)
+            await db.commit()
+            await db.refresh(db_contact)
         except Exception as e:
             # 如果頭像上傳失敗，刪除已創建的聯絡人
-            db.delete(db_contact)
-            db.commit()
+            await db.delete(db_contact)
+            await db.commit()
+            contact_summary_cache.invalidate(current_user.id)  # type: ignore
             raise e
 
     return db_contact
@@ -94,45 +136,118 @@ async def get_contacts(
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     獲取當前用戶的聯絡人列表
+
+    以回傳的 next_cursor 作為下一次請求的 cursor 參數即可取得下一頁
     """
-    query = db.query(Contact).filter(Contact.user_id == current_user.id)
+    query = select(Contact).where(Contact.user_id == current_user.id)
 
     # 搜索功能
     if search:
-        query = query.filter(Contact.name.contains(search))
-
-    # 獲取總數
-    total = query.count()
-
-    # 分頁
-    contacts = query.offset(skip).limit(limit).all()
+        query = search_contacts(query, search)
+
+    # 分頁：依 (created_at, id) 使用游標分頁，全文搜索結果依相關度排序
+    contacts, total, next_cursor = await fetch_page(
+        db,
+        query,
+        Contact,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        ranked=is_ranked_search(search),
+    )
 
     return ContactListResponse(
         contacts=[ContactResponse.model_validate(contact) for contact in contacts],
         total=total,
         page=skip // limit + 1 if limit > 0 else 1,
         size=len(contacts),
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/avatar-urls", response_model=AvatarUrlListResponse)
+async def get_contact_avatar_urls(
+    contact_ids: List[int] = Query(..., max_length=MAX_AVATAR_URLS),
+    size: Optional[int] = Query(None, ge=1, description="需要的頭像尺寸（像素）"),
+    image_format: Literal["avif", "webp", "jpeg"] = Query(
+        "jpeg", alias="format", description="預簽名網址的圖片格式，avif 以 webp 代替"
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    批量獲取聯絡人頭像網址，供聯絡人列表一次取得整頁的頭像
+
+    AVATAR_DELIVERY=presigned 時回傳短效的預簽名網址，瀏覽器直接從 MinIO 讀取圖片；
+    否則回傳需要身份驗證的 /contacts/{id}/avatar/image 路徑。沒有頭像或不屬於當前用戶的
+    聯絡人不會出現在結果中
+
+    預簽名網址指向不小於 size 的最小尺寸；網址不檢查物件是否存在，AVIF 版本可能不存在，
+    因此 format=avif 時改用每個頭像都有的 WebP
+    """
+    rows = (
+        await db.execute(
+            select(Contact.id, Contact.avatar_key).where(
+                Contact.user_id == current_user.id,
+                Contact.id.in_(contact_ids),
+                Contact.avatar_key.is_not(None),
+            )
+        )
+    ).all()
+
+    if AVATAR_DELIVERY != "presigned":
+        query = f"?size={size}" if size else ""
+        return AvatarUrlListResponse(
+            mode="proxy",
+            avatars=[
+                AvatarUrlResponse(
+                    contact_id=contact_id,
+                    url=f"/contacts/{contact_id}/avatar/image{query}",
+                )
+                for contact_id, _ in rows
+            ],
+        )
+
+    avatar_size = select_avatar_size(size)
+    if image_format not in PRESIGNED_AVATAR_FORMATS:
+        image_format = "webp"
+    urls = await presign_avatar_urls(
+        [
+            avatar_rendition_key(avatar_key, avatar_size, image_format)
+            for _, avatar_key in rows
+        ]
+    )
+    return AvatarUrlListResponse(
+        mode="presigned",
+        expires_in=AVATAR_URL_EXPIRE_SECONDS,
+        avatars=[
+            AvatarUrlResponse(contact_id=contact_id, url=url)
+            for (contact_id, _), url in zip(rows, urls)
+        ],
     )
 
 
 @router.get("/{contact_id}", response_model=ContactResponse)
 async def get_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     獲取指定聯絡人詳情
     """
-    contact = (
-        db.query(Contact)
-        .filter(Contact.id == contact_id, Contact.user_id == current_user.id)
-        .first()
+    contact = await db.scalar(
+        select(Contact).where(
+            Contact.id == contact_id, Contact.user_id == current_user.id
+        )
     )
 
     if not contact:
@@ -147,16 +262,16 @@ async def get_contact(
 async def update_contact(
     contact_id: int,
     contact_update: ContactUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     更新聯絡人資訊
     """
-    contact = (
-        db.query(Contact)
-        .filter(Contact.id == contact_id, Contact.user_id == current_user.id)
-        .first()
+    contact = await db.scalar(
+        select(Contact).where(
+            Contact.id == contact_id, Contact.user_id == current_user.id
+        )
     )
 
     if not contact:
@@ -169,8 +284,9 @@ async def update_contact(
     for field, value in update_data.items():
         setattr(contact, field, value)
 
-    db.commit()
-    db.refresh(contact)
+    await db.commit()
+    contact_summary_cache.invalidate(current_user.id)  # type: ignore
+    await db.refresh(contact)
 
     return contact
 
@@ -178,16 +294,16 @@ async def update_contact(
 @router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     刪除聯絡人
     """
-    contact = (
-        db.query(Contact)
-        .filter(Contact.id == contact_id, Contact.user_id == current_user.id)
-        .first()
+    contact = await db.scalar(
+        select(Contact).where(
+            Contact.id == contact_id, Contact.user_id == current_user.id
+        )
     )
 
     if not contact:
@@ -197,27 +313,28 @@ async def delete_contact(
 
     # 刪除頭像文件
     if contact.avatar_key:  # type: ignore
-        delete_avatar(contact.avatar_key)  # type: ignore
+        await delete_avatar(contact.avatar_key)  # type: ignore
 
-    db.delete(contact)
-    db.commit()
+    await db.delete(contact)
+    await db.commit()
+    contact_summary_cache.invalidate(current_user.id)  # type: ignore
 
 
 @router.post("/{contact_id}/avatar", response_model=FileUploadResponse)
 async def upload_contact_avatar(
     contact_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     上傳聯絡人頭像
     """
     # 檢查聯絡人是否存在
-    contact = (
-        db.query(Contact)
-        .filter(Contact.id == contact_id, Contact.user_id == current_user.id)
-        .first()
+    contact = await db.scalar(
+        select(Contact).where(
+            Contact.id == contact_id, Contact.user_id == current_user.id
+        )
     )
 
     if not contact:
@@ -225,17 +342,18 @@ async def upload_contact_avatar(
             status_code=status.HTTP_404_NOT_FOUND, detail="聯絡人未找到"
         )
 
-    # 刪除舊頭像
-    if contact.avatar_key:  # type: ignore
-        delete_avatar(contact.avatar_key)  # type: ignore
-
     # 上傳新頭像
     avatar_key = await upload_avatar(file, current_user.id, contact_id)  # type: ignore
 
     # 更新資料庫
+    old_avatar_key = contact.avatar_key
     contact.avatar_key = avatar_key  # type: ignore
-    db.commit()
-    db.refresh(contact)
+    await db.commit()
+    await db.refresh(contact)
+
+    # 新頭像保存成功後才刪除舊頭像
+    if old_avatar_key:  # type: ignore
+        await delete_avatar(old_avatar_key)  # type: ignore
 
     return FileUploadResponse(
         filename=file.filename or "avatar.jpg",
@@ -247,16 +365,16 @@ async def upload_contact_avatar(
 @router.delete("/{contact_id}/avatar", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_contact_avatar(
     contact_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     刪除聯絡人頭像
     """
-    contact = (
-        db.query(Contact)
-        .filter(Contact.id == contact_id, Contact.user_id == current_user.id)
-        .first()
+    contact = await db.scalar(
+        select(Contact).where(
+            Contact.id == contact_id, Contact.user_id == current_user.id
+        )
     )
 
     if not contact:
@@ -266,25 +384,34 @@ async def delete_contact_avatar(
 
     # 刪除頭像文件
     if contact.avatar_key:  # type: ignore
-        delete_avatar(contact.avatar_key)  # type: ignore
+        await delete_avatar(contact.avatar_key)  # type: ignore
         contact.avatar_key = None  # type: ignore
-        db.commit()
+        await db.commit()
 
 
 @router.get("/{contact_id}/avatar/image")
 async def get_contact_avatar_image(
     contact_id: int,
-    db: Session = Depends(get_db),
+    size: Optional[int] = Query(None, ge=1, description="需要的頭像尺寸（像素）"),
+    redirect: bool = False,
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     直接返回聯絡人頭像圖片文件
+
+    返回不小於 size 的最小尺寸，並依 Accept 選擇 AVIF、WebP 或 JPEG；舊版上傳的頭像
+    只有單一 JPEG。以區塊串流方式從 MinIO 讀取；If-None-Match 符合目前頭像的 ETag 時
+    返回 304，不存取 MinIO。AVATAR_DELIVERY=presigned 且 redirect=true 時以 302 導向
+    預簽名網址，否則仍由後端串流
     """
     # 檢查聯絡人是否存在
-    contact = (
-        db.query(Contact)
-        .filter(Contact.id == contact_id, Contact.user_id == current_user.id)
-        .first()
+    contact = await db.scalar(
+        select(Contact).where(
+            Contact.id == contact_id, Contact.user_id == current_user.id
+        )
     )
 
     if not contact:
@@ -297,14 +424,59 @@ async def get_contact_avatar_image(
             status_code=status.HTTP_404_NOT_FOUND, detail="聯絡人沒有頭像"
         )
 
-    # 獲取頭像文件內容
-    file_content, content_type = get_avatar_file(contact.avatar_key)  # type: ignore
+    avatar_size = select_avatar_size(size)
+    avatar_key = avatar_rendition_key(
+        contact.avatar_key,  # type: ignore
+        avatar_size,
+        negotiate_avatar_format(accept),
+    )
+    # 伺服器開始支援 AVIF 前上傳的頭像沒有 AVIF 版本，改用同尺寸的 JPEG
+    fallback_key = avatar_rendition_key(contact.avatar_key, avatar_size, "jpeg")  # type: ignore
+
+    # 同一網址依 Accept 返回不同格式
+    cache_headers = {"Cache-Control": AVATAR_CACHE_CONTROL, "Vary": "Accept"}
+
+    if redirect and AVATAR_DELIVERY == "presigned":
+        # 導向後無法在版本不存在時改用 JPEG，只選擇每個頭像都有的格式
+        presigned_key = avatar_rendition_key(
+            contact.avatar_key,  # type: ignore
+            avatar_size,
+            negotiate_avatar_format(accept, PRESIGNED_AVATAR_FORMATS),
+        )
+        [url] = await presign_avatar_urls([presigned_key])
+        return RedirectResponse(
+            url, status_code=status.HTTP_302_FOUND, headers=cache_headers
+        )
 
-    return Response(
-        content=file_content,
-        media_type=content_type,
-        headers={
-            "Cache-Control": "public, max-age=3600",  # 緩存 1 小時
-            "Content-Disposition": f"inline; filename=avatar_{contact_id}.jpg",
-        },
+    for key in dict.fromkeys([avatar_key, fallback_key]):
+        etag = avatar_etag(key)
+        if _etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={**cache_headers, "ETag": etag},
+            )
+
+    # 開啟頭像文件串流，串流結束或中斷時歸還 MinIO 連線
+    try:
+        avatar = await open_avatar_stream(avatar_key)
+    except HTTPException as e:
+        if e.status_code != status.HTTP_404_NOT_FOUND or avatar_key == fallback_key:
+            raise
+        avatar_key = fallback_key
+        avatar = await open_avatar_stream(avatar_key)
+
+    extension = avatar_key.rsplit(".", 1)[-1]
+    headers = {
+        **cache_headers,
+        "ETag": avatar_etag(avatar_key),
+        "Content-Disposition": f"inline; filename=avatar_{contact_id}.{extension}",
+    }
+    if avatar.content_length:
+        headers["Content-Length"] = avatar.content_length
+
+    return StreamingResponse(
+        avatar,
+        media_type=avatar.content_type,
+        headers=headers,
+        background=BackgroundTask(avatar.close),
     )
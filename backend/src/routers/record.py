@@ -1,11 +1,14 @@
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..auth import get_current_active_user
+from ..contact_summary import contact_summary_cache
 from ..database import get_db
 from ..models import Contact, Record, RecordCategory, User
+from ..pagination import fetch_page
 from ..schemas import (
     RecordCategoryEnum,
     RecordCreate,
@@ -13,6 +16,7 @@ from ..schemas import (
     RecordResponse,
     RecordUpdate,
 )
+from ..search import is_ranked_search, search_records
 
 router = APIRouter(prefix="/records", tags=["records"])
 
@@ -20,17 +24,17 @@ router = APIRouter(prefix="/records", tags=["records"])
 @router.post("/", response_model=RecordResponse, status_code=status.HTTP_201_CREATED)
 async def create_record(
     record: RecordCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     創建新記錄
     """
     # 檢查聯絡人是否存在且屬於當前用戶
-    contact = (
-        db.query(Contact)
-        .filter(Contact.id == record.contact_id, Contact.user_id == current_user.id)
-        .first()
+    contact = await db.scalar(
+        select(Contact).where(
+            Contact.id == record.contact_id, Contact.user_id == current_user.id
+        )
     )
 
     if not contact:
@@ -48,8 +52,9 @@ async def create_record(
     )
 
     db.add(db_record)
-    db.commit()
-    db.refresh(db_record)
+    await db.commit()
+    await db.refresh(db_record)
+    contact_summary_cache.invalidate_for_record(current_user.id, category_value)  # type: ignore
 
     return db_record
 
@@ -61,39 +66,50 @@ async def get_records(
     contact_id: Optional[int] = None,
     category: Optional[RecordCategoryEnum] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     獲取記錄列表，支援按聯絡人、分類和內容搜索過濾
+
+    以回傳的 next_cursor 作為下一次請求的 cursor 參數即可取得下一頁
     """
     # 基礎查詢：只能查看自己聯絡人的記錄
-    query = db.query(Record).join(Contact).filter(Contact.user_id == current_user.id)
+    query = select(Record).join(Contact).where(Contact.user_id == current_user.id)
 
     # 按聯絡人過濾
     if contact_id:
-        query = query.filter(Record.contact_id == contact_id)
+        query = query.where(Record.contact_id == contact_id)
 
     # 按分類過濾
     if category:
         category_value = RecordCategory(category.value)
-        query = query.filter(Record.category == category_value)
+        query = query.where(Record.category == category_value)
 
     # 內容搜索
     if search:
-        query = query.filter(Record.content.contains(search))
-
-    # 獲取總數
-    total = query.count()
-
-    # 分頁
-    records = query.offset(skip).limit(limit).all()
+        query = search_records(query, search)
+
+    # 分頁：依 (created_at, id) 使用游標分頁，全文搜索結果依相關度排序
+    records, total, next_cursor = await fetch_page(
+        db,
+        query,
+        Record,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        ranked=is_ranked_search(search),
+    )
 
     return RecordListResponse(
         records=[RecordResponse.model_validate(record) for record in records],
         total=total,
         page=skip // limit + 1 if limit > 0 else 1,
         size=len(records),
+        next_cursor=next_cursor,
     )
 
 
@@ -104,17 +120,21 @@ async def get_records_by_contact(
     limit: int = 100,
     category: Optional[RecordCategoryEnum] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     獲取指定聯絡人的記錄列表
+
+    以回傳的 next_cursor 作為下一次請求的 cursor 參數即可取得下一頁
     """
     # 檢查聯絡人是否存在且屬於當前用戶
-    contact = (
-        db.query(Contact)
-        .filter(Contact.id == contact_id, Contact.user_id == current_user.id)
-        .first()
+    contact = await db.scalar(
+        select(Contact).where(
+            Contact.id == contact_id, Contact.user_id == current_user.id
+        )
     )
 
     if not contact:
@@ -123,45 +143,51 @@ async def get_records_by_contact(
         )
 
     # 查詢該聯絡人的記錄
-    query = db.query(Record).filter(Record.contact_id == contact_id)
+    query = select(Record).where(Record.contact_id == contact_id)
 
     # 按分類過濾
     if category:
         category_value = RecordCategory(category.value)
-        query = query.filter(Record.category == category_value)
+        query = query.where(Record.category == category_value)
 
     # 內容搜索
     if search:
-        query = query.filter(Record.content.contains(search))
-
-    # 獲取總數
-    total = query.count()
-
-    # 分頁
-    records = query.offset(skip).limit(limit).all()
+        query = search_records(query, search)
+
+    # 分頁：依 (created_at, id) 使用游標分頁，全文搜索結果依相關度排序
+    records, total, next_cursor = await fetch_page(
+        db,
+        query,
+        Record,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        ranked=is_ranked_search(search),
+    )
 
     return RecordListResponse(
         records=[RecordResponse.model_validate(record) for record in records],
         total=total,
         page=skip // limit + 1 if limit > 0 else 1,
         size=len(records),
+        next_cursor=next_cursor,
     )
 
 
 @router.get("/{record_id}", response_model=RecordResponse)
 async def get_record(
     record_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     獲取指定記錄詳情
     """
-    record = (
-        db.query(Record)
+    record = await db.scalar(
+        select(Record)
         .join(Contact)
-        .filter(Record.id == record_id, Contact.user_id == current_user.id)
-        .first()
+        .where(Record.id == record_id, Contact.user_id == current_user.id)
     )
 
     if not record:
@@ -176,17 +202,16 @@ async def get_record(
 async def update_record(
     record_id: int,
     record_update: RecordUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     更新記錄資訊
     """
-    record = (
-        db.query(Record)
+    record = await db.scalar(
+        select(Record)
         .join(Contact)
-        .filter(Record.id == record_id, Contact.user_id == current_user.id)
-        .first()
+        .where(Record.id == record_id, Contact.user_id == current_user.id)
     )
 
     if not record:
@@ -194,6 +219,8 @@ async def update_record(
             status_code=status.HTTP_404_NOT_FOUND, detail="記錄未找到或您沒有權限"
         )
 
+    previous_category = record.category
+
     # 更新字段
     update_data = record_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
@@ -203,8 +230,15 @@ async def update_record(
         else:
             setattr(record, field, value)
 
-    db.commit()
-    db.refresh(record)
+    await db.commit()
+    await db.refresh(record)
+
+    # 新舊分類任一為暱稱時需更新聯絡人摘要
+    contact_summary_cache.invalidate_for_record(
+        current_user.id,
+        previous_category,
+        record.category,  # type: ignore
+    )
 
     return record
 
@@ -212,17 +246,16 @@ async def update_record(
 @router.delete("/{record_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_record(
     record_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     刪除記錄
     """
-    record = (
-        db.query(Record)
+    record = await db.scalar(
+        select(Record)
         .join(Contact)
-        .filter(Record.id == record_id, Contact.user_id == current_user.id)
-        .first()
+        .where(Record.id == record_id, Contact.user_id == current_user.id)
     )
 
     if not record:
@@ -230,8 +263,9 @@ async def delete_record(
             status_code=status.HTTP_404_NOT_FOUND, detail="記錄未找到或您沒有權限"
         )
 
-    db.delete(record)
-    db.commit()
+    await db.delete(record)
+    await db.commit()
+    contact_summary_cache.invalidate_for_record(current_user.id, record.category)  # type: ignore
 
 
 @router.get("/categories/", response_model=List[str])
@@ -1,9 +1,9 @@
 import os
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Union
+from typing import List, Literal, Optional, Union
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
 
 class RecordCategoryEnum(str, Enum):
@@ -66,15 +66,25 @@ class Token(BaseModel):
     """
 
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
 
 
+class RefreshTokenRequest(BaseModel):
+    """
+    刷新令牌請求模型
+    """
+
+    refresh_token: str
+
+
 class TokenData(BaseModel):
     """
     令牌數據模型
     """
 
     username: Optional[str] = None
+    user_id: Optional[int] = None
 
 
 class UserInDB(UserBase):
@@ -93,11 +103,22 @@ class ImageContent(BaseModel):
     """
 
     type: str = Field(default="image", description="內容類型")
-    data: str = Field(..., description="Base64 編碼的圖片資料或圖片 URL")
+    data: Optional[str] = Field(
+        None, description="Base64 編碼的圖片資料或圖片 URL，引用附件時可省略"
+    )
+    attachment_id: Optional[str] = Field(
+        None, description="透過 /chat/attachments 上傳後取得的附件 ID"
+    )
     mime_type: str = Field(
         ..., description="圖片 MIME 類型 (e.g., image/jpeg, image/png)"
     )
 
+    @model_validator(mode="after")
+    def check_source(self):
+        if not self.data and not self.attachment_id:
+            raise ValueError("圖片需提供 data 或 attachment_id")
+        return self
+
 
 class TextContent(BaseModel):
     """
@@ -127,6 +148,40 @@ class ChatRequest(BaseModel):
 
     history_messages: List[ChatMessage] = Field(default=[], description="歷史訊息")
     messages: List[ChatMessage] = Field(..., description="當前訊息")
+    session_id: Optional[int] = Field(
+        None, description="伺服器端對話 ID，提供時只需傳送新訊息，歷史由伺服器載入"
+    )
+
+
+class ChatSessionCreate(BaseModel):
+    """
+    聊天對話創建模型
+    """
+
+    title: Optional[str] = Field(None, max_length=100, description="對話標題")
+
+
+class ChatSessionResponse(BaseModel):
+    """
+    聊天對話響應模型
+    """
+
+    id: int
+    title: Optional[str]
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class ChatSessionDetailResponse(ChatSessionResponse):
+    """
+    聊天對話詳情響應模型
+    """
+
+    summary: Optional[str] = Field(None, description="較早訊息的摘要")
+    messages: List[ChatMessage] = Field(default=[], description="對話中的所有訊息")
 
 
 class ChatResponse(BaseModel):
@@ -139,6 +194,15 @@ class ChatResponse(BaseModel):
     status: str = Field(default="success", description="響應狀態")
 
 
+class ToolCacheStats(BaseModel):
+    """
+    工具讀取緩存統計，為同一請求中累計的數值
+    """
+
+    hits: int = Field(..., description="命中次數")
+    misses: int = Field(..., description="未命中次數")
+
+
 class ToolCall(BaseModel):
     """
     工具調用模型
@@ -147,6 +211,9 @@ class ToolCall(BaseModel):
     name: str = Field(..., description="工具名稱")
     arguments: dict = Field(..., description="工具參數")
     result: str = Field(..., description="工具執行結果")
+    cache: Optional[ToolCacheStats] = Field(
+        None, description="讀取緩存命中統計（僅在除錯模式提供）"
+    )
 
 
 class ChatStreamChunk(BaseModel):
@@ -213,9 +280,14 @@ class ContactListResponse(BaseModel):
     """
 
     contacts: List[ContactResponse]
-    total: int
+    total: Optional[int] = Field(
+        None, description="總數，include_total=false 時為 null"
+    )
     page: int
     size: int
+    next_cursor: Optional[str] = Field(
+        None, description="下一頁游標，沒有更多資料或使用搜索時為 null"
+    )
 
 
 class FileUploadResponse(BaseModel):
@@ -228,6 +300,39 @@ class FileUploadResponse(BaseModel):
     content_type: str
 
 
+class AvatarUrlResponse(BaseModel):
+    """
+    聯絡人頭像網址
+    """
+
+    contact_id: int
+    url: str = Field(..., description="頭像網址，proxy 模式下為需要身份驗證的後端路徑")
+
+
+class AvatarUrlListResponse(BaseModel):
+    """
+    聯絡人頭像網址列表響應模型
+    """
+
+    mode: Literal["presigned", "proxy"] = Field(
+        ..., description="presigned 可直接作為圖片來源；proxy 需帶身份驗證讀取"
+    )
+    expires_in: Optional[int] = Field(
+        None, description="預簽名網址的有效秒數，proxy 模式時為 null"
+    )
+    avatars: List[AvatarUrlResponse]
+
+
+class AttachmentUploadResponse(BaseModel):
+    """
+    聊天圖片附件上傳響應模型
+    """
+
+    attachment_id: str
+    size: int
+    content_type: str
+
+
 # Record 相關模型
 class RecordBase(BaseModel):
     """
@@ -275,9 +380,14 @@ class RecordListResponse(BaseModel):
     """
 
     records: List[RecordResponse]
-    total: int
+    total: Optional[int] = Field(
+        None, description="總數，include_total=false 時為 null"
+    )
     page: int
     size: int
+    next_cursor: Optional[str] = Field(
+        None, description="下一頁游標，沒有更多資料或使用搜索時為 null"
+    )
 
 
 # 更新 ContactResponse 以包含 records
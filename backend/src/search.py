@@ -0,0 +1,147 @@
+"""全文搜索索引（SQLite FTS5）"""
+
+from typing import Optional
+
+from sqlalchemy import Select, column, literal_column, or_, table
+from sqlalchemy.engine import Connection
+
+from .database import engine
+from .models import Contact, Record
+
+# trigram 分詞器以三個字元為單位建立索引，對繁體中文等不以空白分詞的內容也能做子字串搜索
+FTS_TOKENIZER = "trigram"
+FTS_MIN_QUERY_LENGTH = 3  # trigram 無法匹配少於三個字元的查詢
+
+FTS_ENABLED = engine.dialect.name == "sqlite"
+
+records_fts = table("records_fts", column("rowid"), column("rank"))
+contacts_fts = table("contacts_fts", column("rowid"), column("rank"))
+
+_SEARCH_INDEX_DDL = [
+    # 記錄內容索引
+    f"""
+    CREATE VIRTUAL TABLE records_fts USING fts5(
+        content, content='records', content_rowid='id', tokenize='{FTS_TOKENIZER}'
+    )
+    """,
+    """
+    CREATE TRIGGER records_fts_ai AFTER INSERT ON records BEGIN
+        INSERT INTO records_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER records_fts_ad AFTER DELETE ON records BEGIN
+        INSERT INTO records_fts(records_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER records_fts_au AFTER UPDATE OF content ON records BEGIN
+        INSERT INTO records_fts(records_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+        INSERT INTO records_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    "INSERT INTO records_fts(records_fts) VALUES ('rebuild')",
+    # 聯絡人姓名與描述索引
+    f"""
+    CREATE VIRTUAL TABLE contacts_fts USING fts5(
+        name, description, content='contacts', content_rowid='id',
+        tokenize='{FTS_TOKENIZER}'
+    )
+    """,
+    """
+    CREATE TRIGGER contacts_fts_ai AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER contacts_fts_ad AFTER DELETE ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER contacts_fts_au AFTER UPDATE OF name, description ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO contacts_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    # 姓名命中的權重高於描述
+    "INSERT INTO contacts_fts(contacts_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')",
+]
+
+
+def _create_search_index(conn: Connection) -> None:
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'records_fts'"
+    ).first()
+    if exists:
+        return
+
+    for statement in _SEARCH_INDEX_DDL:
+        conn.exec_driver_sql(statement)
+
+
+async def init_search_index() -> None:
+    """
+    建立全文搜索索引與同步觸發器（僅限 SQLite），已存在時不做任何事
+    """
+    if not FTS_ENABLED:
+        return
+
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_search_index)
+
+
+def _fts_phrase(search: str) -> str:
+    """
+    將使用者輸入轉換為 FTS5 片語查詢，避免特殊字元被當作查詢語法
+    """
+    return '"' + search.replace('"', '""') + '"'
+
+
+def _use_fts(search: str) -> bool:
+    return FTS_ENABLED and len(search) >= FTS_MIN_QUERY_LENGTH
+
+
+def is_ranked_search(search: Optional[str]) -> bool:
+    """
+    搜索結果是否依相關度排序；查詢過短或未啟用全文搜索時改用 LIKE，
+    不帶排序，可與一般列表相同依 (created_at, id) 做游標分頁
+    """
+    return search is not None and _use_fts(search)
+
+
+def search_records(query: Select, search: str) -> Select:
+    """
+    依內容搜索記錄，使用全文搜索時結果依相關度排序
+    """
+    if not _use_fts(search):
+        return query.where(Record.content.contains(search))
+
+    return (
+        query.join(records_fts, records_fts.c.rowid == Record.id)
+        .where(literal_column("records_fts").op("MATCH")(_fts_phrase(search)))
+        .order_by(records_fts.c.rank)
+    )
+
+
+def search_contacts(query: Select, search: str) -> Select:
+    """
+    依姓名與描述搜索聯絡人，使用全文搜索時結果依相關度排序
+    """
+    if not _use_fts(search):
+        return query.where(
+            or_(Contact.name.contains(search), Contact.description.contains(search))
+        )
+
+    return (
+        query.join(contacts_fts, contacts_fts.c.rowid == Contact.id)
+        .where(literal_column("contacts_fts").op("MATCH")(_fts_phrase(search)))
+        .order_by(contacts_fts.c.rank)
+    )
@@ -0,0 +1,131 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from .models import User
+
+# 已驗證用戶的緩存秒數，0 表示停用
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+
+_COLUMNS = tuple(attribute.key for attribute in sa_inspect(User).column_attrs)
+
+
+class UserCache:
+    """
+    已驗證用戶緩存，讓每次請求驗證 JWT 時不必查詢資料庫
+
+    以用戶 ID 為鍵保存活躍用戶的欄位快照；命中時以快照建立實例並附加到請求的 session，
+    不執行任何 SQL。用戶經 ORM 更新或刪除時自動清除，另設 TTL 作為多 worker 部署時的保底
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 60):
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._cache: "OrderedDict[int, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        # 只為查詢中的用戶記錄版本與進行中的查詢數，查詢全部結束後移除，避免無限增長
+        self._versions: Dict[int, int] = {}
+        self._loading: Dict[int, int] = {}
+
+    async def get(self, db: AsyncSession, user_id: int) -> Optional[User]:
+        """
+        依 ID 獲取用戶，緩存未命中時以主鍵查詢
+
+        Args:
+            db: 資料庫 session
+            user_id: 用戶 ID
+
+        Returns:
+            附加在 db 上的用戶實例，不存在時為 None
+        """
+        snapshot = self._get_cached(user_id)
+        if snapshot is not None:
+            user = User(**snapshot)
+            make_transient_to_detached(user)
+            return await db.merge(user, load=False)
+
+        version = self._versions.get(user_id, 0)
+        self._loading[user_id] = self._loading.get(user_id, 0) + 1
+        try:
+            user = await db.get(User, user_id)
+        finally:
+            current = self._versions.get(user_id, 0)
+            self._loading[user_id] -= 1
+            if not self._loading[user_id]:
+                del self._loading[user_id]
+                self._versions.pop(user_id, None)
+
+        # 只緩存活躍用戶；查詢期間若有更新使緩存失效，則不寫回舊資料
+        if (
+            user is not None
+            and user.is_active
+            and self._ttl_seconds > 0
+            and current == version
+        ):
+            self._cache[user_id] = (
+                {column: getattr(user, column) for column in _COLUMNS},
+                time.monotonic(),
+            )
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+
+        return user
+
+    def invalidate(self, user_id: int) -> None:
+        """清除指定用戶的緩存"""
+        if user_id in self._loading:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        self._cache.pop(user_id, None)
+
+    def clear(self) -> None:
+        """清除所有緩存"""
+        for user_id in list(self._cache):
+            self.invalidate(user_id)
+
+    def _get_cached(self, user_id: int) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return None
+
+        snapshot, cached_at = entry
+        if time.monotonic() - cached_at > self._ttl_seconds:
+            self._cache.pop(user_id, None)
+            return None
+
+        self._cache.move_to_end(user_id)
+        return snapshot
+
+
+# 創建全局實例
+user_cache = UserCache(ttl_seconds=AUTH_USER_CACHE_TTL)
+
+
+# session.info 中記錄本次交易內已 flush 但尚未提交的用戶 ID
+_PENDING_KEY = "user_cache_invalidations"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_user(mapper, connection, target: User) -> None:
+    # 停用、改名或刪除用戶時於提交後清除緩存；繞過 ORM 的批次 UPDATE 只能等待 TTL 過期
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_users(session: Session) -> None:
+    # flush 後、提交前其他請求讀到的仍是舊資料，須等提交後才清除，避免緩存舊資料
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_users(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
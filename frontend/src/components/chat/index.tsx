@@ -1,5 +1,6 @@
 "use client";
 
+import { ChatApi } from "@/lib/api/chat";
 import { useChat } from "@/lib/api/hooks/use-chat";
 import { cleanupImageUrls } from "@/lib/image-utils";
 import {
@@ -16,6 +17,7 @@ import { MessageList } from "./message-list";
 import { WelcomeScreen } from "./welcome-screen";
 
 const CHAT_HISTORY_KEY = "siri-chat-history";
+const CHAT_SESSION_KEY = "siri-chat-session-id";
 
 interface ChatInterfaceProps {
   className?: string;
@@ -25,6 +27,7 @@ export function ChatInterface({ className }: ChatInterfaceProps) {
   const [chatHistory, setChatHistory] = useState<ChatMessage[]>([]);
   const [inputMessage, setInputMessage] = useState("");
   const [attachedImages, setAttachedImages] = useState<ImageFile[]>([]);
+  const [sessionId, setSessionId] = useState<number | null>(null);
 
   const {
     messages: sseMessages,
@@ -48,6 +51,39 @@ export function ChatInterface({ className }: ChatInterfaceProps) {
     }
   }, []);
 
+  // 載入伺服器端對話，對話已不存在時改用新的對話
+  useEffect(() => {
+    const savedSessionId = Number(localStorage.getItem(CHAT_SESSION_KEY));
+    if (!savedSessionId) return;
+
+    ChatApi.getSession(savedSessionId).then((response) => {
+      if (response.status === 404) {
+        localStorage.removeItem(CHAT_SESSION_KEY);
+      } else {
+        // 其他錯誤（例如網路中斷）時保留對話，下次請求再確認
+        setSessionId(savedSessionId);
+      }
+    });
+  }, []);
+
+  // 取得目前的伺服器端對話，尚未建立時創建新對話
+  const ensureSession = async () => {
+    if (sessionId) return sessionId;
+    // 既有的本地歷史不在伺服器上，繼續由客戶端傳送
+    if (chatHistory.length > 0) return undefined;
+
+    const response = await ChatApi.createSession();
+    if (response.error || !response.data) {
+      console.warn("創建對話失敗，改為由客戶端傳送歷史訊息:", response.error);
+      return undefined;
+    }
+
+    const session = response.data;
+    setSessionId(session.id);
+    localStorage.setItem(CHAT_SESSION_KEY, String(session.id));
+    return session.id;
+  };
+
   // 清理圖片預覽 URL 當組件卸載時
   useEffect(() => {
     return () => {
@@ -86,10 +122,27 @@ export function ChatInterface({ className }: ChatInterfaceProps) {
     localStorage.setItem(CHAT_HISTORY_KEY, JSON.stringify(newMessages));
   };
 
+  // 上傳圖片附件，失敗時仍以 base64 資料傳送
+  const uploadImages = (images: ImageFile[]) =>
+    Promise.all(
+      images.map(async (image) => {
+        const response = await ChatApi.uploadAttachment(image.file);
+        if (response.error || !response.data) {
+          console.warn(
+            "圖片附件上傳失敗，改為直接傳送圖片資料:",
+            response.error
+          );
+          return undefined;
+        }
+        return response.data.attachment_id;
+      })
+    );
+
   // 創建複合內容格式的訊息
   const createMessageContent = (
     text: string,
-    images: ImageFile[]
+    images: ImageFile[],
+    attachmentIds: (string | undefined)[] = []
   ): string | MessageContent[] => {
     // 如果沒有圖片，返回純文字格式（向後兼容）
     if (images.length === 0) {
@@ -109,10 +162,11 @@ export function ChatInterface({ className }: ChatInterfaceProps) {
     }
 
     // 添加圖片內容
-    images.forEach((image) => {
+    images.forEach((image, index) => {
       const imageContent: ImageContent = {
         type: "image",
         data: image.base64,
+        attachment_id: attachmentIds[index],
         mime_type: image.mimeType,
       };
       content.push(imageContent);
@@ -130,7 +184,12 @@ export function ChatInterface({ className }: ChatInterfaceProps) {
     if ((!hasText && !hasImages) || isProcessing) return;
 
     // 創建用戶訊息
-    const messageContent = createMessageContent(inputMessage, attachedImages);
+    const attachmentIds = await uploadImages(attachedImages);
+    const messageContent = createMessageContent(
+      inputMessage,
+      attachedImages,
+      attachmentIds
+    );
     const userMessage: ChatMessage = {
       role: "user",
       content: messageContent,
@@ -149,6 +208,7 @@ export function ChatInterface({ className }: ChatInterfaceProps) {
     try {
       // 準備聊天請求
       const chatRequest = {
+        session_id: await ensureSession(),
         history_messages: chatHistory,
         messages: [userMessage],
       };
@@ -165,6 +225,16 @@ export function ChatInterface({ className }: ChatInterfaceProps) {
     setChatHistory([]);
     clearMessages();
     localStorage.removeItem(CHAT_HISTORY_KEY);
+    // 刪除伺服器端對話，下次發送訊息時建立新對話
+    if (sessionId) {
+      ChatApi.deleteSession(sessionId).then((response) => {
+        if (response.error) {
+          console.warn("刪除對話失敗:", response.error);
+        }
+      });
+      setSessionId(null);
+      localStorage.removeItem(CHAT_SESSION_KEY);
+    }
     // 清理附加的圖片
     if (attachedImages.length > 0) {
       cleanupImageUrls(attachedImages);
@@ -21,9 +21,11 @@ export function Contact({
   className,
 }: ContactProps) {
   // Use the same avatar hook as ContactAvatar component
+  // size-10 (40px)，以兩倍像素支援高解析度螢幕
   const { data: avatarUrl, isLoading: isAvatarLoading } = useContactAvatar(
     contact.id,
-    Boolean(contact.avatar_key)
+    Boolean(contact.avatar_key),
+    80
   );
 
   const getInitials = (name: string | undefined) => {
@@ -6,6 +6,13 @@ import { Contact } from "@/lib/types/api";
 import { useEffect } from "react";
 import { AvatarUploadDialog } from "./avatar-upload-dialog";
 
+// 與 sizeClasses 對應的顯示大小 (px)
+const pixelSizes = {
+  sm: 48,
+  md: 64,
+  lg: 96,
+};
+
 interface ContactAvatarProps {
   contact: Contact;
   size?: "sm" | "md" | "lg";
@@ -14,7 +21,8 @@ interface ContactAvatarProps {
 export function ContactAvatar({ contact, size = "lg" }: ContactAvatarProps) {
   const { data: avatarUrl, isLoading } = useContactAvatar(
     contact.id,
-    Boolean(contact.avatar_key)
+    Boolean(contact.avatar_key),
+    pixelSizes[size] * 2 // 兩倍像素支援高解析度螢幕
   );
 
   // 清理 blob URL 當組件銷毀或 avatarUrl 改變時
@@ -10,6 +10,9 @@ import { httpClient } from "./http-client";
  * 認證相關 API 方法
  */
 export class AuthApi {
+  // 進行中的令牌刷新，同時過期的多個請求共用同一次刷新
+  private static refreshing: Promise<boolean> | null = null;
+
   /**
    * 用戶註冊
    */
@@ -28,6 +31,34 @@ export class AuthApi {
     });
   }
 
+  /**
+   * 以刷新令牌換發新的訪問令牌與刷新令牌，失敗時清除本地令牌
+   */
+  static async refresh(): Promise<boolean> {
+    if (!this.refreshing) {
+      this.refreshing = (async () => {
+        const refreshToken = this.getStoredRefreshToken();
+        if (!refreshToken) {
+          return false;
+        }
+
+        const response = await httpClient.post<Token>("/auth/refresh", {
+          refresh_token: refreshToken,
+        });
+        if (response.error || !response.data) {
+          this.logout();
+          return false;
+        }
+
+        this.setToken(response.data.access_token, response.data.refresh_token);
+        return true;
+      })().finally(() => {
+        this.refreshing = null;
+      });
+    }
+    return this.refreshing;
+  }
+
   /**
    * 獲取當前用戶資訊
    */
@@ -36,24 +67,33 @@ export class AuthApi {
   }
 
   /**
-   * 登出 (清除本地 token)
+   * 登出 (撤銷伺服器上的刷新令牌並清除本地 token)
    */
   static logout() {
+    const refreshToken = this.getStoredRefreshToken();
+    if (refreshToken) {
+      void httpClient.post("/auth/logout", { refresh_token: refreshToken });
+    }
+
     httpClient.setAuthToken(null);
     // 清除 localStorage 中的 token
     if (typeof window !== "undefined") {
       localStorage.removeItem("access_token");
+      localStorage.removeItem("refresh_token");
     }
   }
 
   /**
    * 設定認證 token
    */
-  static setToken(token: string) {
+  static setToken(token: string, refreshToken?: string) {
     httpClient.setAuthToken(token);
     // 儲存到 localStorage
     if (typeof window !== "undefined") {
       localStorage.setItem("access_token", token);
+      if (refreshToken) {
+        localStorage.setItem("refresh_token", refreshToken);
+      }
     }
   }
 
@@ -67,6 +107,16 @@ export class AuthApi {
     return null;
   }
 
+  /**
+   * 從 localStorage 獲取刷新令牌
+   */
+  static getStoredRefreshToken(): string | null {
+    if (typeof window !== "undefined") {
+      return localStorage.getItem("refresh_token");
+    }
+    return null;
+  }
+
   /**
    * 初始化認證狀態
    */
@@ -75,6 +125,8 @@ export class AuthApi {
     if (token) {
       httpClient.setAuthToken(token);
     }
+    // 訪問令牌過期時自動以刷新令牌換發
+    httpClient.setRefreshHandler(() => this.refresh());
   }
 
   /**
@@ -1,5 +1,9 @@
 import {
+  AttachmentUploadResponse,
+  ChatMessage,
   ChatRequest,
+  ChatSession,
+  ChatSessionDetail,
   ParsedSSEData,
   SSEConfig,
   SSEConnectedEvent,
@@ -12,6 +16,8 @@ import {
   SSEMessageEvent,
   SSEToolCallEvent,
 } from "../types/api";
+import { AuthApi } from "./auth";
+import { httpClient } from "./http-client";
 
 /**
  * SSE 事件解析器
@@ -272,6 +278,67 @@ export class ChatApi {
     return connection;
   }
 
+  /**
+   * 上傳聊天圖片附件，之後的訊息可用 attachment_id 引用而不必重送圖片資料
+   * @param file 圖片文件
+   * @returns 附件資訊
+   */
+  static async uploadAttachment(file: File) {
+    const formData = new FormData();
+    formData.append("file", file);
+
+    return httpClient.post<AttachmentUploadResponse>(
+      "/chat/attachments",
+      formData
+    );
+  }
+
+  /**
+   * 創建伺服器端對話
+   * @param title 對話標題
+   * @returns 對話資訊
+   */
+  static async createSession(title?: string) {
+    return httpClient.post<ChatSession>("/chat/sessions", { title });
+  }
+
+  /**
+   * 獲取伺服器端對話詳情
+   * @param sessionId 對話 ID
+   * @returns 對話資訊與訊息
+   */
+  static async getSession(sessionId: number) {
+    return httpClient.get<ChatSessionDetail>(`/chat/sessions/${sessionId}`);
+  }
+
+  /**
+   * 刪除伺服器端對話
+   * @param sessionId 對話 ID
+   */
+  static async deleteSession(sessionId: number) {
+    return httpClient.delete<void>(`/chat/sessions/${sessionId}`);
+  }
+
+  /**
+   * 移除已上傳附件的 base64 資料，只保留 attachment_id
+   * @param messages 訊息列表
+   * @returns 精簡後的訊息列表
+   */
+  private static compactMessages(messages: ChatMessage[]): ChatMessage[] {
+    return messages.map((message) =>
+      typeof message.content === "string"
+        ? message
+        : {
+            ...message,
+            content: message.content.map((item) =>
+              item.type === "image" && item.attachment_id
+                ? { ...item, data: undefined }
+                : item
+            ),
+          }
+    );
+  }
+
   /**
    * 發送聊天訊息並返回原始串流響應（內部使用）
    * @param chatRequest 聊天請求包含歷史訊息和當前訊息
@@ -282,23 +349,59 @@ export class ChatApi {
   ): Promise<ReadableStream<Uint8Array> | null> {
     const baseURL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
-    // 從 localStorage 獲取 token
-    const token =
-      typeof window !== "undefined"
-        ? localStorage.getItem("access_token")
-        : null;
+    const post = async (request: ChatRequest) => {
+      const send = () => {
+        // 從 localStorage 獲取 token（刷新後會更新）
+        const token = AuthApi.getStoredToken();
+
+        return fetch(`${baseURL}/chat/siri`, {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+            Accept: "text/event-stream",
+            "Cache-Control": "no-cache",
+            ...(token && { Authorization: `Bearer ${token}` }),
+          },
+          body: JSON.stringify(request),
+        });
+      };
+
+      const response = await send();
+      // 訪問令牌過期，換發後重送一次
+      if (response.status === 401 && (await AuthApi.refresh())) {
+        return send();
+      }
+      return response;
+    };
+
+    // 使用伺服器端對話時只傳送新訊息，否則附上歷史訊息；
+    // compact 為 true 時移除已上傳附件的圖片資料
+    const buildRequest = (request: ChatRequest, compact: boolean) => {
+      const prepare = (messages: ChatMessage[]) =>
+        compact ? this.compactMessages(messages) : messages;
+
+      return request.session_id
+        ? { session_id: request.session_id, messages: prepare(request.messages) }
+        : {
+            history_messages: prepare(request.history_messages ?? []),
+            messages: prepare(request.messages),
+          };
+    };
 
     try {
-      const response = await fetch(`${baseURL}/chat/siri`, {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          Accept: "text/event-stream",
-          "Cache-Control": "no-cache",
-          ...(token && { Authorization: `Bearer ${token}` }),
-        },
-        body: JSON.stringify(chatRequest),
-      });
+      let request = chatRequest;
+      let response = await post(buildRequest(request, true));
+
+      // 伺服器端對話已不存在，改為由客戶端傳送歷史訊息
+      if (response.status === 404 && request.session_id) {
+        request = { ...request, session_id: undefined };
+        response = await post(buildRequest(request, true));
+      }
+
+      // 伺服器上的附件已過期，改為附上完整圖片資料重送
+      if (response.status === 410) {
+        response = await post(buildRequest(request, false));
+      }
 
       if (!response.ok) {
         throw new Error(`HTTP ${response.status}: ${response.statusText}`);
@@ -1,5 +1,6 @@
 import {
   AvatarUploadResponse,
+  AvatarUrlListResponse,
   Contact,
   CONTACT_ENDPOINTS,
   ContactCreate,
@@ -11,6 +12,25 @@ import {
 } from "../types/api";
 import { httpClient } from "./http-client";
 
+// 後端一次最多回傳的頭像網址數
+const MAX_AVATAR_URLS = 100;
+
+// 頭像使用的圖片格式：所有主流瀏覽器都能顯示 WebP，檔案遠小於 JPEG
+const AVATAR_FORMAT = "webp";
+const AVATAR_ACCEPT = "image/webp,image/*;q=0.8";
+
+interface AvatarUrlRequest {
+  contactId: number;
+  size?: number;
+  resolve: (url: string | null) => void;
+}
+
+// 同一輪渲染中請求的頭像，依尺寸合併成批量網址請求
+let pendingAvatarUrls: AvatarUrlRequest[] | null = null;
+
+// 後端使用 proxy 模式時不再請求預簽名網址，直接下載圖片
+let avatarProxyMode = false;
+
 /**
  * 聯絡人相關 API 方法
  */
@@ -80,6 +100,12 @@ export class ContactApi {
     if (params?.search) {
       searchParams.append("search", params.search);
     }
+    if (params?.cursor) {
+      searchParams.append("cursor", params.cursor);
+    }
+    if (params?.include_total !== undefined) {
+      searchParams.append("include_total", params.include_total.toString());
+    }
 
     const queryString = searchParams.toString();
     const endpoint = queryString
@@ -150,12 +176,48 @@ export class ContactApi {
   }
 
   /**
-   * 獲取頭像圖片 (返回 blob URL)
+   * 批量獲取聯絡人頭像網址
    */
-  static async getAvatarImage(contactId: number): Promise<string | null> {
+  static async getAvatarUrls(contactIds: number[], size?: number) {
+    const searchParams = new URLSearchParams();
+    contactIds.forEach((id) =>
+      searchParams.append("contact_ids", id.toString())
+    );
+    if (size !== undefined) {
+      searchParams.append("size", size.toString());
+    }
+    searchParams.append("format", AVATAR_FORMAT);
+
+    const endpoint = `${CONTACT_ENDPOINTS.contactAvatarUrls}?${searchParams}`;
+    return httpClient.get<AvatarUrlListResponse>(endpoint);
+  }
+
+  /**
+   * 獲取頭像圖片 (預簽名網址或 blob URL)
+   *
+   * size 為顯示所需的像素大小，後端返回不小於該尺寸的最小版本。
+   * 後端啟用預簽名模式時，同一輪渲染的頭像合併成一次請求，圖片由瀏覽器直接從 MinIO 讀取；
+   * 否則透過後端下載並建立 blob URL
+   */
+  static async getAvatarImage(
+    contactId: number,
+    size?: number
+  ): Promise<string | null> {
+    if (!avatarProxyMode) {
+      const presignedUrl = await ContactApi.getPresignedAvatarUrl(
+        contactId,
+        size
+      );
+      if (presignedUrl) {
+        return presignedUrl;
+      }
+    }
+
     try {
-      const endpoint = CONTACT_ENDPOINTS.contactAvatarImage(contactId);
-      const blob = await httpClient.getBlob(endpoint);
+      const endpoint = CONTACT_ENDPOINTS.contactAvatarImage(contactId, size);
+      const blob = await httpClient.getBlob(endpoint, {
+        headers: { Accept: AVATAR_ACCEPT },
+      });
 
       if (!blob) {
         return null;
@@ -169,6 +231,72 @@ export class ContactApi {
     }
   }
 
+  /**
+   * 將頭像網址請求加入下一次批量請求，沒有預簽名網址時返回 null
+   */
+  private static getPresignedAvatarUrl(
+    contactId: number,
+    size?: number
+  ): Promise<string | null> {
+    return new Promise((resolve) => {
+      if (!pendingAvatarUrls) {
+        const batch: AvatarUrlRequest[] = [];
+        pendingAvatarUrls = batch;
+
+        // 等待同一輪渲染的其他頭像加入後再送出
+        setTimeout(() => {
+          pendingAvatarUrls = null;
+          void ContactApi.flushAvatarUrls(batch);
+        }, 0);
+      }
+
+      pendingAvatarUrls.push({ contactId, size, resolve });
+    });
+  }
+
+  private static async flushAvatarUrls(batch: AvatarUrlRequest[]) {
+    // 依尺寸分組，每組的聯絡人再依上限分批
+    const groups = new Map<number | undefined, number[]>();
+    batch.forEach(({ contactId, size }) => {
+      const contactIds = groups.get(size) ?? [];
+      if (!contactIds.includes(contactId)) {
+        contactIds.push(contactId);
+      }
+      groups.set(size, contactIds);
+    });
+
+    const urls = new Map<string, string>();
+    const urlKey = (contactId: number, size?: number) => `${contactId}:${size}`;
+
+    try {
+      const requests: Array<Promise<void>> = [];
+      groups.forEach((contactIds, size) => {
+        for (let i = 0; i < contactIds.length; i += MAX_AVATAR_URLS) {
+          const chunk = contactIds.slice(i, i + MAX_AVATAR_URLS);
+          requests.push(
+            ContactApi.getAvatarUrls(chunk, size).then((response) => {
+              if (response.data?.mode === "proxy") {
+                avatarProxyMode = true;
+              } else if (response.data?.mode === "presigned") {
+                response.data.avatars.forEach((avatar) =>
+                  urls.set(urlKey(avatar.contact_id, size), avatar.url)
+                );
+              }
+            })
+          );
+        }
+      });
+      await Promise.all(requests);
+    } catch (error) {
+      console.error("獲取頭像網址失敗:", error);
+    }
+
+    // 沒有取得網址的頭像改由後端下載
+    batch.forEach(({ contactId, size, resolve }) =>
+      resolve(urls.get(urlKey(contactId, size)) ?? null)
+    );
+  }
+
   /**
    * 獲取頭像圖片 Blob 數據
    */
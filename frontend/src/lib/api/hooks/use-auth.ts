@@ -41,7 +41,7 @@ export const useLogin = () => {
     },
     onSuccess: (data) => {
       // 設定 token
-      AuthApi.setToken(data.access_token);
+      AuthApi.setToken(data.access_token, data.refresh_token);
 
       // 更新認證狀態查詢
       queryClient.setQueryData(["auth", "status"], true);
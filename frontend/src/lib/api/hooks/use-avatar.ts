@@ -3,11 +3,17 @@ import { ContactApi } from "../contact";
 
 /**
  * 使用 React Query 獲取聯絡人頭像
+ *
+ * size 為顯示所需的像素大小（含高解析度螢幕的倍數），未指定時取得最大尺寸
  */
-export function useContactAvatar(contactId: number, hasAvatarKey: boolean) {
+export function useContactAvatar(
+  contactId: number,
+  hasAvatarKey: boolean,
+  size?: number
+) {
   const result = useQuery({
-    queryKey: ["contact-avatar", contactId],
-    queryFn: () => ContactApi.getAvatarImage(contactId),
+    queryKey: ["contact-avatar", contactId, size],
+    queryFn: () => ContactApi.getAvatarImage(contactId, size),
     enabled: hasAvatarKey, // 只有當聯絡人有 avatar_key 時才執行查詢
     staleTime: 5 * 60 * 1000, // 5 分鐘
     gcTime: 10 * 60 * 1000, // 10 分鐘（之前叫 cacheTime）
@@ -1,5 +1,13 @@
 import { ApiError, ApiResponse, RequestConfig } from "../types/api";
 
+// 401 時不嘗試換發令牌的認證端點
+const NO_REFRESH_ENDPOINTS = [
+  "/auth/login",
+  "/auth/register",
+  "/auth/refresh",
+  "/auth/logout",
+];
+
 /**
  * HTTP 客戶端類別
  * 提供型別安全的 fetch wrapper 和錯誤處理
@@ -7,6 +15,7 @@ import { ApiError, ApiResponse, RequestConfig } from "../types/api";
 export class HttpClient {
   private baseURL: string;
   private defaultHeaders: Record<string, string>;
+  private refreshHandler: (() => Promise<boolean>) | null = null;
 
   constructor(baseURL?: string) {
     // 優先使用傳入的 baseURL，然後是環境變數，最後是預設值
@@ -29,6 +38,26 @@ export class HttpClient {
     }
   }
 
+  /**
+   * 設定訪問令牌過期（401）時換發令牌的函數，成功時回傳 true
+   */
+  setRefreshHandler(handler: (() => Promise<boolean>) | null) {
+    this.refreshHandler = handler;
+  }
+
+  /**
+   * 訪問令牌過期時換發令牌；登入、註冊、刷新與登出端點本身不重試，
+   * 其他端點（包括 /auth/@me）在令牌換發後重送
+   */
+  private async tryRefresh(endpoint: string, response: Response) {
+    return (
+      response.status === 401 &&
+      !NO_REFRESH_ENDPOINTS.includes(endpoint.split("?")[0]) &&
+      this.refreshHandler !== null &&
+      (await this.refreshHandler())
+    );
+  }
+
   /**
    * 設定預設 headers
    */
@@ -98,7 +127,13 @@ export class HttpClient {
     }
 
     try {
-      const response = await fetch(url, requestOptions);
+      let response = await fetch(url, requestOptions);
+
+      // 訪問令牌過期，換發後以新令牌重送一次
+      if (!config.token && (await this.tryRefresh(endpoint, response))) {
+        headers["Authorization"] = this.defaultHeaders["Authorization"];
+        response = await fetch(url, requestOptions);
+      }
 
       // 檢查回應是否有內容
       const hasContent =
@@ -231,11 +266,20 @@ export class HttpClient {
     }
 
     try {
-      const response = await fetch(url, {
+      let response = await fetch(url, {
         method: "GET",
         headers,
       });
 
+      // 訪問令牌過期，換發後以新令牌重送一次
+      if (!config?.token && (await this.tryRefresh(endpoint, response))) {
+        headers["Authorization"] = this.defaultHeaders["Authorization"];
+        response = await fetch(url, {
+          method: "GET",
+          headers,
+        });
+      }
+
       if (!response.ok) {
         if (response.status === 404) {
           return null; // 資源不存在
@@ -32,10 +32,13 @@ export {
 export type {
   ApiEndpoints,
   ApiResponse,
+  AttachmentUploadResponse,
   AvatarUploadConfig,
   AvatarUploadResponse,
   ChatMessage,
   ChatRequest,
+  ChatSession,
+  ChatSessionDetail,
   Contact,
   ContactCreate,
   ContactListResponse,
@@ -64,6 +67,7 @@ export type {
   SSEToolCallEvent,
   SupportedAvatarType,
   Token,
+  ToolCacheStats,
   ToolCall,
   UserCreate,
   UserResponse,
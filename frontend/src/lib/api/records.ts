@@ -41,6 +41,12 @@ export class RecordsApi {
     if (params?.search) {
       searchParams.append("search", params.search);
     }
+    if (params?.cursor) {
+      searchParams.append("cursor", params.cursor);
+    }
+    if (params?.include_total !== undefined) {
+      searchParams.append("include_total", params.include_total.toString());
+    }
 
     const queryString = searchParams.toString();
     const endpoint = queryString
@@ -71,6 +77,12 @@ export class RecordsApi {
     if (params?.search) {
       searchParams.append("search", params.search);
     }
+    if (params?.cursor) {
+      searchParams.append("cursor", params.cursor);
+    }
+    if (params?.include_total !== undefined) {
+      searchParams.append("include_total", params.include_total.toString());
+    }
 
     const queryString = searchParams.toString();
     const endpoint = queryString
@@ -17,6 +17,7 @@ export interface UserResponse {
 
 export interface Token {
   access_token: string;
+  refresh_token?: string;
   token_type?: string;
 }
 
@@ -99,10 +100,18 @@ export interface TextContent {
 // 圖片內容類型
 export interface ImageContent {
   type: "image";
-  data: string; // Base64 編碼的圖片資料或 data URL
+  data?: string; // Base64 編碼的圖片資料或 data URL
+  attachment_id?: string; // 已上傳附件的 ID，傳送時可取代 data
   mime_type: string; // 圖片 MIME 類型
 }
 
+// 聊天圖片附件上傳回應
+export interface AttachmentUploadResponse {
+  attachment_id: string;
+  size: number;
+  content_type: string;
+}
+
 // 複合內容類型
 export type MessageContent = TextContent | ImageContent;
 
@@ -122,6 +131,13 @@ export interface ToolCall {
   name: string;
   arguments: Record<string, unknown>;
   result: string;
+  cache?: ToolCacheStats | null; // 僅在後端除錯模式提供
+}
+
+// 工具讀取緩存統計（同一請求中累計）
+export interface ToolCacheStats {
+  hits: number;
+  misses: number;
 }
 
 // 統一的聊天訊息類型
@@ -137,6 +153,20 @@ export interface ChatMessage {
 export interface ChatRequest {
   history_messages?: ChatMessage[];
   messages: ChatMessage[];
+  session_id?: number; // 伺服器端對話 ID，提供時歷史由伺服器載入
+}
+
+// 伺服器端對話
+export interface ChatSession {
+  id: number;
+  title: string | null;
+  created_at: string;
+  updated_at: string | null;
+}
+
+export interface ChatSessionDetail extends ChatSession {
+  summary: string | null;
+  messages: ChatMessage[];
 }
 
 export interface ChatResponse {
@@ -182,9 +212,10 @@ export interface ContactUpdate {
 // 聯絡人列表響應
 export interface ContactListResponse {
   contacts: Contact[];
-  total: number;
+  total: number | null;
   page: number;
   size: number;
+  next_cursor?: string | null;
 }
 
 // 聯絡人查詢參數
@@ -192,6 +223,8 @@ export interface ContactQueryParams {
   skip?: number;
   limit?: number;
   search?: string;
+  cursor?: string;
+  include_total?: boolean;
 }
 
 // 頭像上傳響應
@@ -202,6 +235,19 @@ export interface AvatarUploadResponse {
   content_type: string;
 }
 
+// 聯絡人頭像網址
+export interface AvatarUrl {
+  contact_id: number;
+  url: string;
+}
+
+// 頭像網址列表響應：presigned 可直接作為圖片來源，proxy 需帶身份驗證讀取
+export interface AvatarUrlListResponse {
+  mode: "presigned" | "proxy";
+  expires_in?: number | null;
+  avatars: AvatarUrl[];
+}
+
 // 支援的頭像文件格式
 export const SUPPORTED_AVATAR_TYPES = [
   "image/jpeg",
@@ -226,7 +272,11 @@ export const CONTACT_ENDPOINTS = {
   contactsWithAvatar: "/contacts/with-avatar",
   contactById: (id: number) => `/contacts/${id}`,
   contactAvatar: (id: number) => `/contacts/${id}/avatar`,
-  contactAvatarImage: (id: number) => `/contacts/${id}/avatar/image`,
+  contactAvatarImage: (id: number, size?: number) =>
+    size !== undefined
+      ? `/contacts/${id}/avatar/image?size=${size}`
+      : `/contacts/${id}/avatar/image`,
+  contactAvatarUrls: "/contacts/avatar-urls",
 } as const;
 
 // ============== SSE 聊天事件相關型別 ==============
@@ -359,9 +409,10 @@ export interface RecordUpdate {
 // 記錄列表響應
 export interface RecordListResponse {
   records: ContactRecord[];
-  total: number;
+  total: number | null;
   page: number;
   size: number;
+  next_cursor?: string | null;
 }
 
 // 記錄查詢參數
@@ -371,6 +422,8 @@ export interface RecordQueryParams {
   contact_id?: number;
   category?: RecordCategory;
   search?: string;
+  cursor?: string;
+  include_total?: boolean;
 }
 
 // 記錄 API 端點常數